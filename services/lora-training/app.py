@@ -3,19 +3,46 @@ FastAPI service for LoRA training worker
 Processes training jobs from the API Gateway
 """
 
-from fastapi import FastAPI, HTTPException, BackgroundTasks
-from pydantic import BaseModel, Field
+from fastapi import FastAPI, HTTPException
+from pydantic import BaseModel, ConfigDict, Field
 from typing import Optional, List
 import os
 from datetime import datetime
-from dotenv import load_dotenv
 import asyncio
 
-from db import db
-from training_pipeline import pipeline
+from config import configure
+
+# Load environment (.env files) before anything reads it: db and s3_storage
+# read their settings (pool sizes, AWS credentials, bucket) at import time
+configure()
 
-# Load environment from root
-load_dotenv(dotenv_path='../../.env')
+from db import db
+from training_pipeline import get_pipeline, TrainingJob
+from utils.download import close_session
+from webhook_notifier import close_session as close_webhook_session
+
+# Training runs as four stages (download → build → train → store), each drained
+# by its own worker pool so consecutive jobs overlap. /train feeds the download
+# queue; the small hand-off queues between stages apply back-pressure upstream.
+JOB_QUEUE_SIZE = int(os.getenv("TRAINING_QUEUE_SIZE", 64))
+STAGE_QUEUE_SIZE = int(os.getenv("TRAINING_STAGE_QUEUE_SIZE", 4))
+DOWNLOAD_WORKERS = int(os.getenv("TRAINING_DOWNLOAD_WORKERS", 2))
+BUILD_WORKERS = int(os.getenv("TRAINING_BUILD_WORKERS", os.cpu_count() or 1))
+TRAIN_WORKERS = int(os.getenv("TRAINING_TRAIN_WORKERS", 4))
+STORE_WORKERS = int(os.getenv("TRAINING_STORE_WORKERS", 4))
+
+# On shutdown, trained models still being stored get this long to finish
+STORE_DRAIN_TIMEOUT = float(os.getenv("TRAINING_STORE_DRAIN_TIMEOUT", 120))
+
+# Recorded on jobs that were in flight or queued when the service stopped
+SHUTDOWN_ERROR = "Training service shut down before the job finished; resubmit the job"
+
+job_queue: asyncio.Queue = asyncio.Queue(maxsize=JOB_QUEUE_SIZE)
+build_queue: asyncio.Queue = asyncio.Queue(maxsize=STAGE_QUEUE_SIZE)
+train_queue: asyncio.Queue = asyncio.Queue(maxsize=STAGE_QUEUE_SIZE)
+store_queue: asyncio.Queue = asyncio.Queue(maxsize=STAGE_QUEUE_SIZE)
+job_workers: List[asyncio.Task] = []
+store_workers: List[asyncio.Task] = []
 
 app = FastAPI(
     title="LoRA Training Service",
@@ -29,17 +56,63 @@ app = FastAPI(
 async def startup_event():
     """Connect to MongoDB on startup"""
     await db.connect()
+
+    # Build the pipeline and warm the face detector off the event loop so the
+    # first job doesn't pay for it
+    pipeline = await asyncio.to_thread(get_pipeline)
+    await asyncio.to_thread(pipeline.dataset_builder.face_detector.warm_up)
+
+    # Start stage workers
+    stages = [
+        ("download", pipeline.download_stage, job_queue, build_queue, DOWNLOAD_WORKERS),
+        ("build", pipeline.build_stage, build_queue, train_queue, BUILD_WORKERS),
+        ("train", pipeline.train_stage, train_queue, store_queue, TRAIN_WORKERS),
+        ("store", pipeline.store_stage, store_queue, None, STORE_WORKERS),
+    ]
+    for name, stage, inbox, outbox, count in stages:
+        workers = store_workers if name == "store" else job_workers
+        for i in range(count):
+            workers.append(asyncio.create_task(
+                stage_worker(stage, inbox, outbox),
+                name=f"{name}-worker-{i}"
+            ))
+
     print("✅ LoRA Training Worker started")
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """Close connections on shutdown"""
+    # Stop taking new work (jobs cancelled mid-stage are marked failed by
+    # their worker), then fail the jobs still waiting for those stages
+    for task in job_workers:
+        task.cancel()
+    await asyncio.gather(*job_workers, return_exceptions=True)
+    job_workers.clear()
+    await abandon_queued(job_queue, build_queue, train_queue)
+
+    # Let already-trained models finish storing
+    try:
+        await asyncio.wait_for(store_queue.join(), timeout=STORE_DRAIN_TIMEOUT)
+    except asyncio.TimeoutError:
+        print(f"⚠️  {store_queue.qsize()} trained model(s) not stored before shutdown")
+
+    for task in store_workers:
+        task.cancel()
+    await asyncio.gather(*store_workers, return_exceptions=True)
+    store_workers.clear()
+    await abandon_queued(store_queue)
+
     await db.close()
+    close_session()
+    await close_webhook_session()
     print("👋 LoRA Training Worker shutting down")
 
 # Pydantic models for request/response
 class TrainRequest(BaseModel):
     """Request model for training a LoRA"""
+    # Unknown fields from the gateway are dropped rather than rejected
+    model_config = ConfigDict(extra="ignore", validate_assignment=False)
+
     job_id: str = Field(..., description="Job ID from MongoDB")
     user_id: str = Field(..., description="User ID")
     video_url: str = Field(..., description="Source video URL (HTTP/HTTPS or S3)")
@@ -50,12 +123,16 @@ class TrainRequest(BaseModel):
 
 class TrainResponse(BaseModel):
     """Response model for training request"""
+    model_config = ConfigDict(extra="ignore")
+
     job_id: str
     status: str
     message: str
 
 class HealthResponse(BaseModel):
     """Health check response"""
+    model_config = ConfigDict(extra="ignore")
+
     status: str
     service: str
     version: str
@@ -72,60 +149,82 @@ async def health_check():
     }
 
 @app.post("/train", response_model=TrainResponse, tags=["Training"])
-async def train_lora(request: TrainRequest, background_tasks: BackgroundTasks):
+async def train_lora(request: TrainRequest):
     """
-    Process a LoRA training job
+    Queue a LoRA training job
 
-    This endpoint receives a training request and processes it in the background.
+    This endpoint receives a training request and queues it for a training worker.
     Updates MongoDB job status as training progresses.
     Uploads final model to S3.
+    Returns 503 when the queue is full so the caller can retry later.
     """
     try:
-        # Add training task to background
-        background_tasks.add_task(process_training_job, request)
-
-        return {
-            "job_id": request.job_id,
-            "status": "processing",
-            "message": "Training started in background"
-        }
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
-
-async def process_training_job(request: TrainRequest):
-    """
-    Background task to process training job
-
-    Steps:
-    1. Update MongoDB status to 'processing'
-    2. Download video from URL/S3
-    3. Extract frames using existing pipeline
-    4. Build dataset
-    5. Upload dataset to S3
-    6. Train via fal.ai
-    7. Download trained model
-    8. Upload to S3
-    9. Update MongoDB with results
-    """
-    try:
-        print(f"🚀 Starting training pipeline for job {request.job_id}")
+        job_queue.put_nowait(TrainingJob(**request.model_dump()))
+    except asyncio.QueueFull:
+        raise HTTPException(status_code=503, detail="Training queue is full, retry later")
 
-        result = await pipeline.process_training_job(
-            job_id=request.job_id,
-            user_id=request.user_id,
-            video_url=request.video_url,
-            lora_name=request.lora_name,
-            trigger=request.trigger,
-            steps=request.steps,
-            learning_rate=request.learning_rate
-        )
+    return {
+        "job_id": request.job_id,
+        "status": "queued",
+        "message": f"Training queued ({job_queue.qsize()} job(s) waiting)"
+    }
 
-        print(f"✅ Training complete! Model URL: {result['modelUrl']}")
+async def stage_worker(stage, inbox: asyncio.Queue, outbox: Optional[asyncio.Queue]):
+    """
+    Pipeline stage worker: runs one stage per job and hands the job downstream
 
-    except Exception as e:
-        print(f"❌ Training failed for job {request.job_id}: {e}")
-        # Error already logged to MongoDB in pipeline
-        raise
+    Failed jobs are marked failed in MongoDB and cleaned up instead of moving on.
+    The final stage (no outbox) cleans up after success. A job whose worker is
+    cancelled (shutdown) is marked failed before the cancellation propagates.
+    """
+    pipeline = get_pipeline()
+    while True:
+        job = await inbox.get()
+        try:
+            await stage(job)
+        except asyncio.CancelledError:
+            await abandon_job(job)
+            raise
+        except Exception as e:
+            await fail_and_cleanup(job, e)
+        else:
+            if outbox is not None:
+                try:
+                    await outbox.put(job)
+                except asyncio.CancelledError:
+                    await abandon_job(job)
+                    raise
+            else:
+                print(f"✅ Training complete! Model URL: {job.result['modelUrl']}")
+                await asyncio.to_thread(pipeline.cleanup, job)
+        finally:
+            inbox.task_done()
+
+async def fail_and_cleanup(job: TrainingJob, error: Exception) -> None:
+    """Mark a job failed (status + failure webhook) and remove its files"""
+    pipeline = get_pipeline()
+    try:
+        await pipeline.fail_job(job, error)
+    except Exception as report_error:
+        print(f"❌ Could not record failure for job {job.job_id}: {report_error}")
+    await asyncio.to_thread(pipeline.cleanup, job)
+
+async def abandon_job(job: TrainingJob) -> None:
+    """Fail a job that will not finish because the service is shutting down"""
+    print(f"⚠️  Job {job.job_id} interrupted by shutdown")
+    await fail_and_cleanup(job, RuntimeError(SHUTDOWN_ERROR))
+
+async def abandon_queued(*queues: asyncio.Queue) -> None:
+    """Fail every job still waiting in queues (their workers are gone)"""
+    jobs = []
+    for queue in queues:
+        while not queue.empty():
+            jobs.append(queue.get_nowait())
+            queue.task_done()
+
+    if jobs:
+        print(f"⚠️  Failing {len(jobs)} queued job(s) on shutdown")
+        await asyncio.gather(*(abandon_job(job) for job in jobs))
 
 # Development server
 if __name__ == "__main__":
@@ -135,5 +234,7 @@ if __name__ == "__main__":
         "app:app",
         host="0.0.0.0",
         port=port,
+        loop="uvloop",
+        http="httptools",
         reload=True
     )
@@ -5,13 +5,26 @@ Centralizes environment variables, validation, and defaults.
 """
 
 import os
+from functools import lru_cache
 from pathlib import Path
 from typing import Optional
 from dataclasses import dataclass
 from dotenv import load_dotenv
 
-# Load environment variables
-load_dotenv()
+# Repository-level .env shared by all services
+ROOT_ENV_PATH = Path(__file__).resolve().parents[2] / ".env"
+
+
+@lru_cache(maxsize=1)
+def configure() -> None:
+    """
+    Load environment variables from .env files (once per process).
+
+    A .env found from this service upward takes precedence over the
+    repository root .env; neither overrides variables already set.
+    """
+    load_dotenv()
+    load_dotenv(dotenv_path=ROOT_ENV_PATH)
 
 
 @dataclass
@@ -41,8 +54,11 @@ class Config:
     scene_threshold: float = 0.03  # Lower = more scenes (testing for more granular detection)
     interval_seconds: float = 3.0  # Extract frame every N seconds (for interval mode)
     target_fps: float = 2.0
+    hwaccel: Optional[str] = None  # ffmpeg -hwaccel for decoding ("auto", "cuda", "vaapi"); None = software
+    in_memory_frames: bool = False  # Decode keyframes to arrays instead of JPEG files (N x H x W x 3 bytes of RAM)
     min_frames: int = 10  # Lower for manual curation workflow
     max_frames: int = 50
+    dataset_archive: bool = False  # Upload the dataset to S3 as one tar object instead of one object per file (changes the S3 layout)
 
     # Dataset quality control
     min_face_confidence: float = 0.8
@@ -63,15 +79,24 @@ class Config:
         # Load provider from environment
         self.training_provider = os.getenv("TRAINING_PROVIDER", "fal_ai")
 
+        # Frame extraction strategy
+        self.hwaccel = os.getenv("FFMPEG_HWACCEL") or self.hwaccel
+        in_memory = os.getenv("IN_MEMORY_FRAMES")
+        if in_memory is not None:
+            self.in_memory_frames = in_memory.lower() in ("1", "true", "yes")
+        dataset_archive = os.getenv("DATASET_ARCHIVE")
+        if dataset_archive is not None:
+            self.dataset_archive = dataset_archive.lower() in ("1", "true", "yes")
+
         # Convert string paths to Path objects if needed
         self.temp_dir = Path(self.temp_dir)
         self.output_dir = Path(self.output_dir)
         self.dataset_dir = Path(self.dataset_dir)
 
         # Create directories if they don't exist
-        self.temp_dir.mkdir(parents=True, exist_ok=True)
-        self.output_dir.mkdir(parents=True, exist_ok=True)
-        self.dataset_dir.mkdir(parents=True, exist_ok=True)
+        for directory in (self.temp_dir, self.output_dir, self.dataset_dir):
+            if not directory.is_dir():
+                directory.mkdir(parents=True, exist_ok=True)
 
     def validate_provider(self, provider: Optional[str] = None) -> None:
         """
@@ -101,6 +126,7 @@ class Config:
     @classmethod
     def from_env(cls) -> "Config":
         """Create config from environment variables."""
+        configure()
         return cls()
 
     def get_training_params(self) -> dict:
@@ -112,10 +138,7 @@ class Config:
         }
 
 
-# Global config instance
-config = Config.from_env()
-
-
+@lru_cache(maxsize=1)
 def get_config() -> Config:
-    """Get the global configuration instance."""
-    return config
+    """Get the global configuration instance (created on first use)."""
+    return Config.from_env()
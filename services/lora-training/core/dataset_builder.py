@@ -8,17 +8,27 @@ Handles:
 - Training-ready dataset creation
 """
 
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import Callable, List, Dict, Optional, Tuple, Union
 from dataclasses import dataclass
 
-from core.video_processor import Frame
-from utils.face_detection import FaceDetector, ImageQuality
-from utils.captioning import CaptionGenerator
+import cv2
+import numpy as np
+import orjson
+
+from core.video_processor import FRAME_DTYPE, Frame, FrameTable
+from utils.face_detection import FaceDetector, ImageQuality, get_face_detector
+from utils.captioning import CaptionGenerator, get_caption_generator
+from utils.files import link_or_copy, write_text_file
+from utils.frame_dedup import DEFAULT_MAX_DISTANCE, FrameDeduper, dhash, dhash_file
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+# Threads encoding/linking frames and writing captions into a dataset
+STAGE_WORKERS = 16
+
 
 @dataclass
 class TrainingDataset:
@@ -45,7 +55,9 @@ class DatasetBuilder:
         min_face_confidence: float = 0.8,
         blur_threshold: float = 100.0,
         min_frames: int = 15,
-        max_frames: int = 50
+        max_frames: int = 50,
+        face_detector: Optional[FaceDetector] = None,
+        dedup_distance: Optional[int] = DEFAULT_MAX_DISTANCE
     ):
         """
         Initialize dataset builder.
@@ -56,13 +68,17 @@ class DatasetBuilder:
             blur_threshold: Minimum blur score (higher = sharper)
             min_frames: Minimum frames required for training
             max_frames: Maximum frames to include
+            face_detector: Detector to use (default: shared detector for these thresholds)
+            dedup_distance: Skip quality assessment of frames whose perceptual hash is
+                within this many bits of an earlier frame's (None = assess every frame)
         """
         self.output_dir = Path(output_dir)
         self.min_frames = min_frames
         self.max_frames = max_frames
+        self.dedup_distance = dedup_distance
 
-        # Initialize utilities
-        self.face_detector = FaceDetector(
+        # Reuse a process-wide detector unless one is injected
+        self.face_detector = face_detector or get_face_detector(
             min_face_confidence=min_face_confidence,
             blur_threshold=blur_threshold
         )
@@ -71,38 +87,43 @@ class DatasetBuilder:
 
     def filter_frames(
         self,
-        frames: List[Frame],
+        frames: Union[FrameTable, List[Frame]],
         verbose: bool = True
-    ) -> tuple[List[Frame], List[ImageQuality]]:
+    ) -> tuple[FrameTable, List[ImageQuality]]:
         """
         Filter frames based on quality criteria.
 
         Args:
-            frames: List of Frame objects
+            frames: FrameTable (or list of Frame objects)
             verbose: Log detailed results
 
         Returns:
             Tuple of (accepted_frames, quality_assessments)
         """
+        if not isinstance(frames, FrameTable):
+            frames = FrameTable.from_frames(frames)
+
         logger.info(f"Filtering {len(frames)} frames for quality...")
 
-        frame_paths = [frame.file_path for frame in frames]
         accepted_paths, qualities = self.face_detector.filter_quality_frames(
-            frame_paths,
-            verbose=verbose
+            frames.paths,
+            verbose=verbose,
+            images=frames.images
         )
 
-        # Map back to Frame objects
-        accepted_frames = [
-            frame for frame in frames
-            if frame.file_path in accepted_paths
-        ]
+        # One boolean mask over the table instead of rebuilding Frame lists
+        accepted_set = set(accepted_paths)
+        mask = np.fromiter(
+            (path in accepted_set for path in frames.paths),
+            dtype=bool,
+            count=len(frames)
+        )
 
-        return accepted_frames, qualities
+        return frames.filter(mask), qualities
 
     def build_dataset(
         self,
-        frames: List[Frame],
+        frames: Union[FrameTable, List[Frame]],
         dataset_name: str,
         trigger_phrase: str = "person",
         use_caption_variations: bool = True,
@@ -112,7 +133,7 @@ class DatasetBuilder:
         Build a training-ready dataset from frames.
 
         Args:
-            frames: List of Frame objects
+            frames: FrameTable (or list of Frame objects)
             dataset_name: Name for this dataset
             trigger_phrase: LoRA trigger phrase
             use_caption_variations: Use varied caption templates
@@ -129,24 +150,8 @@ class DatasetBuilder:
             logger.info(f"Building dataset: {dataset_name}")
             logger.info("=" * 80)
 
-            # Filter frames if requested
-            if filter_quality:
-                frames, qualities = self.filter_frames(frames, verbose=True)
-            else:
-                qualities = []
-
-            # Check minimum frame count
-            if len(frames) < self.min_frames:
-                raise DatasetBuildError(
-                    f"Insufficient frames: {len(frames)} < {self.min_frames} required"
-                )
-
-            # Limit to max_frames
-            if len(frames) > self.max_frames:
-                logger.warning(f"Limiting to {self.max_frames} frames (had {len(frames)})")
-                frames = frames[:self.max_frames]
-
-            logger.info(f"Using {len(frames)} frames for training")
+            if not isinstance(frames, FrameTable):
+                frames = FrameTable.from_frames(frames)
 
             # Create dataset directory
             dataset_dir = self.output_dir / dataset_name
@@ -156,28 +161,67 @@ class DatasetBuilder:
             images_dir.mkdir(parents=True, exist_ok=True)
             captions_dir.mkdir(parents=True, exist_ok=True)
 
-            # Initialize caption generator
-            caption_gen = CaptionGenerator(trigger_phrase=trigger_phrase)
+            # Get caption generator (cached per trigger phrase)
+            caption_gen = get_caption_generator(trigger_phrase)
+
+            # Stage images and generate captions (independent per frame);
+            # i indexes the incoming table, index is the dataset position
+            source = frames
+
+            def stage(i: int, index: int) -> Tuple[Path, str]:
+                return self._stage_frame(
+                    index,
+                    source[i],
+                    images_dir,
+                    captions_dir,
+                    caption_gen,
+                    use_caption_variations,
+                    image=source.images[i] if source.images is not None else None
+                )
 
-            # Copy images and generate captions
-            import shutil
+            with ThreadPoolExecutor(max_workers=STAGE_WORKERS) as executor:
+                if filter_quality:
+                    # Accepted frames are staged while later ones are still
+                    # being assessed
+                    frames, qualities, staged = self._filter_and_stage(frames, stage, executor)
+                else:
+                    qualities = []
 
-            for i, frame in enumerate(frames, 1):
-                # Copy image
-                dest_image = images_dir / f"{i:04d}.jpg"
-                shutil.copy2(frame.file_path, dest_image)
+                    # Limit to max_frames (a prefix, so indices still match source)
+                    if len(frames) > self.max_frames:
+                        logger.warning(f"Limiting to {self.max_frames} frames (had {len(frames)})")
+                        frames = frames[:self.max_frames]
 
-                # Generate caption
-                caption = caption_gen.generate_caption(
-                    frame.file_path,
-                    use_variations=use_caption_variations
+                    staged = []
+                    if len(frames) >= self.min_frames:
+                        staged = list(executor.map(stage, range(len(frames)), range(1, len(frames) + 1)))
+
+            # Check minimum frame count
+            if len(frames) < self.min_frames:
+                for dest_image, _ in staged:
+                    dest_image.unlink(missing_ok=True)
+                    (captions_dir / f"{dest_image.stem}.txt").unlink(missing_ok=True)
+                raise DatasetBuildError(
+                    f"Insufficient frames: {len(frames)} < {self.min_frames} required"
                 )
-                caption_path = captions_dir / f"{i:04d}.txt"
-                caption_path.write_text(caption)
 
-                logger.info(f"  {i}/{len(frames)}: {dest_image.name} → '{caption}'")
+            logger.info(f"Using {len(frames)} frames for training")
 
-            # Save metadata
+            # One log record per dataset; per-frame details ride along in
+            # `extra` for structured handlers instead of N stdout writes
+            records = [
+                {"i": i, "name": dest_image.name, "caption": caption}
+                for i, (dest_image, caption) in enumerate(staged, 1)
+            ]
+            logger.info(
+                f"✓ Staged {len(records)} images + captions "
+                f"({len({r['caption'] for r in records})} distinct captions)",
+                extra={"records": records}
+            )
+
+            # Save metadata. A frame's timestamp is when it was actually
+            # extracted: the scene's first frame in scene mode, the frame at
+            # (or just before) the midpoint for interval/midpoint extraction
             metadata = {
                 "dataset_name": dataset_name,
                 "trigger_phrase": trigger_phrase,
@@ -186,28 +230,42 @@ class DatasetBuilder:
                 "use_caption_variations": use_caption_variations,
                 "frames": [
                     {
-                        "scene_number": frame.scene_number,
-                        "timestamp": frame.midpoint,
-                        "duration": frame.duration,
-                        "resolution": f"{frame.width}x{frame.height}"
+                        "scene_number": scene_number,
+                        "timestamp": frame_time,
+                        "duration": duration,
+                        "resolution": f"{width}x{height}"
                     }
-                    for frame in frames
+                    for scene_number, frame_time, duration, width, height in zip(
+                        frames.data["scene_number"].tolist(),
+                        frames.data["frame_time"].tolist(),
+                        frames.durations.tolist(),
+                        frames.data["width"].tolist(),
+                        frames.data["height"].tolist()
+                    )
                 ]
             }
 
             if qualities:
+                # One (N, 2) array, one reduction for both averages
+                scores = np.array(
+                    [(q.face_confidence, q.blur_score) for q in qualities],
+                    dtype=np.float64
+                )
+                avg_face_confidence, avg_blur_score = scores.mean(axis=0)
+
                 metadata["quality_stats"] = {
                     "total_assessed": len(qualities),
                     "accepted": len(frames),
                     "rejected": len(qualities) - len(frames),
-                    "avg_face_confidence": sum(q.face_confidence for q in qualities) / len(qualities),
-                    "avg_blur_score": sum(q.blur_score for q in qualities) / len(qualities)
+                    "avg_face_confidence": float(avg_face_confidence),
+                    "avg_blur_score": float(avg_blur_score)
                 }
 
             # Save metadata JSON
-            import json
             metadata_path = dataset_dir / "metadata.json"
-            metadata_path.write_text(json.dumps(metadata, indent=2))
+            metadata_path.write_bytes(
+                orjson.dumps(metadata, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY)
+            )
 
             logger.info("=" * 80)
             logger.info("Dataset created successfully")
@@ -229,6 +287,176 @@ class DatasetBuilder:
             logger.error(f"Failed to build dataset: {e}")
             raise DatasetBuildError(f"Dataset build failed: {e}")
 
+    def _filter_and_stage(
+        self,
+        frames: FrameTable,
+        stage: Callable[[int, int], Tuple[Path, str]],
+        executor: ThreadPoolExecutor
+    ) -> Tuple[FrameTable, List[ImageQuality], List[Tuple[Path, str]]]:
+        """
+        Assess frames in order and stage each accepted one as soon as it is known.
+
+        Assessment runs on the detector's pool with a bounded number of frames
+        in flight, staging (encode/link + caption) on executor, so the two
+        overlap. Assessment stops once max_frames frames have been accepted.
+
+        Near-duplicate frames (see dedup_distance) are set aside first and
+        only assessed if the distinct frames leave the dataset short of
+        min_frames.
+
+        Args:
+            frames: Frames to assess
+            stage: Stages frame i as dataset entry index (1-based)
+            executor: Pool for staging work (also hashes frames for dedup)
+
+        Returns:
+            Tuple of (accepted frames, quality assessments, staged (image path, caption) pairs)
+        """
+        logger.info(f"Filtering {len(frames)} frames for quality...")
+
+        candidates, duplicates = self._dedupe_frames(frames, executor)
+
+        accepted: List[int] = []
+        qualities: List[ImageQuality] = []
+        staging = []
+
+        self._assess_and_stage(frames, candidates, stage, executor, accepted, qualities, staging)
+        if duplicates and len(accepted) < self.min_frames:
+            logger.info(
+                f"Only {len(accepted)} distinct frames accepted; "
+                f"assessing {len(duplicates)} near-duplicates"
+            )
+            self._assess_and_stage(frames, duplicates, stage, executor, accepted, qualities, staging)
+
+        logger.info(f"✓ Accepted {len(staging)}/{len(qualities)} assessed frames")
+        staged = [future.result() for future in staging]
+        return frames.take(accepted), qualities, staged
+
+    def _dedupe_frames(
+        self,
+        frames: FrameTable,
+        executor: ThreadPoolExecutor
+    ) -> Tuple[List[int], List[int]]:
+        """
+        Split frame indices into distinct frames and near-duplicates of earlier ones.
+
+        Args:
+            frames: Frames to hash
+            executor: Pool to hash on
+
+        Returns:
+            Tuple of (distinct indices, near-duplicate indices), each in frame order
+        """
+        if self.dedup_distance is None:
+            return list(range(len(frames))), []
+
+        if frames.images is not None:
+            hashes = executor.map(dhash, frames.images)
+        else:
+            hashes = executor.map(dhash_file, frames.paths)
+
+        deduper = FrameDeduper(self.dedup_distance)
+        candidates, duplicates = [], []
+        for i, frame_hash in enumerate(hashes):
+            (candidates if deduper.keep(frame_hash) else duplicates).append(i)
+
+        if duplicates:
+            logger.info(
+                f"Skipping {len(duplicates)} near-duplicate frames "
+                f"(dHash distance <= {self.dedup_distance})"
+            )
+        return candidates, duplicates
+
+    def _assess_and_stage(
+        self,
+        frames: FrameTable,
+        indices: List[int],
+        stage: Callable[[int, int], Tuple[Path, str]],
+        executor: ThreadPoolExecutor,
+        accepted: List[int],
+        qualities: List[ImageQuality],
+        staging: list
+    ) -> None:
+        """
+        Assess the frames at indices, staging accepted ones until max_frames is reached.
+
+        Args:
+            frames: Frame table
+            indices: Frames to assess, in order
+            stage: Stages frame i as dataset entry index (1-based)
+            executor: Pool for staging work
+            accepted: Accepted frame indices, in dataset order (appended to)
+            qualities: Quality assessments (appended to)
+            staging: Staging futures (appended to)
+        """
+        if len(staging) >= self.max_frames:
+            return
+
+        paths = [frames.paths[i] for i in indices]
+        images = [frames.images[i] for i in indices] if frames.images is not None else None
+
+        assessments = self.face_detector.iter_assessments(paths, images)
+        try:
+            for n, (i, quality) in enumerate(zip(indices, assessments), 1):
+                if quality is None:
+                    continue
+
+                qualities.append(quality)
+                if quality.is_acceptable:
+                    accepted.append(i)
+                    staging.append(executor.submit(stage, i, len(staging) + 1))
+
+                    if len(staging) >= self.max_frames:
+                        if n < len(indices):
+                            logger.info(
+                                f"Reached {self.max_frames} frames; "
+                                f"skipping the remaining {len(indices) - n}"
+                            )
+                        break
+        finally:
+            assessments.close()
+
+    def _stage_frame(
+        self,
+        index: int,
+        frame: Frame,
+        images_dir: Path,
+        captions_dir: Path,
+        caption_gen: CaptionGenerator,
+        use_variations: bool,
+        image: Optional[np.ndarray] = None
+    ) -> Tuple[Path, str]:
+        """
+        Link (or copy) one frame into the dataset and write its caption.
+
+        Args:
+            index: 1-based position in the dataset
+            frame: Source frame
+            images_dir: Dataset images directory
+            captions_dir: Dataset captions directory
+            caption_gen: Caption generator
+            use_variations: Use varied caption templates
+            image: Decoded frame for in-memory tables (encoded directly into
+                the dataset instead of linking frame.file_path)
+
+        Returns:
+            Tuple of (dataset image path, caption)
+        """
+        dest_image = images_dir / f"{index:04d}.jpg"
+        if image is not None:
+            if not cv2.imwrite(str(dest_image), image, [cv2.IMWRITE_JPEG_QUALITY, 95]):
+                raise DatasetBuildError(f"Failed to write image: {dest_image}")
+        else:
+            link_or_copy(frame.file_path, dest_image)
+
+        caption = caption_gen.generate_caption(
+            frame.file_path,
+            use_variations=use_variations
+        )
+        write_text_file(captions_dir / f"{index:04d}.txt", caption)
+
+        return dest_image, caption
+
     def build_from_directory(
         self,
         source_dir: Path,
@@ -248,28 +476,15 @@ class DatasetBuilder:
         Returns:
             TrainingDataset object
         """
-        # Convert images to Frame-like objects
-        from core.video_processor import Frame
-
         image_paths = sorted(source_dir.glob("*.jpg")) + sorted(source_dir.glob("*.png"))
 
         if not image_paths:
             raise DatasetBuildError(f"No images found in {source_dir}")
 
-        frames = []
-        for i, img_path in enumerate(image_paths, 1):
-            # Create minimal Frame object
-            frame = Frame(
-                scene_number=i,
-                file_path=img_path,
-                timestamp_start=0.0,
-                timestamp_end=0.0,
-                duration=0.0,
-                midpoint=0.0,
-                width=0,
-                height=0
-            )
-            frames.append(frame)
+        # Minimal frame rows: scene numbers only, no timing or size
+        data = np.zeros(len(image_paths), dtype=FRAME_DTYPE)
+        data["scene_number"] = np.arange(1, len(image_paths) + 1)
+        frames = FrameTable(data, image_paths)
 
         return self.build_dataset(
             frames=frames,
@@ -7,12 +7,17 @@ Handles:
 - Listing and retrieving LoRAs
 """
 
-import json
-import requests
+import os
+import shutil
+import threading
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 from datetime import datetime
 
+import orjson
+import requests
+
+from utils.download import NotModified, download_file, get_session, probe_url
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -21,16 +26,54 @@ logger = get_logger(__name__)
 class LoRAStorage:
     """Manage LoRA storage and versioning."""
 
-    def __init__(self, output_dir: Path):
+    # Consolidated metadata for all LoRAs, keyed by name
+    INDEX_FILENAME = "index.json"
+
+    def __init__(self, output_dir: Path, session: Optional[requests.Session] = None):
         """
         Initialize LoRA storage.
 
         Args:
             output_dir: Base directory for storing LoRAs
+            session: HTTP session for downloads (default: shared pooled session)
         """
         self.output_dir = Path(output_dir)
+        self.session = session or get_session()
         self.output_dir.mkdir(parents=True, exist_ok=True)
 
+        self._index_lock = threading.Lock()
+        self._index: Dict[str, Dict] = self._load_index()
+
+    def prepare(self, lora_name: str) -> Path:
+        """
+        Get storage ready for a LoRA before its files are available.
+
+        Creates the LoRA directory and checks free space against the previous
+        version's size. Idempotent, so it can run while training is still in
+        progress; save_lora calls it too.
+
+        Args:
+            lora_name: Name for this LoRA
+
+        Returns:
+            LoRA directory path
+        """
+        lora_dir = self.output_dir / lora_name
+        lora_dir.mkdir(parents=True, exist_ok=True)
+
+        with self._index_lock:
+            previous = self._index.get(lora_name) or {}
+
+        expected = (previous.get("lora_content_length") or 0) + (previous.get("config_content_length") or 0)
+        free = shutil.disk_usage(lora_dir).free
+        if expected and free < expected:
+            logger.warning(
+                f"Low disk space for {lora_name}: {free / 1024 / 1024:.1f} MB free, "
+                f"previous version was {expected / 1024 / 1024:.1f} MB"
+            )
+
+        return lora_dir
+
     def save_lora(
         self,
         lora_name: str,
@@ -57,19 +100,33 @@ class LoRAStorage:
             logger.info(f"Saving LoRA: {lora_name}")
 
             # Create LoRA directory
-            lora_dir = self.output_dir / lora_name
-            lora_dir.mkdir(parents=True, exist_ok=True)
+            lora_dir = self.prepare(lora_name)
+
+            # Validators from a previous save let unchanged files be skipped
+            with self._index_lock:
+                previous = self._index.get(lora_name) or {}
 
             # Download LoRA file
             lora_path = lora_dir / f"{lora_name}.safetensors"
-            self._download_file(lora_url, lora_path)
+            lora_etag, lora_length = self._download_file(
+                lora_url,
+                lora_path,
+                previous.get("lora_etag"),
+                previous.get("lora_content_length")
+            )
             logger.info(f"✓ Downloaded LoRA: {lora_path}")
 
             # Download config if available
             config_path = None
+            config_etag = config_length = None
             if config_url:
                 config_path = lora_dir / f"{lora_name}_config.json"
-                self._download_file(config_url, config_path)
+                config_etag, config_length = self._download_file(
+                    config_url,
+                    config_path,
+                    previous.get("config_etag"),
+                    previous.get("config_content_length")
+                )
                 logger.info(f"✓ Downloaded config: {config_path}")
 
             # Save metadata
@@ -80,13 +137,21 @@ class LoRAStorage:
                 "config_url": config_url,
                 "saved_at": datetime.now().isoformat(),
                 "lora_path": str(lora_path),
-                "config_path": str(config_path) if config_path else None
+                "config_path": str(config_path) if config_path else None,
+                "lora_etag": lora_etag,
+                "lora_content_length": lora_length,
+                "config_etag": config_etag,
+                "config_content_length": config_length
             })
 
             metadata_path = lora_dir / "metadata.json"
-            metadata_path.write_text(json.dumps(metadata, indent=2))
+            metadata_path.write_bytes(orjson.dumps(metadata, option=orjson.OPT_INDENT_2))
             logger.info(f"✓ Saved metadata: {metadata_path}")
 
+            with self._index_lock:
+                self._index[lora_name] = metadata
+                self._write_index()
+
             return {
                 "lora_name": lora_name,
                 "lora_path": lora_path,
@@ -99,23 +164,57 @@ class LoRAStorage:
             logger.error(f"Failed to save LoRA: {e}")
             raise
 
-    def _download_file(self, url: str, output_path: Path) -> None:
-        """Download file from URL."""
-        logger.info(f"Downloading: {url}")
+    def _download_file(
+        self,
+        url: str,
+        output_path: Path,
+        cached_etag: Optional[str] = None,
+        cached_length: Optional[int] = None
+    ) -> Tuple[Optional[str], int]:
+        """
+        Download file from URL (concurrent byte ranges when supported).
 
-        response = requests.get(url, stream=True, timeout=300)
-        response.raise_for_status()
+        Skips the transfer when the local copy matches the remote ETag and
+        Content-Length recorded on a previous download.
 
-        total_size = int(response.headers.get("content-length", 0))
-        downloaded = 0
+        Args:
+            url: URL to download
+            output_path: Local destination path
+            cached_etag: ETag recorded for the existing local copy
+            cached_length: Size recorded for the existing local copy
 
-        with open(output_path, "wb") as f:
-            for chunk in response.iter_content(chunk_size=8192):
-                if chunk:
-                    f.write(chunk)
-                    downloaded += len(chunk)
+        Returns:
+            Tuple of (ETag, size in bytes) for the file now on disk
+        """
+        local_length = output_path.stat().st_size if output_path.exists() else None
+        have_copy = cached_etag is not None and local_length == cached_length
+
+        # One HEAD serves both the freshness check and download_file's range probe
+        remote = probe_url(url, session=self.session)
+        etag, remote_length = remote.etag, remote.length
+        if have_copy and etag == cached_etag and remote_length in (None, local_length):
+            logger.info(f"✓ Unchanged (ETag {etag}), skipping download: {url}")
+            return etag, local_length
+
+        logger.info(f"Downloading: {url}")
+
+        # LoRA weights are large and written once: keep them out of the page cache
+        try:
+            downloaded = download_file(
+                url,
+                output_path,
+                timeout=300,
+                session=self.session,
+                direct_io=True,
+                if_none_match=cached_etag if have_copy else None,
+                remote=remote
+            )
+        except NotModified:
+            logger.info(f"✓ Not modified, keeping local copy: {output_path}")
+            return cached_etag, local_length
 
         logger.info(f"  Downloaded {downloaded / 1024 / 1024:.2f} MB")
+        return etag, downloaded
 
     def list_loras(self) -> List[Dict]:
         """
@@ -124,21 +223,8 @@ class LoRAStorage:
         Returns:
             List of LoRA metadata dicts
         """
-        loras = []
-
-        for lora_dir in self.output_dir.iterdir():
-            if not lora_dir.is_dir():
-                continue
-
-            metadata_path = lora_dir / "metadata.json"
-            if not metadata_path.exists():
-                continue
-
-            try:
-                metadata = json.loads(metadata_path.read_text())
-                loras.append(metadata)
-            except Exception as e:
-                logger.warning(f"Could not load metadata for {lora_dir.name}: {e}")
+        with self._index_lock:
+            loras = [dict(metadata) for metadata in self._index.values()]
 
         # Sort by saved_at (newest first)
         loras.sort(key=lambda x: x.get("saved_at", ""), reverse=True)
@@ -154,6 +240,12 @@ class LoRAStorage:
         Returns:
             Metadata dict or None if not found
         """
+        with self._index_lock:
+            metadata = self._index.get(lora_name)
+        if metadata is not None:
+            return dict(metadata)
+
+        # Not indexed (e.g. written by another process); read from disk
         lora_dir = self.output_dir / lora_name
         metadata_path = lora_dir / "metadata.json"
 
@@ -161,7 +253,7 @@ class LoRAStorage:
             return None
 
         try:
-            return json.loads(metadata_path.read_text())
+            return orjson.loads(metadata_path.read_bytes())
         except Exception as e:
             logger.error(f"Could not load LoRA metadata: {e}")
             return None
@@ -200,10 +292,57 @@ class LoRAStorage:
             return False
 
         try:
-            import shutil
             shutil.rmtree(lora_dir)
+
+            with self._index_lock:
+                if self._index.pop(lora_name, None) is not None:
+                    self._write_index()
+
             logger.info(f"✓ Deleted LoRA: {lora_name}")
             return True
         except Exception as e:
             logger.error(f"Failed to delete LoRA: {e}")
             return False
+
+    def _load_index(self) -> Dict[str, Dict]:
+        """Load the metadata index, rebuilding it from metadata.json files if needed."""
+        index_path = self.output_dir / self.INDEX_FILENAME
+
+        if index_path.exists():
+            try:
+                return orjson.loads(index_path.read_bytes())
+            except Exception as e:
+                logger.warning(f"Could not load LoRA index, rebuilding: {e}")
+
+        index = self._scan_metadata()
+        if index:
+            self._index = index
+            self._write_index()
+        return index
+
+    def _scan_metadata(self) -> Dict[str, Dict]:
+        """Read metadata.json from every LoRA directory."""
+        index = {}
+
+        for lora_dir in self.output_dir.iterdir():
+            if not lora_dir.is_dir():
+                continue
+
+            metadata_path = lora_dir / "metadata.json"
+            if not metadata_path.exists():
+                continue
+
+            try:
+                index[lora_dir.name] = orjson.loads(metadata_path.read_bytes())
+            except Exception as e:
+                logger.warning(f"Could not load metadata for {lora_dir.name}: {e}")
+
+        return index
+
+    def _write_index(self) -> None:
+        """Persist the index atomically (caller holds the index lock)."""
+        index_path = self.output_dir / self.INDEX_FILENAME
+        tmp_path = index_path.with_suffix(".json.tmp")
+
+        tmp_path.write_bytes(orjson.dumps(self._index, option=orjson.OPT_INDENT_2))
+        os.replace(tmp_path, index_path)
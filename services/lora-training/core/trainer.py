@@ -8,6 +8,7 @@ Coordinates the end-to-end LoRA training process:
 4. Result storage
 """
 
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Optional, Dict
 
@@ -37,7 +38,9 @@ class TrainingOrchestrator:
         # Initialize components
         self.video_processor = VideoProcessor(
             temp_dir=config.temp_dir,
-            scene_threshold=config.scene_threshold
+            scene_threshold=config.scene_threshold,
+            in_memory_frames=config.in_memory_frames,
+            hwaccel=config.hwaccel
         )
 
         self.dataset_builder = DatasetBuilder(
@@ -50,6 +53,9 @@ class TrainingOrchestrator:
 
         self.storage = LoRAStorage(output_dir=config.output_dir)
 
+        # Background work that overlaps a training run (storage preparation)
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="lora-storage")
+
         # Initialize provider
         self.provider = self._get_provider()
 
@@ -114,6 +120,10 @@ class TrainingOrchestrator:
             )
             logger.info(f"✓ Dataset ready: {dataset.image_count} images")
 
+            # Prepare storage (directory, free-space check) while the provider
+            # trains; joined before saving, so its errors surface there
+            storage_future = self._executor.submit(self.storage.prepare, lora_name)
+
             # Step 3: Train LoRA
             logger.info("Step 3/4: Training LoRA...")
             training_config = TrainingConfig(
@@ -135,6 +145,7 @@ class TrainingOrchestrator:
 
             # Step 4: Store LoRA
             logger.info("Step 4/4: Storing LoRA...")
+            storage_future.result()
             lora_info = self.storage.save_lora(
                 lora_name=lora_name,
                 lora_url=training_result.lora_url,
@@ -206,6 +217,10 @@ class TrainingOrchestrator:
 
             trigger = trigger_phrase or self.config.default_trigger_phrase
 
+            # Prepare storage (directory, free-space check) while the provider
+            # trains; joined before saving, so its errors surface there
+            storage_future = self._executor.submit(self.storage.prepare, lora_name)
+
             # Train LoRA
             logger.info("Training LoRA...")
             training_config = TrainingConfig(
@@ -225,6 +240,7 @@ class TrainingOrchestrator:
 
             # Store LoRA
             logger.info("Storing LoRA...")
+            storage_future.result()
             lora_info = self.storage.save_lora(
                 lora_name=lora_name,
                 lora_url=training_result.lora_url,
@@ -8,30 +8,276 @@ Handles:
 - Frame metadata
 """
 
+import asyncio
+import json
+import os
+import re
+import shutil
 import subprocess
+import threading
 import requests
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Dict, Tuple, Optional
+from typing import Iterable, Iterator, List, Dict, Tuple, Optional, Union
 from dataclasses import dataclass
 from urllib.parse import urlparse
 
+import numpy as np
+
+from utils.download import get_session
+from utils.files import link_or_copy
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+# extract_frames "auto" mode: per-scene seeks win for short clips, and the
+# select expression grows with the scene count
+SHORT_CLIP_SECONDS = 5.0
+MAX_SELECT_TERMS = 1000
+
+DOWNLOAD_BUFFER_SIZE = 1024 * 1024
+
+# Lifetime of presigned S3 URLs handed to ffmpeg (covers long decodes)
+PRESIGNED_URL_EXPIRY = 6 * 3600
+
+# Streamed (HTTP/S3) inputs: ffmpeg's timeout also covers the transfer, so it
+# grows by this many seconds per second of video (unknown length: the cap)
+STREAM_TIMEOUT_PER_VIDEO_SECOND = 2.0
+STREAM_TIMEOUT_MAX = 4 * 3600
+
+# Protocols ffmpeg may open for remote inputs, so a crafted playlist cannot
+# point it at file: or other local protocols
+REMOTE_PROTOCOL_WHITELIST = "http,https,tcp,tls"
 
-@dataclass
+# ffmpeg stderr parsing: one showinfo line per selected frame (timestamp, and
+# size when present), plus the input's container duration
+_SHOWINFO_RE = re.compile(r"Parsed_showinfo[^\n]*?pts_time:([\d.]+)(?:[^\n]*?\bs:(\d+)x(\d+))?")
+_DURATION_RE = re.compile(r"Duration: (\d+):(\d+):([\d.]+)")
+
+# PyAV scene detection: frames are compared as small luma thumbnails
+SCENE_THUMB_SIZE = (64, 36)
+
+# Recent ffprobe results kept per processor, least recently used evicted first
+PROBE_CACHE_SIZE = 64
+
+
+@dataclass(slots=True)
 class Frame:
     """Metadata for an extracted frame."""
     scene_number: int
     file_path: Path
     timestamp_start: float
     timestamp_end: float
-    duration: float
-    midpoint: float
+    frame_time: float  # When the extracted frame occurs (scene start or midpoint, per mode)
     width: int
     height: int
 
+    @property
+    def duration(self) -> float:
+        """Scene duration (seconds)."""
+        return self.timestamp_end - self.timestamp_start
+
+    @property
+    def midpoint(self) -> float:
+        """Scene midpoint (seconds)."""
+        return (self.timestamp_start + self.timestamp_end) / 2
+
+
+# Column layout of FrameTable.data (one row per extracted frame)
+FRAME_DTYPE = np.dtype([
+    ("scene_number", np.int32),
+    ("timestamp_start", np.float64),
+    ("timestamp_end", np.float64),
+    ("frame_time", np.float64),
+    ("width", np.int32),
+    ("height", np.int32),
+])
+
+
+class FrameTable:
+    """
+    Frame metadata stored column-wise.
+
+    Numeric fields live in one NumPy structured array (FRAME_DTYPE) with a
+    parallel list of file paths, so filters and aggregates run on whole
+    columns instead of walking Frame objects. Iterating or indexing with an
+    int still yields Frame rows for callers that work per frame.
+    """
+
+    def __init__(self, data: np.ndarray, paths: List[Path], images: Optional[np.ndarray] = None):
+        """
+        Initialize frame table.
+
+        Args:
+            data: Structured array with dtype FRAME_DTYPE
+            paths: Frame image paths, one per row of data
+            images: Optional decoded frames, shape (N, H, W, 3) BGR uint8. When set,
+                the frames are held in memory and paths are where they would be
+                written (see write_images)
+        """
+        if len(data) != len(paths) or (images is not None and len(images) != len(paths)):
+            raise ValueError(f"FrameTable size mismatch: {len(data)} rows, {len(paths)} paths")
+        self.data = data
+        self.paths = paths
+        self.images = images
+
+    @classmethod
+    def from_frames(cls, frames: Iterable[Frame]) -> "FrameTable":
+        """Build a table from Frame objects."""
+        frames = list(frames)
+        data = np.array(
+            [
+                (f.scene_number, f.timestamp_start, f.timestamp_end, f.frame_time, f.width, f.height)
+                for f in frames
+            ],
+            dtype=FRAME_DTYPE
+        )
+        return cls(data, [Path(f.file_path) for f in frames])
+
+    @property
+    def durations(self) -> np.ndarray:
+        """Scene duration per frame (seconds)."""
+        return self.data["timestamp_end"] - self.data["timestamp_start"]
+
+    @property
+    def midpoints(self) -> np.ndarray:
+        """Scene midpoint per frame (seconds)."""
+        return (self.data["timestamp_start"] + self.data["timestamp_end"]) / 2
+
+    def filter(self, mask: np.ndarray) -> "FrameTable":
+        """
+        Keep the rows where mask is True.
+
+        Args:
+            mask: Boolean array with one entry per frame
+
+        Returns:
+            New FrameTable with the selected rows (order preserved)
+        """
+        mask = np.asarray(mask, dtype=bool)
+        indices = np.flatnonzero(mask)
+        images = self.images[mask] if self.images is not None else None
+        return FrameTable(self.data[mask], [self.paths[i] for i in indices], images)
+
+    def take(self, indices: List[int]) -> "FrameTable":
+        """
+        Select rows by position.
+
+        Args:
+            indices: Row indices, in the order wanted
+
+        Returns:
+            New FrameTable with the selected rows (in indices order)
+        """
+        indices = np.asarray(indices, dtype=np.intp)
+        images = self.images[indices] if self.images is not None else None
+        return FrameTable(self.data[indices], [self.paths[i] for i in indices], images)
+
+    def write_images(self, quality: int = 95) -> None:
+        """
+        Encode in-memory frames to their paths as JPEG (no-op for on-disk tables).
+
+        Args:
+            quality: JPEG quality (0-100)
+        """
+        if self.images is None:
+            return
+
+        import cv2
+
+        for path, image in zip(self.paths, self.images):
+            path.parent.mkdir(parents=True, exist_ok=True)
+            if not cv2.imwrite(str(path), image, [cv2.IMWRITE_JPEG_QUALITY, quality]):
+                raise VideoProcessingError(f"Failed to write frame: {path}")
+
+    def row(self, index: int) -> Frame:
+        """Materialize one row as a Frame."""
+        rec = self.data[index]
+        return Frame(
+            scene_number=int(rec["scene_number"]),
+            file_path=self.paths[index],
+            timestamp_start=float(rec["timestamp_start"]),
+            timestamp_end=float(rec["timestamp_end"]),
+            frame_time=float(rec["frame_time"]),
+            width=int(rec["width"]),
+            height=int(rec["height"])
+        )
+
+    def __len__(self) -> int:
+        return len(self.paths)
+
+    def __iter__(self) -> Iterator[Frame]:
+        return (self.row(i) for i in range(len(self)))
+
+    def __getitem__(self, key: Union[int, slice]) -> Union[Frame, "FrameTable"]:
+        if isinstance(key, slice):
+            images = self.images[key] if self.images is not None else None
+            return FrameTable(self.data[key], self.paths[key], images)
+        return self.row(key)
+
+
+def _is_remote(video_path) -> bool:
+    """Whether ffmpeg reads this source over the network."""
+    return str(video_path).startswith(("http://", "https://"))
+
+
+def _parse_showinfo(stderr: str) -> List[Tuple[float, int, int]]:
+    """Parse (timestamp, width, height) for each frame logged by ffmpeg's showinfo filter."""
+    return [
+        (float(time), int(width or 0), int(height or 0))
+        for time, width, height in _SHOWINFO_RE.findall(stderr)
+    ]
+
+
+def _empty_keyframe_table() -> FrameTable:
+    """In-memory FrameTable with no frames."""
+    return FrameTable(np.zeros(0, dtype=FRAME_DTYPE), [], np.zeros((0, 0, 0, 3), dtype=np.uint8))
+
+
+def _scene_keyframe_table(
+    starts: List[float],
+    duration: float,
+    images: np.ndarray,
+    output_dir: Path
+) -> FrameTable:
+    """In-memory FrameTable for one keyframe per scene; scene i runs to keyframe i+1."""
+    starts = np.asarray(starts, dtype=np.float64)
+    ends = np.append(starts[1:], max(duration, starts[-1]))
+
+    data = np.zeros(len(starts), dtype=FRAME_DTYPE)
+    data["scene_number"] = np.arange(1, len(starts) + 1)
+    data["timestamp_start"] = starts
+    data["timestamp_end"] = ends
+    data["frame_time"] = starts
+    data["height"], data["width"] = images.shape[1:3]
+
+    paths = [output_dir / f"frame_{n:04d}.jpg" for n in data["scene_number"].tolist()]
+    return FrameTable(data, paths, images)
+
+
+def _midpoint_keyframe_table(
+    scene_rows: List[int],
+    scenes: List[Tuple[float, float]],
+    frame_times: List[float],
+    images: np.ndarray,
+    output_dir: Path
+) -> FrameTable:
+    """In-memory FrameTable for midpoint frames; images[k], decoded at frame_times[k], belongs to scenes[scene_rows[k]]."""
+    scene_rows = np.asarray(scene_rows, dtype=np.intp)
+    bounds = np.array(scenes, dtype=np.float64).reshape(-1, 2)[scene_rows]
+
+    data = np.zeros(len(scene_rows), dtype=FRAME_DTYPE)
+    data["scene_number"] = scene_rows + 1
+    data["timestamp_start"] = bounds[:, 0]
+    data["timestamp_end"] = bounds[:, 1]
+    data["frame_time"] = frame_times
+    if len(images):
+        data["height"], data["width"] = images.shape[1:3]
+
+    paths = [output_dir / f"frame_{n:04d}.jpg" for n in data["scene_number"].tolist()]
+    return FrameTable(data, paths, images)
+
 
 class VideoProcessingError(Exception):
     """Base exception for video processing errors."""
@@ -46,7 +292,9 @@ class VideoProcessor:
         temp_dir: Path,
         extraction_mode: str = "scene",
         scene_threshold: float = 0.15,
-        interval_seconds: float = 3.0
+        interval_seconds: float = 3.0,
+        in_memory_frames: bool = False,
+        hwaccel: Optional[str] = None
     ):
         """
         Initialize video processor.
@@ -56,13 +304,28 @@ class VideoProcessor:
             extraction_mode: Extraction strategy ("scene" or "interval")
             scene_threshold: Scene detection threshold (0.0-1.0, lower = more scenes)
             interval_seconds: Extract frame every N seconds (for interval mode)
+            in_memory_frames: process_video decodes keyframes into memory
+                (FrameTable.images, via PyAV when installed) instead of writing JPEG files
+            hwaccel: ffmpeg hardware decoder to use ("auto", "cuda", "vaapi", ...);
+                None decodes in software
         """
         self.temp_dir = Path(temp_dir)
         self.extraction_mode = extraction_mode
         self.scene_threshold = scene_threshold
         self.interval_seconds = interval_seconds
+        self.in_memory_frames = in_memory_frames
+        self.hwaccel = hwaccel
         self.temp_dir.mkdir(parents=True, exist_ok=True)
 
+        # S3 client and transfer settings, created on first S3 download
+        self._s3_client = None
+        self._s3_transfer_config = None
+        self._s3_lock = threading.Lock()
+
+        # ffprobe results per source version (see _probe_key)
+        self._probe_cache: "OrderedDict[Tuple, Dict]" = OrderedDict()
+        self._probe_lock = threading.Lock()
+
     def download_video(self, video_url: str, output_path: Path) -> None:
         """
         Download video from URL or copy from local path.
@@ -81,12 +344,12 @@ class VideoProcessor:
             # Check if local file path
             local_path = Path(video_url)
             if local_path.exists() and local_path.is_file():
-                # Copy local file
-                import shutil
-                logger.info(f"Copying local file: {local_path}")
-                shutil.copy2(local_path, output_path)
+                # The working copy is read-only and deleted after processing:
+                # link it (hardlink, else symlink) and only copy bytes as a last resort
+                logger.info(f"Staging local file: {local_path}")
+                link_or_copy(local_path, output_path, allow_symlink=True)
                 file_size = output_path.stat().st_size / 1024 / 1024
-                logger.info(f"✓ Copied {file_size:.2f} MB to {output_path.name}")
+                logger.info(f"✓ Staged {file_size:.2f} MB as {output_path.name}")
                 return
 
             # Parse URL
@@ -96,17 +359,15 @@ class VideoProcessor:
                 # S3 download
                 self._download_from_s3(video_url, output_path)
             elif parsed.scheme in ["http", "https"]:
-                # HTTP/HTTPS download
-                response = requests.get(video_url, stream=True, timeout=120)
-                response.raise_for_status()
+                # HTTP/HTTPS download (1 MiB buffered copy, gzip/deflate decoded)
+                with get_session().get(video_url, stream=True, timeout=120) as response:
+                    response.raise_for_status()
+                    response.raw.decode_content = True
 
-                downloaded = 0
-                with open(output_path, "wb") as f:
-                    for chunk in response.iter_content(chunk_size=8192):
-                        if chunk:
-                            f.write(chunk)
-                            downloaded += len(chunk)
+                    with open(output_path, "wb") as f:
+                        shutil.copyfileobj(response.raw, f, length=DOWNLOAD_BUFFER_SIZE)
 
+                downloaded = output_path.stat().st_size
                 logger.info(f"✓ Downloaded {downloaded / 1024 / 1024:.2f} MB to {output_path.name}")
             else:
                 raise VideoProcessingError(
@@ -131,7 +392,6 @@ class VideoProcessor:
             VideoProcessingError: If S3 download fails
         """
         try:
-            import boto3
             from botocore.exceptions import ClientError
 
             # Parse S3 URL: s3://bucket/key
@@ -141,11 +401,9 @@ class VideoProcessor:
 
             logger.info(f"Downloading from S3: {bucket}/{key}")
 
-            # Initialize S3 client
-            s3 = boto3.client("s3")
-
-            # Download file
-            s3.download_file(bucket, key, str(output_path))
+            # Download file (parallel ranged GETs for large objects)
+            s3 = self._get_s3_client()
+            s3.download_file(bucket, key, str(output_path), Config=self._s3_transfer_config)
 
             file_size = output_path.stat().st_size / 1024 / 1024
             logger.info(f"✓ Downloaded {file_size:.2f} MB from S3 to {output_path.name}")
@@ -159,6 +417,30 @@ class VideoProcessor:
         except Exception as e:
             raise VideoProcessingError(f"Failed to download from S3: {e}")
 
+    def _get_s3_client(self):
+        """Get the cached S3 client, creating it (and the transfer config) once."""
+        if self._s3_client is None:
+            with self._s3_lock:
+                if self._s3_client is None:
+                    import boto3
+                    from boto3.s3.transfer import TransferConfig
+                    from botocore.config import Config as BotoConfig
+
+                    self._s3_transfer_config = TransferConfig(
+                        multipart_threshold=8 * 1024 * 1024,
+                        multipart_chunksize=16 * 1024 * 1024,
+                        max_concurrency=16,
+                        use_threads=True
+                    )
+                    # Presigned URLs must be signed for the bucket's region
+                    self._s3_client = boto3.client(
+                        "s3",
+                        region_name=os.getenv("AWS_REGION") or None,
+                        config=BotoConfig(signature_version="s3v4", s3={"addressing_style": "virtual"})
+                    )
+
+        return self._s3_client
+
     def detect_scenes(self, video_path: Path) -> List[Tuple[float, float]]:
         """
         Detect scene boundaries using ffmpeg.
@@ -178,7 +460,7 @@ class VideoProcessor:
             # Use ffmpeg scene detection
             cmd = [
                 "ffmpeg",
-                "-i", str(video_path),
+                *self._input_args(video_path),
                 "-filter:v", f"select='gt(scene,{self.scene_threshold})',showinfo",
                 "-f", "null",
                 "-"
@@ -188,18 +470,14 @@ class VideoProcessor:
                 cmd,
                 stdout=subprocess.PIPE,
                 stderr=subprocess.PIPE,
-                timeout=120,
+                timeout=self._decode_timeout(video_path, 120),
                 text=True
             )
 
             # Parse scene timestamps
-            import re
-            scene_times = []
-            for line in result.stderr.split("\n"):
-                if "Parsed_showinfo" in line and "pts_time:" in line:
-                    match = re.search(r"pts_time:([\d.]+)", line)
-                    if match:
-                        scene_times.append(float(match.group(1)))
+            scene_times = [
+                float(match.group(1)) for match in _SHOWINFO_RE.finditer(result.stderr)
+            ]
 
             # Get video duration
             duration = self._get_video_duration(video_path)
@@ -224,6 +502,322 @@ class VideoProcessor:
         except Exception as e:
             raise VideoProcessingError(f"Failed to detect scenes: {e}")
 
+    def extract_scene_keyframes(self, video_path: Path, output_dir: Path) -> FrameTable:
+        """
+        Detect scenes and extract one keyframe per scene in a single ffmpeg pass.
+
+        The select filter keeps the first frame plus every frame whose scene
+        score exceeds the threshold; showinfo logs each selected frame's
+        timestamp and size, so no per-scene seeks or per-frame ffprobe calls
+        are needed. Each keyframe is the first frame of its scene (scene mode
+        used to seek to each scene's midpoint instead); its time is recorded
+        as frame_time.
+
+        Args:
+            video_path: Path to video file
+            output_dir: Directory to save frames
+
+        Returns:
+            FrameTable (one row per scene, in order)
+
+        Raises:
+            VideoProcessingError: If detection/extraction fails
+        """
+        try:
+            logger.info(f"Detecting scenes and extracting keyframes (threshold: {self.scene_threshold})")
+            output_dir.mkdir(parents=True, exist_ok=True)
+
+            cmd = [
+                "ffmpeg",
+                *self._input_args(video_path),
+                "-vf", f"select='eq(n\\,0)+gt(scene\\,{self.scene_threshold})',showinfo",
+                "-vsync", "vfr",
+                "-q:v", "2",
+                str(output_dir / "frame_%04d.jpg"),
+                "-y"
+            ]
+
+            result = subprocess.run(
+                cmd,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                timeout=self._decode_timeout(video_path, 300),
+                text=True
+            )
+
+            if result.returncode != 0:
+                raise VideoProcessingError(f"ffmpeg failed: {result.stderr[-500:]}")
+
+            # Parse selected frames (timestamp + size) and container duration
+            selected = _parse_showinfo(result.stderr)
+            duration_match = _DURATION_RE.search(result.stderr)
+            if duration_match:
+                hours, minutes, seconds = duration_match.groups()
+                duration = int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+            else:
+                duration = self._get_video_duration(video_path)
+
+            # Scene i spans from its keyframe to the next keyframe (last: end of video)
+            frames = []
+            for i, (start_time, width, height) in enumerate(selected, 1):
+                end_time = selected[i][0] if i < len(selected) else max(duration, start_time)
+                frame_path = output_dir / f"frame_{i:04d}.jpg"
+                if not frame_path.exists():
+                    logger.warning(f"  ✗ Missing keyframe {i}")
+                    continue
+
+                frames.append(Frame(
+                    scene_number=i,
+                    file_path=frame_path,
+                    timestamp_start=start_time,
+                    timestamp_end=end_time,
+                    frame_time=start_time,
+                    width=width,
+                    height=height
+                ))
+
+            logger.info(f"✓ Detected {len(selected)} scenes, extracted {len(frames)} keyframes")
+            return FrameTable.from_frames(frames)
+
+        except subprocess.TimeoutExpired:
+            raise VideoProcessingError("Scene keyframe extraction timed out")
+        except VideoProcessingError:
+            raise
+        except Exception as e:
+            raise VideoProcessingError(f"Failed to extract scene keyframes: {e}")
+
+    def extract_frames_inmem(
+        self,
+        video_path: Path,
+        output_dir: Path,
+        scenes: Optional[List[Tuple[float, float]]] = None
+    ) -> FrameTable:
+        """
+        Decode keyframes straight into memory, skipping the JPEG round-trip.
+
+        ffmpeg pipes the selected frames as raw BGR24 (OpenCV's layout), so
+        quality checks run on the arrays and only frames that are kept get
+        encoded. With scenes=None, one keyframe is taken per detected scene
+        (as in extract_scene_keyframes); otherwise each scene's midpoint is used.
+        Memory use is N x H x W x 3 bytes for N keyframes.
+
+        Args:
+            video_path: Path to video file
+            output_dir: Directory the frames would be written to (sets FrameTable.paths)
+            scenes: Optional list of (start_time, end_time) tuples
+
+        Returns:
+            FrameTable with images set (nothing is written to output_dir)
+
+        Raises:
+            VideoProcessingError: If decoding fails
+        """
+        try:
+            if scenes is None:
+                logger.info(f"Detecting scenes and decoding keyframes (threshold: {self.scene_threshold})")
+                select = f"eq(n\\,0)+gt(scene\\,{self.scene_threshold})"
+            else:
+                logger.info(f"Decoding {len(scenes)} keyframes in memory")
+                midpoints = [(start + end) / 2 for start, end in scenes]
+                select = "+".join(
+                    f"gte(t\\,{m:.6f})*(isnan(prev_t)+lt(prev_t\\,{m:.6f}))" for m in midpoints
+                )
+
+            cmd = [
+                "ffmpeg",
+                *self._input_args(video_path),
+                "-vf", f"select='{select}',showinfo",
+                "-vsync", "vfr",
+                "-f", "rawvideo",
+                "-pix_fmt", "bgr24",
+                "pipe:1"
+            ]
+
+            result = subprocess.run(
+                cmd,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                timeout=self._decode_timeout(video_path, 300)
+            )
+
+            stderr = result.stderr.decode("utf-8", errors="replace")
+            if result.returncode != 0:
+                raise VideoProcessingError(f"ffmpeg failed: {stderr[-500:]}")
+
+            selected = _parse_showinfo(stderr)
+            if not selected:
+                return _empty_keyframe_table()
+
+            _, width, height = selected[0]
+            frame_bytes = width * height * 3
+            if frame_bytes == 0 or len(result.stdout) != frame_bytes * len(selected):
+                raise VideoProcessingError(
+                    f"Unexpected raw frame data: {len(result.stdout)} bytes for "
+                    f"{len(selected)} frames of {width}x{height}"
+                )
+
+            # Zero-copy view over ffmpeg's output buffer
+            images = np.frombuffer(result.stdout, dtype=np.uint8).reshape(len(selected), height, width, 3)
+
+            if scenes is None:
+                duration_match = _DURATION_RE.search(stderr)
+                if duration_match:
+                    hours, minutes, seconds = duration_match.groups()
+                    duration = int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+                else:
+                    duration = self._get_video_duration(video_path)
+
+                starts = [timestamp for timestamp, _, _ in selected]
+                table = _scene_keyframe_table(starts, duration, images, output_dir)
+            else:
+                # Same midpoint-to-frame matching as _extract_frames_select
+                keep = []
+                scene_idx = 0
+                for k, (timestamp, _, _) in enumerate(selected):
+                    if scene_idx >= len(scenes):
+                        break
+                    keep.append((k, scene_idx))
+                    scene_idx += 1
+                    while scene_idx < len(scenes) and midpoints[scene_idx] <= timestamp:
+                        scene_idx += 1
+
+                rows = np.array([k for k, _ in keep], dtype=np.intp)
+                scene_rows = [i for _, i in keep]
+                frame_times = [selected[k][0] for k, _ in keep]
+                table = _midpoint_keyframe_table(scene_rows, scenes, frame_times, images[rows], output_dir)
+
+            logger.info(f"✓ Decoded {len(table)} keyframes ({width}x{height}) in memory")
+            return table
+
+        except subprocess.TimeoutExpired:
+            raise VideoProcessingError("In-memory keyframe extraction timed out")
+        except VideoProcessingError:
+            raise
+        except Exception as e:
+            raise VideoProcessingError(f"Failed to decode keyframes: {e}")
+
+    def extract_frames_pyav(
+        self,
+        video_path: Path,
+        output_dir: Path,
+        scenes: Optional[List[Tuple[float, float]]] = None
+    ) -> FrameTable:
+        """
+        Decode keyframes in-process with PyAV (one decode, no subprocess or pipe).
+
+        With scenes=None, scene changes are detected on the decoded frames: the
+        mean absolute difference between consecutive luma thumbnails (0-1)
+        above scene_threshold starts a new scene, and its first frame is kept.
+        Otherwise the first frame at or after each scene's midpoint is kept and
+        decoding stops after the last one. Frames are returned as BGR24 arrays,
+        like extract_frames_inmem.
+
+        Args:
+            video_path: Path or HTTP(S) URL of the video
+            output_dir: Directory the frames would be written to (sets FrameTable.paths)
+            scenes: Optional list of (start_time, end_time) tuples
+
+        Returns:
+            FrameTable with images set (nothing is written to output_dir)
+
+        Raises:
+            VideoProcessingError: If PyAV is missing or decoding fails
+        """
+        try:
+            import av
+        except ImportError:
+            raise VideoProcessingError("PyAV not installed. Install with: pip install av")
+
+        source = str(video_path)
+        options = {}
+        if _is_remote(source):
+            options = {
+                "protocol_whitelist": REMOTE_PROTOCOL_WHITELIST,
+                "reconnect": "1",
+                "reconnect_streamed": "1",
+                "reconnect_delay_max": "5"
+            }
+
+        try:
+            midpoints = [(start + end) / 2 for start, end in scenes] if scenes is not None else None
+            if scenes is None:
+                logger.info(f"Detecting scenes and decoding keyframes with PyAV (threshold: {self.scene_threshold})")
+            else:
+                logger.info(f"Decoding {len(scenes)} keyframes with PyAV")
+
+            images = []
+            starts = []
+            scene_rows = []
+            frame_times = []
+
+            with av.open(source, options=options) as container:
+                stream = container.streams.video[0]
+                stream.thread_type = "AUTO"
+
+                duration = float(container.duration / av.time_base) if container.duration else 0.0
+                thumb_width, thumb_height = SCENE_THUMB_SIZE
+                previous = None
+                scene_idx = 0
+
+                for frame in container.decode(stream):
+                    timestamp = float(frame.time) if frame.time is not None else 0.0
+
+                    if scenes is None:
+                        thumb = frame.reformat(width=thumb_width, height=thumb_height, format="gray")
+                        luma = thumb.to_ndarray().astype(np.int16)
+                        is_cut = previous is None or (
+                            np.abs(luma - previous).mean() / 255.0 > self.scene_threshold
+                        )
+                        previous = luma
+                        if is_cut:
+                            starts.append(timestamp)
+                            images.append(frame.to_ndarray(format="bgr24"))
+                        continue
+
+                    if timestamp < midpoints[scene_idx]:
+                        continue
+
+                    # A frame that crosses several midpoints covers the first of them
+                    scene_rows.append(scene_idx)
+                    frame_times.append(timestamp)
+                    images.append(frame.to_ndarray(format="bgr24"))
+                    scene_idx += 1
+                    while scene_idx < len(scenes) and midpoints[scene_idx] <= timestamp:
+                        scene_idx += 1
+                    if scene_idx >= len(scenes):
+                        break
+
+            if not images:
+                return _empty_keyframe_table()
+
+            if scenes is None:
+                if not duration:
+                    duration = self._get_video_duration(video_path)
+                table = _scene_keyframe_table(starts, duration, np.stack(images), output_dir)
+            else:
+                table = _midpoint_keyframe_table(scene_rows, scenes, frame_times, np.stack(images), output_dir)
+
+            logger.info(f"✓ Decoded {len(table)} keyframes in memory (PyAV)")
+            return table
+
+        except VideoProcessingError:
+            raise
+        except Exception as e:
+            raise VideoProcessingError(f"Failed to decode keyframes with PyAV: {e}")
+
+    def _decode_keyframes(
+        self,
+        video_path: Path,
+        output_dir: Path,
+        scenes: Optional[List[Tuple[float, float]]] = None
+    ) -> FrameTable:
+        """In-memory keyframes: PyAV when installed, else the ffmpeg rawvideo pipe."""
+        try:
+            import av  # noqa: F401
+        except ImportError:
+            return self.extract_frames_inmem(video_path, output_dir, scenes)
+        return self.extract_frames_pyav(video_path, output_dir, scenes)
+
     def extract_intervals(self, video_path: Path, interval_seconds: float) -> List[Tuple[float, float]]:
         """
         Extract frames at regular time intervals.
@@ -259,36 +853,201 @@ class VideoProcessor:
         except Exception as e:
             raise VideoProcessingError(f"Failed to create intervals: {e}")
 
-    def _get_video_duration(self, video_path: Path) -> float:
-        """Get video duration using ffprobe."""
+    @staticmethod
+    def is_streamable(video_url: str) -> bool:
+        """Whether process_video can decode this source without staging it on disk."""
+        return urlparse(video_url).scheme in ("http", "https", "s3")
+
+    def _stream_url(self, video_url: str) -> Optional[str]:
+        """
+        Get a URL ffmpeg can read directly (S3 objects via a presigned URL).
+
+        Returns:
+            HTTP(S) URL, or None if the source must be downloaded first
+        """
+        parsed = urlparse(video_url)
+
+        if parsed.scheme in ("http", "https"):
+            return video_url
+
+        if parsed.scheme == "s3":
+            try:
+                return self._get_s3_client().generate_presigned_url(
+                    "get_object",
+                    Params={"Bucket": parsed.netloc, "Key": parsed.path.lstrip("/")},
+                    ExpiresIn=PRESIGNED_URL_EXPIRY
+                )
+            except Exception as e:
+                logger.warning(f"Could not presign {video_url}, downloading instead: {e}")
+
+        return None
+
+    def _input_args(self, video_path, seek: Optional[float] = None) -> List[str]:
+        """
+        ffmpeg input arguments for a local path or HTTP(S) URL.
+
+        Adds hardware decoding when configured and ends with -an -sn -dn so
+        only the video stream is demuxed (they apply to the output that follows).
+
+        Args:
+            video_path: Path or URL of the video
+            seek: Optional input seek in seconds (fast keyframe seek, no
+                frame-accurate backward search)
+        """
+        source = str(video_path)
+        args = []
+
+        if self.hwaccel:
+            args += ["-hwaccel", self.hwaccel]
+
+        if seek is not None:
+            args += ["-noaccurate_seek", "-ss", str(seek)]
+
+        if _is_remote(source):
+            # Resume dropped connections instead of failing mid-decode
+            args += [
+                "-protocol_whitelist", REMOTE_PROTOCOL_WHITELIST,
+                "-reconnect", "1",
+                "-reconnect_streamed", "1",
+                "-reconnect_delay_max", "5"
+            ]
+
+        return [*args, "-i", source, "-an", "-sn", "-dn"]
+
+    def _decode_timeout(self, video_path, timeout: float) -> float:
+        """
+        Timeout for an ffmpeg pass over a whole video.
+
+        Local files get timeout as is. Streamed inputs are downloaded by the
+        same process, so they get extra time in proportion to their probed
+        duration (STREAM_TIMEOUT_MAX when it is unknown).
+        """
+        if not _is_remote(video_path):
+            return timeout
+
+        duration = self._probe_video(video_path)["duration"]
+        if duration <= 0:
+            return STREAM_TIMEOUT_MAX
+        return min(timeout + duration * STREAM_TIMEOUT_PER_VIDEO_SECOND, STREAM_TIMEOUT_MAX)
+
+    def _probe_key(self, video_path) -> Optional[Tuple]:
+        """
+        Cache key for a source's probe results.
+
+        Local files are keyed on path, modification time and size, so a file
+        rewritten in place (video_{id}.mp4 reused by a retried job) is probed
+        again. URLs are keyed on themselves; process_video drops them when the
+        job ends (_forget_probe), as the object behind a URL can change.
+
+        Returns:
+            Key tuple, or None if the local file cannot be stat'ed
+        """
+        source = str(video_path)
+        if _is_remote(source):
+            return (source,)
+        try:
+            stat = os.stat(source)
+        except OSError:
+            return None
+        return (source, stat.st_mtime_ns, stat.st_size)
+
+    def _forget_probe(self, video_path) -> None:
+        """Drop a source's cached probe results."""
+        key = self._probe_key(video_path)
+        with self._probe_lock:
+            self._probe_cache.pop(key, None)
+
+    def _probe_video(self, video_path: Path) -> Dict:
+        """
+        Probe a video's stream and container properties with one ffprobe call.
+
+        Results are cached per source version (see _probe_key), so repeated
+        lookups (duration for intervals, dimensions for extracted frames) never
+        spawn another ffprobe.
+
+        Args:
+            video_path: Path or URL of the video
+
+        Returns:
+            Dict with width, height, duration, fps and nb_frames
+            (0 for any value ffprobe could not report)
+        """
+        source = str(video_path)
+        key = self._probe_key(video_path)
+        with self._probe_lock:
+            cached = self._probe_cache.get(key)
+            if cached is not None:
+                self._probe_cache.move_to_end(key)
+        if cached is not None:
+            return cached
+
         cmd = [
             "ffprobe",
             "-v", "error",
-            "-show_entries", "format=duration",
-            "-of", "default=noprint_wrappers=1:nokey=1",
-            str(video_path)
+            *(["-protocol_whitelist", REMOTE_PROTOCOL_WHITELIST] if _is_remote(source) else []),
+            "-select_streams", "v:0",
+            "-show_entries", "stream=width,height,r_frame_rate,nb_frames:format=duration",
+            "-print_format", "json",
+            source
         ]
 
-        result = subprocess.run(
-            cmd,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            timeout=30,
-            text=True
-        )
+        info = {"width": 0, "height": 0, "duration": 0.0, "fps": 0.0, "nb_frames": 0}
+        try:
+            result = subprocess.run(
+                cmd,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                timeout=30,
+                text=True
+            )
+            data = json.loads(result.stdout or "{}")
+        except (OSError, subprocess.TimeoutExpired, ValueError) as e:
+            logger.warning(f"Could not probe video: {e}")
+            return info
+
+        stream = (data.get("streams") or [{}])[0]
+        info["width"] = int(stream.get("width") or 0)
+        info["height"] = int(stream.get("height") or 0)
 
         try:
-            return float(result.stdout.strip())
+            info["duration"] = float(data.get("format", {}).get("duration", 0.0))
         except ValueError:
+            pass
+
+        num, _, den = str(stream.get("r_frame_rate", "0/1")).partition("/")
+        try:
+            info["fps"] = float(num) / float(den or 1)
+        except (ValueError, ZeroDivisionError):
+            pass
+
+        nb_frames = str(stream.get("nb_frames", ""))
+        info["nb_frames"] = int(nb_frames) if nb_frames.isdigit() else 0
+
+        if key is None:
+            return info
+
+        with self._probe_lock:
+            self._probe_cache[key] = info
+            self._probe_cache.move_to_end(key)
+            if len(self._probe_cache) > PROBE_CACHE_SIZE:
+                self._probe_cache.popitem(last=False)
+        return info
+
+    def _get_video_duration(self, video_path: Path) -> float:
+        """Get video duration (from the cached ffprobe result)."""
+        duration = self._probe_video(video_path)["duration"]
+        if duration <= 0:
             logger.warning("Could not parse video duration, using default")
             return 30.0
+        return duration
 
     def extract_frames(
         self,
         video_path: Path,
         scenes: List[Tuple[float, float]],
-        output_dir: Path
-    ) -> List[Frame]:
+        output_dir: Path,
+        mode: str = "auto"
+    ) -> FrameTable:
         """
         Extract one keyframe per scene.
 
@@ -296,9 +1055,12 @@ class VideoProcessor:
             video_path: Path to video file
             scenes: List of (start_time, end_time) tuples
             output_dir: Directory to save frames
+            mode: "select" decodes the video once and picks every midpoint with
+                a select filter; "seek" runs one ffmpeg seek per scene; "auto"
+                seeks for short clips or very many scenes, otherwise selects
 
         Returns:
-            List of Frame objects
+            FrameTable of extracted frames
 
         Raises:
             VideoProcessingError: If extraction fails
@@ -307,49 +1069,159 @@ class VideoProcessor:
             logger.info(f"Extracting keyframes to {output_dir}")
             output_dir.mkdir(parents=True, exist_ok=True)
 
-            frames = []
+            if mode == "auto":
+                clip_length = scenes[-1][1] if scenes else 0.0
+                use_seek = clip_length < SHORT_CLIP_SECONDS or len(scenes) > MAX_SELECT_TERMS
+                mode = "seek" if use_seek else "select"
 
-            for i, (start_time, end_time) in enumerate(scenes, 1):
-                midpoint = (start_time + end_time) / 2
-                frame_path = output_dir / f"frame_{i:04d}.jpg"
-
-                # Extract frame at midpoint
-                if self._extract_single_frame(video_path, midpoint, frame_path):
-                    # Get frame dimensions
-                    width, height = self._get_frame_dimensions(frame_path)
-
-                    frame = Frame(
-                        scene_number=i,
-                        file_path=frame_path,
-                        timestamp_start=start_time,
-                        timestamp_end=end_time,
-                        duration=end_time - start_time,
-                        midpoint=midpoint,
-                        width=width,
-                        height=height
-                    )
-                    frames.append(frame)
-                    logger.info(f"  ✓ Frame {i}/{len(scenes)}: {frame_path.name} ({width}x{height})")
-                else:
-                    logger.warning(f"  ✗ Failed to extract frame {i}")
+            if mode == "select":
+                frames = self._extract_frames_select(video_path, scenes, output_dir)
+            elif mode == "seek":
+                frames = self._extract_frames_seek(video_path, scenes, output_dir)
+            else:
+                raise VideoProcessingError(f"Unknown extraction mode: {mode}")
 
             logger.info(f"✓ Extracted {len(frames)}/{len(scenes)} frames")
-            return frames
+            return FrameTable.from_frames(frames)
 
+        except VideoProcessingError:
+            raise
         except Exception as e:
             raise VideoProcessingError(f"Failed to extract frames: {e}")
 
+    def _extract_frames_select(
+        self,
+        video_path: Path,
+        scenes: List[Tuple[float, float]],
+        output_dir: Path
+    ) -> List[Frame]:
+        """Extract all scene midpoints in one sequential decode."""
+        midpoints = [(start + end) / 2 for start, end in scenes]
+
+        # Select the first frame at or after each midpoint
+        terms = "+".join(
+            f"gte(t\\,{m:.6f})*(isnan(prev_t)+lt(prev_t\\,{m:.6f}))" for m in midpoints
+        )
+        cmd = [
+            "ffmpeg",
+            *self._input_args(video_path),
+            "-vf", f"select='{terms}',showinfo",
+            "-vsync", "vfr",
+            "-q:v", "2",
+            str(output_dir / "select_%04d.jpg"),
+            "-y"
+        ]
+
+        result = subprocess.run(
+            cmd,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            timeout=self._decode_timeout(video_path, 300),
+            text=True
+        )
+
+        if result.returncode != 0:
+            raise VideoProcessingError(f"ffmpeg failed: {result.stderr[-500:]}")
+
+        selected = _parse_showinfo(result.stderr)
+
+        # Selected frames arrive in midpoint order. A frame that crosses several
+        # midpoints at once (scenes shorter than a frame) covers the first of them.
+        frames = []
+        scene_idx = 0
+        for k, (timestamp, width, height) in enumerate(selected, 1):
+            if scene_idx >= len(scenes):
+                break
+            i = scene_idx + 1
+            scene_idx += 1
+            while scene_idx < len(scenes) and midpoints[scene_idx] <= timestamp:
+                scene_idx += 1
+
+            start_time, end_time = scenes[i - 1]
+            frame_path = output_dir / f"frame_{i:04d}.jpg"
+            (output_dir / f"select_{k:04d}.jpg").replace(frame_path)
+
+            frames.append(Frame(
+                scene_number=i,
+                file_path=frame_path,
+                timestamp_start=start_time,
+                timestamp_end=end_time,
+                frame_time=timestamp,
+                width=width,
+                height=height
+            ))
+            logger.info(f"  ✓ Frame {i}/{len(scenes)}: {frame_path.name} ({width}x{height})")
+
+        return frames
+
+    def _extract_frames_seek(
+        self,
+        video_path: Path,
+        scenes: List[Tuple[float, float]],
+        output_dir: Path
+    ) -> List[Frame]:
+        """Extract each scene midpoint with its own ffmpeg seek (in parallel)."""
+        # Every frame has the source resolution; probe once instead of per frame
+        probe = self._probe_video(video_path)
+        source_size = (probe["width"], probe["height"])
+
+        def extract(item: Tuple[int, Tuple[float, float]]) -> Optional[Frame]:
+            i, (start_time, end_time) = item
+            midpoint = (start_time + end_time) / 2
+            frame_path = output_dir / f"frame_{i:04d}.jpg"
+
+            # Extract frame at midpoint (the keyframe seek may land earlier)
+            frame_time = self._extract_single_frame(video_path, midpoint, frame_path)
+            if frame_time is None:
+                return None
+
+            # Source dimensions, or probe the frame if the source had none
+            width, height = source_size if all(source_size) else self._get_frame_dimensions(frame_path)
+
+            return Frame(
+                scene_number=i,
+                file_path=frame_path,
+                timestamp_start=start_time,
+                timestamp_end=end_time,
+                frame_time=frame_time,
+                width=width,
+                height=height
+            )
+
+        # Each ffmpeg child is single-threaded, so run one per core
+        workers = max(1, min(os.cpu_count() or 1, 8, len(scenes)))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(extract, enumerate(scenes, 1)))
+
+        frames = []
+        for i, frame in enumerate(results, 1):
+            if frame is None:
+                logger.warning(f"  ✗ Failed to extract frame {i}")
+                continue
+            frames.append(frame)
+            logger.info(f"  ✓ Frame {i}/{len(scenes)}: {frame.file_path.name} ({frame.width}x{frame.height})")
+
+        return frames
+
     def _extract_single_frame(
         self,
         video_path: Path,
         timestamp: float,
         output_path: Path
-    ) -> bool:
-        """Extract a single frame at timestamp."""
+    ) -> Optional[float]:
+        """
+        Extract a single frame at timestamp.
+
+        Returns:
+            Time of the frame actually written (None on failure). -copyts keeps
+            source timestamps, so showinfo reports where the seek landed.
+        """
         cmd = [
             "ffmpeg",
-            "-ss", str(timestamp),
-            "-i", str(video_path),
+            "-threads", "1",
+            "-copyts",
+            *self._input_args(video_path, seek=timestamp),
+            "-vf", "showinfo",
             "-frames:v", "1",
             "-q:v", "2",
             "-update", "1",
@@ -362,14 +1234,19 @@ class VideoProcessor:
                 cmd,
                 stdout=subprocess.PIPE,
                 stderr=subprocess.PIPE,
-                timeout=30
+                timeout=30,
+                text=True
             )
-            return result.returncode == 0 and output_path.exists()
         except subprocess.TimeoutExpired:
-            return False
+            return None
+
+        if result.returncode != 0 or not output_path.exists():
+            return None
+        selected = _parse_showinfo(result.stderr)
+        return selected[0][0] if selected else timestamp
 
     def _get_frame_dimensions(self, frame_path: Path) -> Tuple[int, int]:
-        """Get frame dimensions using ffprobe."""
+        """Get frame dimensions using ffprobe (fallback when the source probe fails)."""
         cmd = [
             "ffprobe",
             "-v", "error",
@@ -409,6 +1286,7 @@ class VideoProcessor:
         Returns:
             Dict with processing results
         """
+        streamed = False
         try:
             logger.info("=" * 80)
             logger.info(f"Processing video: {video_id}")
@@ -418,22 +1296,37 @@ class VideoProcessor:
             video_path = self.temp_dir / f"video_{video_id}.mp4"
             frames_dir = output_dir or (self.temp_dir / "frames" / video_id)
 
-            # Download video
-            self.download_video(video_url, video_path)
+            # Remote sources are decoded straight from the URL so download
+            # overlaps decode; everything else is fetched to local disk first
+            stream_url = self._stream_url(video_url)
+            streamed = stream_url is not None
+            if streamed:
+                logger.info(f"Streaming video from: {urlparse(stream_url).netloc}")
+                video_path = stream_url
+            else:
+                self.download_video(video_url, video_path)
 
             # Extract frames based on mode
             if self.extraction_mode == "interval":
                 intervals = self.extract_intervals(video_path, self.interval_seconds)
-                frames = self.extract_frames(video_path, intervals, frames_dir)
+                if self.in_memory_frames:
+                    frames = self._decode_keyframes(video_path, frames_dir, intervals)
+                else:
+                    frames = self.extract_frames(video_path, intervals, frames_dir)
                 extraction_count = len(intervals)
-            else:  # default to scene detection
-                scenes = self.detect_scenes(video_path)
-                frames = self.extract_frames(video_path, scenes, frames_dir)
-                extraction_count = len(scenes)
+            else:  # default to scene detection (single ffmpeg pass, first frame of each scene)
+                if self.in_memory_frames:
+                    frames = self._decode_keyframes(video_path, frames_dir)
+                else:
+                    frames = self.extract_scene_keyframes(video_path, frames_dir)
+                extraction_count = len(frames)
 
-            # Cleanup video file
-            video_path.unlink()
-            logger.info(f"✓ Cleaned up video file")
+            # Cleanup video file (a URL's probe is only trusted for this job)
+            if streamed:
+                self._forget_probe(video_path)
+            else:
+                video_path.unlink()
+                logger.info(f"✓ Cleaned up video file")
 
             return {
                 "success": True,
@@ -448,13 +1341,42 @@ class VideoProcessor:
 
         except VideoProcessingError as e:
             logger.error(f"✗ Processing failed: {e}")
+            if streamed:
+                self._forget_probe(video_path)
             return {
                 "success": False,
                 "video_id": video_id,
                 "video_url": video_url,
                 "scenes_detected": 0,
                 "frames_extracted": 0,
-                "frames": [],
+                "frames": FrameTable.from_frames([]),
                 "frames_dir": None,
                 "error": str(e)
             }
+
+    async def process_video_async(
+        self,
+        video_url: str,
+        video_id: str,
+        output_dir: Optional[Path] = None
+    ) -> Dict:
+        """
+        Async variant of process_video for use inside an event loop.
+
+        Runs the blocking download and ffmpeg work on a worker thread so
+        the loop (MongoDB, HTTP handlers) stays responsive.
+
+        Args:
+            video_url: URL to download video from
+            video_id: Unique identifier for this video
+            output_dir: Optional output directory (default: temp_dir/frames/{video_id})
+
+        Returns:
+            Dict with processing results
+        """
+        return await asyncio.to_thread(
+            self.process_video,
+            video_url=video_url,
+            video_id=video_id,
+            output_dir=output_dir
+        )
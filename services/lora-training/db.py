@@ -3,9 +3,29 @@ MongoDB client for updating job status
 """
 
 from motor.motor_asyncio import AsyncIOMotorClient
-from pymongo.errors import ConnectionFailure
+from pymongo import UpdateOne
+from pymongo.errors import ConnectionFailure, OperationFailure
+import asyncio
 import os
-from datetime import datetime
+from datetime import datetime, timezone
+from typing import Dict, Optional
+
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Connection pool defaults (overridable via environment)
+DEFAULT_MAX_POOL_SIZE = 200
+DEFAULT_MIN_POOL_SIZE = 10
+DEFAULT_MAX_IDLE_TIME_MS = 300_000
+DEFAULT_SERVER_SELECTION_TIMEOUT_MS = 3000
+
+# In-progress status updates are coalesced per job and written at this
+# interval (0 = write every update immediately)
+DEFAULT_STATUS_FLUSH_MS = 500
+
+# Statuses written immediately (after any buffered update for the job)
+TERMINAL_STATUSES = ("completed", "failed")
 
 class JobDatabase:
     """MongoDB client for job management"""
@@ -15,6 +35,14 @@ class JobDatabase:
         self.db = None
         self.jobs = None
 
+        # Buffered $set documents per jobId, merged until the next flush
+        self._pending_updates: Dict[str, dict] = {}
+        self._flush_interval = int(os.getenv('MONGODB_STATUS_FLUSH_MS', DEFAULT_STATUS_FLUSH_MS)) / 1000
+        self._flush_task: Optional[asyncio.Task] = None
+        # Buffered writes go out one at a time so an older update for a job
+        # can never land after a newer one
+        self._write_lock = asyncio.Lock()
+
     async def connect(self):
         """Connect to MongoDB"""
         try:
@@ -22,48 +50,166 @@ class JobDatabase:
             if not mongodb_uri:
                 raise ValueError("MONGODB_URI not set in environment")
 
-            self.client = AsyncIOMotorClient(mongodb_uri)
+            self.client = AsyncIOMotorClient(mongodb_uri, **self._client_options())
             # Get database name from URI or default
             self.db = self.client.get_default_database()
             self.jobs = self.db.jobs
 
             # Test connection
             await self.client.admin.command('ping')
-            print(f"✅ Connected to MongoDB: {self.db.name}")
+
+            await self._ensure_indexes()
+
+            if self._flush_interval > 0:
+                self._flush_task = asyncio.create_task(self._flush_loop(), name="mongodb-status-flush")
+
+            logger.info(f"✅ Connected to MongoDB: {self.db.name}")
 
         except Exception as e:
-            print(f"❌ MongoDB connection error: {e}")
+            logger.error(f"❌ MongoDB connection error: {e}")
             raise
 
+    async def _ensure_indexes(self) -> None:
+        """
+        Create the jobId index used by every lookup/update (no-op if it exists)
+
+        Best effort: an existing jobId index with other options (e.g. created
+        by the API side) or duplicate jobIds make this fail, which must not
+        stop the worker from starting.
+        """
+        try:
+            await self.jobs.create_index("jobId", unique=True)
+        except OperationFailure as e:
+            logger.warning(f"⚠️  Could not create jobId index: {e}")
+
+    @staticmethod
+    def _client_options() -> dict:
+        """Build pool and wire options for the Motor client from the environment"""
+        options = {
+            "maxPoolSize": int(os.getenv('MONGODB_MAX_POOL_SIZE', DEFAULT_MAX_POOL_SIZE)),
+            "minPoolSize": int(os.getenv('MONGODB_MIN_POOL_SIZE', DEFAULT_MIN_POOL_SIZE)),
+            "maxIdleTimeMS": int(os.getenv('MONGODB_MAX_IDLE_TIME_MS', DEFAULT_MAX_IDLE_TIME_MS)),
+            "serverSelectionTimeoutMS": int(
+                os.getenv('MONGODB_SERVER_SELECTION_TIMEOUT_MS', DEFAULT_SERVER_SELECTION_TIMEOUT_MS)
+            ),
+        }
+
+        # Wire compression is opt-in: zstd needs the zstandard package installed
+        compressors = os.getenv('MONGODB_COMPRESSORS')
+        if compressors:
+            options["compressors"] = compressors
+
+        return options
+
     async def update_job_status(self, job_id: str, status: str, progress: int = None, error: str = None):
-        """Update job status and progress"""
+        """
+        Update job status and progress
+
+        In-progress updates are merged into a per-job buffer and written by the
+        background flush (returns True once buffered). Terminal statuses and
+        errors are written immediately, together with anything still buffered.
+        """
+        now = datetime.now(timezone.utc)
         update_data = {
             "status": status,
-            "updatedAt": datetime.utcnow()
+            "updatedAt": now
         }
 
         if progress is not None:
             update_data["progress"] = progress
 
         if status == "processing" and progress == 0:
-            update_data["startedAt"] = datetime.utcnow()
+            update_data["startedAt"] = now
 
         if status == "completed":
-            update_data["completedAt"] = datetime.utcnow()
+            update_data["completedAt"] = now
             update_data["progress"] = 100
 
         if error:
             update_data["error"] = error
 
+        pending = self._pending_updates.setdefault(job_id, {})
+        pending.update(update_data)
+
+        if self._flush_task is not None and status not in TERMINAL_STATUSES and not error:
+            return True
+
+        return await self._write_pending(job_id)
+
+    async def flush(self, job_id: str = None) -> None:
+        """Write buffered status updates now (one job, or all jobs)"""
+        job_ids = [job_id] if job_id is not None else list(self._pending_updates)
+        await self._write_pending(*job_ids)
+
+    async def _write_pending(self, *job_ids: str) -> bool:
+        """
+        Write the jobs' buffered updates (one $set each) in a single bulk_write
+
+        If the write fails (or is cancelled) the updates go back into the
+        buffer for the next flush; fields updated again in the meantime keep
+        their newer values.
+        """
+        async with self._write_lock:
+            writing = {}
+            for job_id in job_ids:
+                update_data = self._pending_updates.pop(job_id, None)
+                if update_data:
+                    writing[job_id] = update_data
+
+            if not writing:
+                return False
+
+            requests = [
+                UpdateOne({"jobId": job_id}, {"$set": update_data})
+                for job_id, update_data in writing.items()
+            ]
+            try:
+                # Updates touch different jobs, so the server may apply them in any order
+                result = await self.jobs.bulk_write(requests, ordered=False)
+            except BaseException:
+                for job_id, update_data in writing.items():
+                    newer = self._pending_updates.get(job_id)
+                    if newer:
+                        update_data.update(newer)
+                    self._pending_updates[job_id] = update_data
+                raise
+
+        return result.modified_count > 0
+
+    async def _flush_loop(self) -> None:
+        """Background task: flush buffered status updates every interval"""
+        while True:
+            await asyncio.sleep(self._flush_interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"❌ Failed to flush job status updates: {e}")
+
+    async def add_version(self, job_id: str, version_data: dict):
+        """Add a new version to the job"""
         result = await self.jobs.update_one(
             {"jobId": job_id},
-            {"$set": update_data}
+            {
+                "$push": {
+                    "versions": version_data
+                },
+                "$inc": {
+                    "usage.storageBytes": version_data.get("sizeBytes", 0)
+                },
+                "$set": {
+                    "usage.lastUsed": datetime.now(timezone.utc)
+                }
+            }
         )
 
         return result.modified_count > 0
 
-    async def add_version(self, job_id: str, version_data: dict):
-        """Add a new version to the job"""
+    async def complete_with_version(self, job_id: str, version_data: dict):
+        """Add a new version and mark the job completed in a single update"""
+        # Land any buffered progress first so it cannot overwrite the completion
+        await self.flush(job_id)
+
+        now = datetime.now(timezone.utc)
         result = await self.jobs.update_one(
             {"jobId": job_id},
             {
@@ -74,20 +220,42 @@ class JobDatabase:
                     "usage.storageBytes": version_data.get("sizeBytes", 0)
                 },
                 "$set": {
-                    "usage.lastUsed": datetime.utcnow()
+                    "status": "completed",
+                    "progress": 100,
+                    "completedAt": now,
+                    "updatedAt": now,
+                    "usage.lastUsed": now
                 }
             }
         )
 
         return result.modified_count > 0
 
-    async def get_job(self, job_id: str):
-        """Get job by ID"""
-        return await self.jobs.find_one({"jobId": job_id})
+    async def get_job(self, job_id: str, projection: dict = None):
+        """Get job by ID (optionally only the fields in projection)"""
+        return await self.jobs.find_one({"jobId": job_id}, projection)
 
     async def close(self):
-        """Close MongoDB connection"""
+        """
+        Flush buffered status updates and close MongoDB connection
+
+        The background flush is stopped first (a write it had in flight is
+        put back into the buffer), then everything buffered is written
+        before the client closes.
+        """
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+
         if self.client:
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"❌ Failed to flush job status updates: {e}")
             self.client.close()
 
 # Global database instance
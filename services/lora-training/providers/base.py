@@ -4,15 +4,37 @@ Abstract base class for LoRA training providers.
 Defines the interface that all training providers must implement.
 """
 
+import asyncio
+import os
 from abc import ABC, abstractmethod
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Dict, Optional, Tuple
 from dataclasses import dataclass
 
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+IMAGE_SUFFIXES = (".jpg", ".jpeg", ".png")
+CAPTION_SUFFIXES = (".txt",)
+
+# Dataset counts remembered per provider (oldest evicted first)
+DATASET_COUNT_CACHE_SIZE = 128
+
+
+def _count_files(directory: Path, suffixes: Tuple[str, ...]) -> int:
+    """
+    Count files in directory with one of suffixes (single scandir pass).
+
+    The name test runs first: it is a single C-level endswith over the
+    suffix tuple, and is_file() may need a stat call on some filesystems.
+    """
+    with os.scandir(directory) as entries:
+        return sum(
+            1 for entry in entries
+            if entry.name.lower().endswith(suffixes) and entry.is_file()
+        )
+
 
 @dataclass
 class TrainingResult:
@@ -50,6 +72,9 @@ class TrainingProvider(ABC):
         """
         self.api_key = api_key
 
+        # (dataset path, images mtime, captions mtime) -> (image count, caption count)
+        self._dataset_counts: Dict[Tuple[str, int, int], Tuple[int, int]] = {}
+
     @abstractmethod
     def train(
         self,
@@ -101,34 +126,90 @@ class TrainingProvider(ABC):
         """
         dataset_path = Path(dataset_path)
 
-        # Check directory exists
-        if not dataset_path.exists():
-            logger.error(f"Dataset path does not exist: {dataset_path}")
-            return False
-
-        # Check for images directory
+        # One stat per directory: existence and the mtimes that key the count cache
         images_dir = dataset_path / "images"
-        if not images_dir.exists():
-            logger.error(f"Images directory not found: {images_dir}")
+        try:
+            images_mtime = images_dir.stat().st_mtime_ns
+        except FileNotFoundError:
+            # Check directory exists
+            if not dataset_path.exists():
+                logger.error(f"Dataset path does not exist: {dataset_path}")
+            else:
+                logger.error(f"Images directory not found: {images_dir}")
             return False
 
         # Check for captions directory (optional for some providers)
         captions_dir = dataset_path / "captions"
-        has_captions = captions_dir.exists()
-
-        # Count images
-        image_files = list(images_dir.glob("*.jpg")) + list(images_dir.glob("*.png"))
-        if not image_files:
+        try:
+            captions_mtime = captions_dir.stat().st_mtime_ns
+            has_captions = True
+        except FileNotFoundError:
+            captions_mtime = 0
+            has_captions = False
+
+        # Count images and captions (reused while neither directory changes)
+        image_count, caption_count = self._count_dataset(
+            images_dir,
+            captions_dir if has_captions else None,
+            images_mtime,
+            captions_mtime
+        )
+        if not image_count:
             logger.error(f"No images found in {images_dir}")
             return False
 
         # Check captions if directory exists
-        if has_captions:
-            caption_files = list(captions_dir.glob("*.txt"))
-            if len(caption_files) != len(image_files):
-                logger.warning(
-                    f"Caption count ({len(caption_files)}) != image count ({len(image_files)})"
-                )
-
-        logger.info(f"✓ Dataset validated: {len(image_files)} images")
+        if has_captions and caption_count != image_count:
+            logger.warning(
+                f"Caption count ({caption_count}) != image count ({image_count})"
+            )
+
+        logger.info(f"✓ Dataset validated: {image_count} images")
         return True
+
+    async def validate_dataset_async(self, dataset_path: Path) -> bool:
+        """
+        Validate a dataset from async code without blocking the event loop.
+
+        Runs validate_dataset (directory checks and scans) in a worker thread.
+
+        Args:
+            dataset_path: Path to dataset directory
+
+        Returns:
+            True if valid, False otherwise
+        """
+        return await asyncio.to_thread(self.validate_dataset, dataset_path)
+
+    def _count_dataset(
+        self,
+        images_dir: Path,
+        captions_dir: Optional[Path],
+        images_mtime: int,
+        captions_mtime: int
+    ) -> Tuple[int, int]:
+        """
+        Count dataset images and captions, cached by directory mtimes.
+
+        Args:
+            images_dir: Dataset images directory
+            captions_dir: Dataset captions directory (None if absent)
+            images_mtime: images_dir st_mtime_ns
+            captions_mtime: captions_dir st_mtime_ns (0 if absent)
+
+        Returns:
+            Tuple of (image count, caption count)
+        """
+        key = (str(images_dir), images_mtime, captions_mtime)
+
+        counts = self._dataset_counts.get(key)
+        if counts is None:
+            counts = (
+                _count_files(images_dir, IMAGE_SUFFIXES),
+                _count_files(captions_dir, CAPTION_SUFFIXES) if captions_dir else 0
+            )
+            self._dataset_counts[key] = counts
+            if len(self._dataset_counts) > DATASET_COUNT_CACHE_SIZE:
+                del self._dataset_counts[next(iter(self._dataset_counts))]
+
+        return counts
@@ -4,17 +4,216 @@ fal.ai training provider implementation.
 Handles LoRA training using fal.ai's API.
 """
 
+import io
+import mmap
 import os
-import zipfile
 import tempfile
+import zipfile
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, Optional
+from typing import BinaryIO, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+import httpx
 
-from providers.base import TrainingProvider, TrainingResult, TrainingConfig
+from providers.base import IMAGE_SUFFIXES, TrainingProvider, TrainingResult, TrainingConfig
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+# Datasets up to this size are zipped in memory and uploaded from the buffer;
+# larger ones are streamed. Every train worker (TRAINING_TRAIN_WORKERS) may
+# hold one such archive at a time, so keep this small
+ZIP_IN_MEMORY_LIMIT = 32 * 1024 * 1024
+
+# Larger datasets are streamed to fal.ai storage as a multipart upload while
+# the archive is built: part size, and parts in flight at once
+MULTIPART_PART_SIZE = 16 * 1024 * 1024
+MULTIPART_MAX_IN_FLIGHT = 4
+UPLOAD_TIMEOUT = 120.0
+
+# Threads that map images ahead of the zip writer, and how many mapped images
+# may wait for it at once
+ZIP_MAP_WORKERS = min(8, os.cpu_count() or 1)
+ZIP_MAP_AHEAD = 2 * ZIP_MAP_WORKERS
+
+# Provider instances kept by create_fal_provider (one per API key)
+PROVIDER_CACHE_SIZE = 8
+
+
+def _zip_images_fast(images_dir: Path, zip_path: Union[Path, BinaryIO]) -> int:
+    """
+    Zip dataset images into the archive root without recompressing them.
+
+    JPEG/PNG data is already compressed, so DEFLATE only burns CPU for a
+    few percent of size; images are stored as-is (ZIP_STORED).
+
+    Args:
+        images_dir: Directory containing the dataset images
+        zip_path: Destination zip file (path or writable binary file object)
+
+    Returns:
+        Number of images added
+    """
+    count = 0
+    with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_STORED) as zipf, \
+            ThreadPoolExecutor(max_workers=ZIP_MAP_WORKERS, thread_name_prefix="zip-map") as executor:
+        # Worker threads stat and map the next few images (and start their
+        # readahead) while this thread CRCs and writes the current one;
+        # ZipFile itself is only touched from here
+        for zinfo, data in _read_ahead(executor, _map_stored, _image_entries(images_dir)):
+            # Add to zip root (not in subdirectory)
+            _write_stored(zipf, zinfo, data)
+            count += 1
+    return count
+
+
+def _read_ahead(executor: ThreadPoolExecutor, fn: Callable, items: Iterable) -> Iterator:
+    """Map fn over items in executor, in order, with a bounded number in flight."""
+    pending = deque()
+    for item in items:
+        pending.append(executor.submit(fn, item))
+        if len(pending) >= ZIP_MAP_AHEAD:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def _map_stored(entry: os.DirEntry) -> Tuple[zipfile.ZipInfo, Optional[mmap.mmap]]:
+    """
+    Build the stored-entry header for an image and memory-map its contents.
+
+    Returns:
+        Tuple of (ZipInfo, read-only mapping or None for an empty file)
+    """
+    zinfo = zipfile.ZipInfo.from_file(entry.path, entry.name)
+    zinfo.compress_type = zipfile.ZIP_STORED
+    if zinfo.file_size == 0:
+        return zinfo, None  # mmap cannot map an empty file
+
+    with open(entry.path, "rb") as src:
+        mm = mmap.mmap(src.fileno(), 0, access=mmap.ACCESS_READ)
+    if hasattr(mm, "madvise"):
+        mm.madvise(mmap.MADV_WILLNEED)
+    return zinfo, mm
+
+
+def _write_stored(zipf: zipfile.ZipFile, zinfo: zipfile.ZipInfo, data: Optional[mmap.mmap]) -> None:
+    """
+    Add one mapped file to the archive uncompressed.
+
+    The mapping is written as one buffer, so zipfile computes its CRC32 in a
+    single zlib call over contiguous memory instead of one call per read
+    chunk.
+    """
+    with zipf.open(zinfo, "w") as dst:
+        if data is not None:
+            dst.write(data)
+            data.close()
+
+
+class _MultipartSink(io.RawIOBase):
+    """
+    Write-only stream that sends its contents as multipart upload parts.
+
+    Written bytes are cut into MULTIPART_PART_SIZE parts, uploaded on a small
+    thread pool (at most MULTIPART_MAX_IN_FLIGHT at once), so memory stays
+    bounded however large the stream gets. Not seekable, so ZipFile writes
+    data descriptors instead of seeking back to patch headers.
+    """
+
+    def __init__(self, multipart):
+        """
+        Initialize sink.
+
+        Args:
+            multipart: Initiated fal_client MultipartUpload
+        """
+        super().__init__()
+        self._multipart = multipart
+        self._buffer = bytearray()
+        self._part_number = 1
+        self._in_flight = deque()
+        self._executor = ThreadPoolExecutor(
+            max_workers=MULTIPART_MAX_IN_FLIGHT,
+            thread_name_prefix="fal-upload"
+        )
+        self.bytes_written = 0
+        self._completed = False
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        size = memoryview(data).nbytes
+        self._buffer += data
+        self.bytes_written += size
+
+        while len(self._buffer) >= MULTIPART_PART_SIZE:
+            self._send(bytes(self._buffer[:MULTIPART_PART_SIZE]))
+            del self._buffer[:MULTIPART_PART_SIZE]
+        return size
+
+    def _send(self, part: bytes) -> None:
+        """Queue one part for upload, waiting if too many are in flight."""
+        if len(self._in_flight) >= MULTIPART_MAX_IN_FLIGHT:
+            self._in_flight.popleft().result()
+        self._in_flight.append(
+            self._executor.submit(self._multipart.upload_part, self._part_number, part)
+        )
+        self._part_number += 1
+
+    def finish(self) -> str:
+        """
+        Upload the remaining bytes and complete the multipart upload.
+
+        Returns:
+            URL of the uploaded object
+        """
+        if self._buffer or self._part_number == 1:
+            self._send(bytes(self._buffer))
+            self._buffer.clear()
+        while self._in_flight:
+            self._in_flight.popleft().result()
+        url = self._multipart.complete()
+        self._completed = True
+        return url
+
+    def close(self) -> None:
+        """
+        Stop the part uploads.
+
+        If the upload was not completed (zipping or a part failed), parts not
+        yet started are cancelled and buffered bytes dropped. fal.ai storage
+        has no abort call, so the uncompleted upload is left to expire
+        unpublished.
+        """
+        if not self.closed:
+            if not self._completed:
+                for future in self._in_flight:
+                    future.cancel()
+                self._in_flight.clear()
+                self._buffer = bytearray()
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            if not self._completed and self._part_number > 1:
+                logger.warning(f"Abandoned incomplete multipart upload {self._multipart.upload_id}")
+        super().close()
+
+
+def _image_entries(images_dir: Path) -> List[os.DirEntry]:
+    """Dataset image entries in images_dir (one scandir pass, no Path per file)."""
+    with os.scandir(images_dir) as entries:
+        return [
+            entry for entry in entries
+            if entry.name.lower().endswith(IMAGE_SUFFIXES) and entry.is_file()
+        ]
+
+
+def _images_size(images_dir: Path) -> int:
+    """Total size in bytes of the images that go into the dataset archive."""
+    return sum(entry.stat().st_size for entry in _image_entries(images_dir))
+
 
 class FalAIProvider(TrainingProvider):
     """fal.ai training provider."""
@@ -33,13 +232,73 @@ class FalAIProvider(TrainingProvider):
 
         # Import fal client
         try:
-            from fal_client import subscribe
-            self.fal_subscribe = subscribe
+            from fal_client import InProgress, SyncClient
+
+            # One client per provider (and so per API key): its HTTP
+            # connection pool is reused by every job instead of reconnecting
+            self.fal_client = SyncClient(key=api_key)
+            self.fal_subscribe = self.fal_client.subscribe
+            self._InProgress = InProgress
         except ImportError:
             raise ImportError(
                 "fal-client not installed. Install with: pip install fal-client"
             )
 
+        # Storage token manager for streamed multipart uploads (created on first use)
+        self._cdn_tokens = None
+
+    def _start_multipart(self, client: httpx.Client, file_name: str, content_type: str):
+        """
+        Open a multipart upload in fal.ai storage.
+
+        Args:
+            client: HTTP client used for the part requests
+            file_name: Name of the uploaded object
+            content_type: MIME type of the uploaded object
+
+        Returns:
+            Initiated fal_client MultipartUpload
+
+        Raises:
+            ImportError, AttributeError, TypeError: If fal_client's private
+                multipart API moved or changed (see upload_dataset's fallback)
+        """
+        from fal_client.auth import AuthCredentials
+        from fal_client.client import CDNTokenManager, MultipartUpload
+
+        # Storage tokens are refreshed by the manager; keep it across uploads
+        if self._cdn_tokens is None:
+            self._cdn_tokens = CDNTokenManager(AuthCredentials("Key", self.api_key))
+
+        multipart = MultipartUpload(
+            file_name=file_name,
+            client=client,
+            token_manager=self._cdn_tokens,
+            chunk_size=MULTIPART_PART_SIZE,
+            content_type=content_type
+        )
+        multipart.create()
+        return multipart
+
+    def _upload_zip_file(self, images_dir: Path) -> str:
+        """
+        Zip images to a temporary file and upload it with fal_client's public API.
+
+        Args:
+            images_dir: Directory of images to archive
+
+        Returns:
+            URL to uploaded zip file
+        """
+        with tempfile.TemporaryDirectory(prefix="fal-dataset-") as tmp:
+            zip_path = Path(tmp) / "dataset.zip"
+            image_count = _zip_images_fast(images_dir, zip_path)
+            logger.info(
+                f"Created zip archive ({image_count} images, "
+                f"{zip_path.stat().st_size / 1024 / 1024:.2f} MB)"
+            )
+            return self.fal_client.upload_file(zip_path)
+
     def upload_dataset(self, dataset_path: Path) -> str:
         """
         Upload dataset to fal.ai storage as zip file.
@@ -54,33 +313,52 @@ class FalAIProvider(TrainingProvider):
             Exception: If upload fails
         """
         try:
-            from fal_client import upload_file
-
             logger.info(f"Packaging dataset for upload: {dataset_path}")
 
-            # Create temporary zip file
-            with tempfile.NamedTemporaryFile(suffix=".zip", delete=False) as tmp_zip:
-                zip_path = Path(tmp_zip.name)
-
             # Zip the images directory
             images_dir = dataset_path / "images"
             if not images_dir.exists():
                 raise ValueError(f"Images directory not found: {images_dir}")
 
-            with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_DEFLATED) as zipf:
-                for image_file in images_dir.glob("*"):
-                    if image_file.suffix.lower() in [".jpg", ".jpeg", ".png"]:
-                        # Add to zip root (not in subdirectory)
-                        zipf.write(image_file, image_file.name)
-
-            logger.info(f"Created zip archive: {zip_path} ({zip_path.stat().st_size / 1024 / 1024:.2f} MB)")
-
-            # Upload to fal.ai
-            logger.info("Uploading to fal.ai...")
-            url = upload_file(zip_path)
-
-            # Cleanup
-            zip_path.unlink()
+            total_size = _images_size(images_dir)
+
+            if total_size <= ZIP_IN_MEMORY_LIMIT:
+                # Small dataset: build the archive in memory, no disk round-trip
+                buffer = io.BytesIO()
+                image_count = _zip_images_fast(images_dir, buffer)
+                # With no getbuffer() view open, getvalue() hands over the
+                # buffer's own bytes object instead of copying the archive
+                data = buffer.getvalue()
+                buffer.close()
+
+                logger.info(f"Created zip archive in memory ({image_count} images, {len(data) / 1024 / 1024:.2f} MB)")
+
+                # Upload to fal.ai
+                logger.info("Uploading to fal.ai...")
+                url = self.fal_client.upload(data, "application/zip", file_name="dataset.zip")
+            else:
+                # Large dataset: stream the archive into a multipart upload
+                # while it is being built (no temporary zip file on disk)
+                logger.info("Streaming zip archive to fal.ai...")
+                with httpx.Client(timeout=UPLOAD_TIMEOUT) as client:
+                    try:
+                        multipart = self._start_multipart(client, "dataset.zip", "application/zip")
+                    except (ImportError, AttributeError, TypeError) as e:
+                        logger.warning(f"fal_client multipart upload unavailable ({e}), using a temporary zip file")
+                        multipart = None
+
+                    if multipart is not None:
+                        with _MultipartSink(multipart) as sink:
+                            image_count = _zip_images_fast(images_dir, sink)
+                            url = sink.finish()
+
+                        logger.info(
+                            f"Streamed zip archive ({image_count} images, "
+                            f"{sink.bytes_written / 1024 / 1024:.2f} MB)"
+                        )
+
+                if multipart is None:
+                    url = self._upload_zip_file(images_dir)
 
             logger.info(f"✓ Dataset uploaded: {url}")
             return url
@@ -141,11 +419,12 @@ class FalAIProvider(TrainingProvider):
             logger.info("Submitting training job to fal.ai...")
 
             # Callback for queue updates
+            in_progress = self._InProgress
+
             def on_queue_update(update):
                 """Handle queue update events."""
                 try:
-                    import fal_client
-                    if isinstance(update, fal_client.InProgress):
+                    if isinstance(update, in_progress):
                         for log in update.logs:
                             if isinstance(log, dict) and "message" in log:
                                 logger.info(f"  [fal.ai] {log['message']}")
@@ -225,4 +504,10 @@ def create_fal_provider(api_key: Optional[str] = None) -> FalAIProvider:
             "No fal.ai API key provided. Set FAL_KEY environment variable or pass api_key argument."
         )
 
+    return _cached_fal_provider(api_key)
+
+
+@lru_cache(maxsize=PROVIDER_CACHE_SIZE)
+def _cached_fal_provider(api_key: str) -> FalAIProvider:
+    """One FalAIProvider per API key, reused across jobs."""
     return FalAIProvider(api_key)
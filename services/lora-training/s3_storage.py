@@ -4,9 +4,69 @@ S3 storage utilities for training artifacts
 
 import boto3
 import os
+import tarfile
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from importlib.util import find_spec
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional
-import requests
+from typing import Optional, Tuple
+
+from utils.download import download_file, get_session
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Multipart settings for uploads and streamed copies (URL → S3 without a
+# local copy): objects over 16 MB go up as parallel 16 MB parts
+TRANSFER_CONFIG = TransferConfig(
+    multipart_threshold=16 * 1024 * 1024,
+    multipart_chunksize=16 * 1024 * 1024,
+    max_concurrency=8,
+    use_threads=True
+)
+
+# Integrity checksum sent with uploads: CRC32C (hardware-accelerated) needs
+# the awscrt package; CRC32 is built into botocore
+CHECKSUM_ALGORITHM = 'CRC32C' if find_spec('awscrt') else 'CRC32'
+
+# Connections kept per client: covers upload_directory workers plus the
+# multipart threads of concurrent transfers
+MAX_POOL_CONNECTIONS = int(os.getenv('S3_MAX_POOL_CONNECTIONS', 64))
+
+# Concurrent uploads in upload_directory, shared by every caller in the process
+# (one pooled connection each)
+UPLOAD_WORKERS = int(os.getenv('S3_UPLOAD_WORKERS', 16))
+
+# Content-Type by file extension (anything else is application/octet-stream)
+CONTENT_TYPES = {
+    '.safetensors': 'application/octet-stream',
+    '.json': 'application/json',
+    '.jpg': 'image/jpeg',
+    '.jpeg': 'image/jpeg',
+    '.png': 'image/png',
+    '.mp4': 'video/mp4',
+    '.tar': 'application/x-tar',
+}
+
+# Directory archives are built in memory up to this size, then spill to disk
+ARCHIVE_SPOOL_SIZE = 64 * 1024 * 1024
+
+# get_file_size results are reused for this long, for this many keys (oldest
+# evicted first); uploads through this class drop the key's entry
+FILE_SIZE_CACHE_TTL = 60.0
+FILE_SIZE_CACHE_SIZE = 1024
+
+CLIENT_CONFIG = Config(
+    max_pool_connections=MAX_POOL_CONNECTIONS,
+    retries={'max_attempts': 5, 'mode': 'adaptive'},
+    tcp_keepalive=True,
+    s3={'addressing_style': 'virtual'}
+)
 
 class S3Storage:
     """S3 client for uploading/downloading training artifacts"""
@@ -16,10 +76,22 @@ class S3Storage:
             's3',
             aws_access_key_id=os.getenv('AWS_ACCESS_KEY_ID'),
             aws_secret_access_key=os.getenv('AWS_SECRET_ACCESS_KEY'),
-            region_name=os.getenv('AWS_REGION', 'us-east-1')
+            region_name=os.getenv('AWS_REGION', 'us-east-1'),
+            config=CLIENT_CONFIG
         )
         self.bucket = os.getenv('AWS_S3_BUCKET', 'content-generation-assets')
 
+        # Long-lived upload pool: no thread start-up per dataset, and concurrent
+        # jobs share UPLOAD_WORKERS instead of each adding their own
+        self._upload_executor = ThreadPoolExecutor(
+            max_workers=UPLOAD_WORKERS,
+            thread_name_prefix="s3-upload"
+        )
+
+        # s3_key -> (size, time cached)
+        self._file_sizes: "OrderedDict[str, Tuple[int, float]]" = OrderedDict()
+        self._file_sizes_lock = threading.Lock()
+
     def upload_file(self, local_path: str, s3_key: str) -> str:
         """
         Upload a file to S3
@@ -31,38 +103,122 @@ class S3Storage:
         Returns:
             Public URL of uploaded file
         """
+        self._forget_file_size(s3_key)
         try:
-            # Determine content type
-            content_type = 'application/octet-stream'
-            if local_path.endswith('.safetensors'):
-                content_type = 'application/octet-stream'
-            elif local_path.endswith('.json'):
-                content_type = 'application/json'
-            elif local_path.endswith('.jpg') or local_path.endswith('.jpeg'):
-                content_type = 'image/jpeg'
-            elif local_path.endswith('.png'):
-                content_type = 'image/png'
-            elif local_path.endswith('.mp4'):
-                content_type = 'video/mp4'
-
             self.s3_client.upload_file(
                 local_path,
                 self.bucket,
                 s3_key,
-                ExtraArgs={'ContentType': content_type}
+                ExtraArgs=self._extra_args(local_path),
+                Config=TRANSFER_CONFIG
             )
 
             # Return public URL
-            return f"https://{self.bucket}.s3.amazonaws.com/{s3_key}"
+            return self._public_url(s3_key)
+
+        except Exception as e:
+            logger.error("Error uploading to S3: %s", e)
+            raise
+
+    def upload_bytes(self, data: bytes, s3_key: str) -> str:
+        """
+        Upload in-memory content to S3 (small objects, single request)
+
+        Args:
+            data: Object content
+            s3_key: S3 key (path in bucket)
+
+        Returns:
+            Public URL of uploaded object
+        """
+        self._forget_file_size(s3_key)
+        try:
+            self.s3_client.put_object(
+                Bucket=self.bucket,
+                Key=s3_key,
+                Body=data,
+                **self._extra_args(s3_key)
+            )
+            return self._public_url(s3_key)
+
+        except Exception as e:
+            logger.error("Error uploading to S3: %s", e)
+            raise
+
+    def upload_from_url(self, url: str, s3_key: str) -> Tuple[str, int]:
+        """
+        Stream a URL straight into S3 without writing it to local disk
+
+        The HTTP response body is fed to a multipart upload as it arrives;
+        s3:// sources are copied server-side.
+
+        Args:
+            url: Source URL (s3://... or https://...)
+            s3_key: Destination S3 key
+
+        Returns:
+            Tuple of (public URL, size in bytes)
+        """
+        extra_args = self._extra_args(s3_key)
+        self._forget_file_size(s3_key)
+
+        try:
+            if url.startswith('s3://'):
+                parts = url.replace('s3://', '').split('/', 1)
+                source = {'Bucket': parts[0], 'Key': parts[1] if len(parts) > 1 else ''}
+
+                self.s3_client.copy(
+                    source,
+                    self.bucket,
+                    s3_key,
+                    ExtraArgs=extra_args,
+                    Config=TRANSFER_CONFIG
+                )
+                size = self.get_file_size(s3_key)
+            else:
+                response = get_session().get(url, stream=True, timeout=300)
+                response.raise_for_status()
+                response.raw.decode_content = True
+
+                with response:
+                    body = _CountingReader(response.raw)
+                    self.s3_client.upload_fileobj(
+                        body,
+                        self.bucket,
+                        s3_key,
+                        ExtraArgs=extra_args,
+                        Config=TRANSFER_CONFIG
+                    )
+                size = body.bytes_read
+
+            return self._public_url(s3_key), size
 
         except Exception as e:
-            print(f"Error uploading to S3: {e}")
+            logger.error("Error streaming %s to S3: %s", url, e)
             raise
 
+    def _extra_args(self, path: str) -> dict:
+        """Upload ExtraArgs (content type and checksum) for a file or key"""
+        return {
+            'ContentType': self._content_type(path),
+            'ChecksumAlgorithm': CHECKSUM_ALGORITHM
+        }
+
+    def _content_type(self, path: str) -> str:
+        """Determine content type from file extension"""
+        return CONTENT_TYPES.get(os.path.splitext(path)[1].lower(), 'application/octet-stream')
+
+    def _public_url(self, s3_key: str) -> str:
+        """Public URL for an object in our bucket"""
+        return f"https://{self.bucket}.s3.amazonaws.com/{s3_key}"
+
     def upload_directory(self, local_dir: str, s3_prefix: str) -> list:
         """
         Upload entire directory to S3
 
+        Files are uploaded concurrently on the shared upload pool (up to
+        UPLOAD_WORKERS at a time across all callers).
+
         Args:
             local_dir: Local directory path
             s3_prefix: S3 prefix (folder)
@@ -70,19 +226,52 @@ class S3Storage:
         Returns:
             List of uploaded file URLs
         """
-        uploaded_files = []
-        local_path = Path(local_dir)
+        # (local path, S3 key) for every file, from one scan
+        uploads = [
+            (file_path, f"{s3_prefix}/{relative_path}")
+            for file_path, relative_path in _walk_files(local_dir)
+        ]
+        if not uploads:
+            return []
 
-        for file_path in local_path.rglob('*'):
-            if file_path.is_file():
-                # Calculate relative path
-                relative_path = file_path.relative_to(local_path)
-                s3_key = f"{s3_prefix}/{relative_path}"
+        return list(self._upload_executor.map(lambda upload: self.upload_file(*upload), uploads))
 
-                url = self.upload_file(str(file_path), s3_key)
-                uploaded_files.append(url)
+    def upload_directory_archive(self, local_dir: str, s3_key: str) -> Tuple[str, int]:
+        """
+        Upload a directory to S3 as a single tar object
 
-        return uploaded_files
+        One (multipart) upload instead of one PUT per file. The archive is
+        uncompressed: images are already compressed and captions are tiny.
+
+        Args:
+            local_dir: Local directory path
+            s3_key: S3 key of the archive (e.g. .../dataset.tar)
+
+        Returns:
+            Tuple of (public URL, archive size in bytes)
+        """
+        with tempfile.SpooledTemporaryFile(max_size=ARCHIVE_SPOOL_SIZE) as archive:
+            with tarfile.open(fileobj=archive, mode='w') as tar:
+                for file_path, relative_path in sorted(_walk_files(local_dir), key=lambda f: f[1]):
+                    tar.add(file_path, arcname=relative_path)
+
+            size = archive.tell()
+            archive.seek(0)
+
+            self._forget_file_size(s3_key)
+            try:
+                self.s3_client.upload_fileobj(
+                    archive,
+                    self.bucket,
+                    s3_key,
+                    ExtraArgs=self._extra_args(s3_key),
+                    Config=TRANSFER_CONFIG
+                )
+            except Exception as e:
+                logger.error("Error uploading archive to S3: %s", e)
+                raise
+
+        return self._public_url(s3_key), size
 
     def download_file(self, s3_key: str, local_path: str):
         """Download a file from S3"""
@@ -93,13 +282,17 @@ class S3Storage:
                 local_path
             )
         except Exception as e:
-            print(f"Error downloading from S3: {e}")
+            logger.error("Error downloading from S3: %s", e)
             raise
 
     def download_from_url(self, url: str, local_path: str):
         """
         Download file from URL (supports both S3 and HTTP/HTTPS)
 
+        Note: the training pipeline no longer downloads http(s)/s3 videos
+        (VideoProcessor streams them into ffmpeg), so it does not go through
+        this method for those sources.
+
         Args:
             url: Source URL (s3://... or https://...)
             local_path: Local destination path
@@ -110,27 +303,81 @@ class S3Storage:
             bucket = parts[0]
             key = parts[1] if len(parts) > 1 else ''
 
-            self.s3_client.download_file(bucket, key, local_path)
-        else:
-            # HTTP/HTTPS download
-            response = requests.get(url, stream=True)
-            response.raise_for_status()
-
+            # Size is known up front: reserve the whole file so the parallel
+            # part writes don't fragment it
+            size = self.s3_client.head_object(Bucket=bucket, Key=key)['ContentLength']
             with open(local_path, 'wb') as f:
-                for chunk in response.iter_content(chunk_size=8192):
-                    f.write(chunk)
+                if size and hasattr(os, 'posix_fallocate'):
+                    os.posix_fallocate(f.fileno(), 0, size)
+                self.s3_client.download_fileobj(bucket, key, f, Config=TRANSFER_CONFIG)
+        else:
+            # HTTP/HTTPS download: concurrent byte ranges into a preallocated
+            # file when the server advertises Accept-Ranges and a length,
+            # otherwise one stream (both over the shared keep-alive session)
+            download_file(url, Path(local_path))
 
     def get_file_size(self, s3_key: str) -> int:
-        """Get size of file in S3"""
+        """
+        Get size of file in S3
+
+        Sizes are cached for FILE_SIZE_CACHE_TTL seconds; failed lookups
+        (returned as 0) are not cached.
+        """
+        now = time.monotonic()
+        with self._file_sizes_lock:
+            cached = self._file_sizes.get(s3_key)
+            if cached is not None and now - cached[1] < FILE_SIZE_CACHE_TTL:
+                self._file_sizes.move_to_end(s3_key)
+                return cached[0]
+
         try:
             response = self.s3_client.head_object(
                 Bucket=self.bucket,
                 Key=s3_key
             )
-            return response['ContentLength']
         except Exception as e:
-            print(f"Error getting file size: {e}")
+            logger.error("Error getting file size: %s", e)
             return 0
 
+        size = response['ContentLength']
+        with self._file_sizes_lock:
+            self._file_sizes[s3_key] = (size, now)
+            self._file_sizes.move_to_end(s3_key)
+            while len(self._file_sizes) > FILE_SIZE_CACHE_SIZE:
+                self._file_sizes.popitem(last=False)
+        return size
+
+    def _forget_file_size(self, s3_key: str) -> None:
+        """Drop the cached size of an object that is being (re)written"""
+        with self._file_sizes_lock:
+            self._file_sizes.pop(s3_key, None)
+
+def _walk_files(local_dir: str) -> list:
+    """
+    (path, path relative to local_dir) of every file under local_dir
+
+    One scandir pass per directory: file types come from the directory
+    entries, so no per-file stat is needed.
+    """
+    files = []
+    for root, _, names in os.walk(local_dir):
+        relative_root = os.path.relpath(root, local_dir)
+        for name in names:
+            relative_path = name if relative_root == '.' else f"{relative_root}/{name}"
+            files.append((os.path.join(root, name), relative_path))
+    return files
+
+class _CountingReader:
+    """File-like wrapper that counts bytes read from a stream"""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.bytes_read = 0
+
+    def read(self, size: int = -1) -> bytes:
+        data = self.stream.read(size)
+        self.bytes_read += len(data)
+        return data
+
 # Global S3 instance
 s3_storage = S3Storage()
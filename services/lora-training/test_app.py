@@ -4,87 +4,90 @@ TDD approach - tests written first
 """
 
 import pytest
-from httpx import AsyncClient, ASGITransport
+import pytest_asyncio
+
+httpx = pytest.importorskip("httpx")
+
 from app import app
 
-@pytest.mark.asyncio
-async def test_health_check():
+# All tests share one client (and one event loop) for the module
+pytestmark = pytest.mark.asyncio(loop_scope="module")
+
+
+@pytest_asyncio.fixture(scope="module", loop_scope="module")
+async def client():
+    """HTTP client bound to the app, reused across the module's tests"""
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        yield client
+
+async def test_health_check(client):
     """Test health check endpoint"""
-    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
-        response = await client.get("/health")
+    response = await client.get("/health")
 
-        assert response.status_code == 200
-        data = response.json()
-        assert data["status"] == "healthy"
-        assert data["service"] == "lora-training-worker"
-        assert "timestamp" in data
+    assert response.status_code == 200
+    data = response.json()
+    assert data["status"] == "healthy"
+    assert data["service"] == "lora-training-worker"
+    assert "timestamp" in data
 
-@pytest.mark.asyncio
-async def test_train_endpoint_accepts_valid_request():
+async def test_train_endpoint_accepts_valid_request(client):
     """Test that train endpoint accepts valid training request"""
-    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
-        payload = {
-            "job_id": "test-job-123",
-            "user_id": "test-user",
-            "video_url": "https://example.com/video.mp4",
-            "lora_name": "test_lora",
-            "trigger": "person",
-            "steps": 2500,
-            "learning_rate": 0.00009
-        }
-
-        response = await client.post("/train", json=payload)
-
-        assert response.status_code == 200
-        data = response.json()
-        assert data["job_id"] == "test-job-123"
-        assert data["status"] in ["processing", "queued"]
-
-@pytest.mark.asyncio
-async def test_train_endpoint_uses_defaults():
+    payload = {
+        "job_id": "test-job-123",
+        "user_id": "test-user",
+        "video_url": "https://example.com/video.mp4",
+        "lora_name": "test_lora",
+        "trigger": "person",
+        "steps": 2500,
+        "learning_rate": 0.00009
+    }
+
+    response = await client.post("/train", json=payload)
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["job_id"] == "test-job-123"
+    assert data["status"] in ["processing", "queued"]
+
+async def test_train_endpoint_uses_defaults(client):
     """Test that optional parameters use defaults"""
-    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
-        payload = {
-            "job_id": "test-job-456",
-            "user_id": "test-user",
-            "video_url": "https://example.com/video.mp4",
-            "lora_name": "test_lora"
-            # No trigger, steps, learning_rate
-        }
+    payload = {
+        "job_id": "test-job-456",
+        "user_id": "test-user",
+        "video_url": "https://example.com/video.mp4",
+        "lora_name": "test_lora"
+        # No trigger, steps, learning_rate
+    }
 
-        response = await client.post("/train", json=payload)
+    response = await client.post("/train", json=payload)
 
-        assert response.status_code == 200
+    assert response.status_code == 200
 
-@pytest.mark.asyncio
-async def test_train_endpoint_validates_required_fields():
+async def test_train_endpoint_validates_required_fields(client):
     """Test that missing required fields return 422"""
-    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
-        payload = {
-            "job_id": "test-job-789",
-            "user_id": "test-user"
-            # Missing video_url and lora_name
-        }
+    payload = {
+        "job_id": "test-job-789",
+        "user_id": "test-user"
+        # Missing video_url and lora_name
+    }
 
-        response = await client.post("/train", json=payload)
+    response = await client.post("/train", json=payload)
 
-        assert response.status_code == 422  # FastAPI validation error
+    assert response.status_code == 422  # FastAPI validation error
 
-@pytest.mark.asyncio
-async def test_train_endpoint_validates_steps_range():
+async def test_train_endpoint_validates_steps_range(client):
     """Test that steps are validated (1000-10000)"""
-    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
-        payload = {
-            "job_id": "test-job-999",
-            "user_id": "test-user",
-            "video_url": "https://example.com/video.mp4",
-            "lora_name": "test_lora",
-            "steps": 100  # Too low
-        }
-
-        response = await client.post("/train", json=payload)
-
-        assert response.status_code == 422
+    payload = {
+        "job_id": "test-job-999",
+        "user_id": "test-user",
+        "video_url": "https://example.com/video.mp4",
+        "lora_name": "test_lora",
+        "steps": 100  # Too low
+    }
+
+    response = await client.post("/train", json=payload)
+
+    assert response.status_code == 422
 
 # TODO: Add integration tests that:
 # - Mock MongoDB updates
@@ -14,8 +14,9 @@ os.environ['NODE_ENV'] = 'test'
 @pytest.fixture
 def mock_fal_provider():
     """Mock fal.ai provider to avoid $6/training cost"""
-    with patch('providers.fal_ai.create_fal_provider') as mock_create:
+    with patch('training_pipeline.create_fal_provider') as mock_create:
         mock_provider = Mock()
+        mock_provider.validate_dataset_async = AsyncMock(return_value=True)
         mock_provider.train = Mock(return_value=Mock(
             lora_url='https://mock-fal-cdn.com/trained-lora.safetensors',
             config_url='https://mock-fal-cdn.com/config.json',
@@ -28,20 +29,23 @@ def mock_fal_provider():
 @pytest.fixture
 def mock_s3_storage():
     """Mock S3 operations"""
-    with patch('s3_storage.s3_storage') as mock_s3:
-        mock_s3.upload_file = Mock(return_value='https://mock-s3.com/uploaded-file.safetensors')
+    with patch('training_pipeline.s3_storage') as mock_s3:
+        # LoRA is piped from the provider URL: (public URL, size 125MB)
+        mock_s3.upload_from_url = Mock(return_value=('https://mock-s3.com/uploaded-file.safetensors', 125000000))
+        mock_s3.upload_bytes = Mock(return_value='https://mock-s3.com/config.json')
+        mock_s3.upload_directory_archive = Mock(return_value=('https://mock-s3.com/dataset.tar', 1000000))
         mock_s3.upload_directory = Mock(return_value=['https://mock-s3.com/file1.jpg'])
         mock_s3.download_from_url = Mock()  # No-op for downloads
-        mock_s3.get_file_size = Mock(return_value=125000000)  # 125MB
         yield mock_s3
 
 
 @pytest.fixture
 def mock_mongodb():
     """Mock MongoDB operations"""
-    with patch('db.db') as mock_db:
+    with patch('training_pipeline.db') as mock_db:
         mock_db.update_job_status = AsyncMock()
-        mock_db.add_version = AsyncMock()
+        mock_db.complete_with_version = AsyncMock()
+        mock_db.jobs.update_one = AsyncMock()
         mock_db.get_job = AsyncMock(return_value={
             'jobId': 'test-job-123',
             'userId': 'test-user',
@@ -56,9 +60,11 @@ def mock_mongodb():
 @pytest.fixture
 def mock_video_processor():
     """Mock video processing"""
-    with patch('core.video_processor.VideoProcessor') as mock_vp:
+    with patch('training_pipeline.VideoProcessor') as mock_vp:
         mock_instance = Mock()
-        mock_instance.process_video = Mock(return_value={
+        mock_instance.is_streamable = Mock(return_value=True)
+        mock_instance.process_video_async = AsyncMock(return_value={
+            "success": True,
             "frames": [f"/tmp/frame_{i:04d}.jpg" for i in range(25)],
             "video_id": "test-video",
             "frame_count": 25
@@ -68,13 +74,14 @@ def mock_video_processor():
 
 
 @pytest.fixture
-def mock_dataset_builder():
+def mock_dataset_builder(tmp_path):
     """Mock dataset building"""
-    with patch('core.dataset_builder.DatasetBuilder') as mock_db:
+    with patch('training_pipeline.DatasetBuilder') as mock_db:
         mock_instance = Mock()
+        mock_instance.output_dir = tmp_path
         mock_instance.build_dataset = Mock(return_value=Mock(
             dataset_dir='/tmp/mock-dataset',
-            frame_count=25,
+            image_count=25,
             caption_count=25
         ))
         mock_db.return_value = mock_instance
@@ -0,0 +1,84 @@
+"""
+Tests for buffered MongoDB status updates
+"""
+
+import pytest
+from unittest.mock import AsyncMock, Mock
+
+from db import JobDatabase
+
+
+@pytest.fixture
+def job_db():
+    """JobDatabase with a mocked collection and no background flush"""
+    database = JobDatabase()
+    database.jobs = Mock()
+    database.jobs.bulk_write = AsyncMock(return_value=Mock(modified_count=1))
+    return database
+
+
+async def test_write_pending_sends_one_bulk_write(job_db):
+    """Buffered updates for several jobs go out in one bulk_write"""
+    job_db._pending_updates = {"a": {"progress": 10}, "b": {"progress": 20}}
+
+    assert await job_db._write_pending("a", "b")
+
+    requests = job_db.jobs.bulk_write.call_args[0][0]
+    assert len(requests) == 2
+    assert job_db._pending_updates == {}
+
+
+async def test_write_pending_without_updates_skips_write(job_db):
+    """Nothing buffered, nothing written"""
+    assert not await job_db._write_pending("missing")
+    job_db.jobs.bulk_write.assert_not_called()
+
+
+async def test_write_pending_failure_keeps_updates(job_db):
+    """A failed bulk_write puts the updates back for the next flush"""
+    job_db._pending_updates = {"a": {"status": "processing", "progress": 10}}
+    job_db.jobs.bulk_write.side_effect = ConnectionError("primary stepped down")
+
+    with pytest.raises(ConnectionError):
+        await job_db._write_pending("a")
+
+    assert job_db._pending_updates == {"a": {"status": "processing", "progress": 10}}
+
+    # The next flush retries them
+    job_db.jobs.bulk_write.side_effect = None
+    await job_db.flush()
+    assert job_db._pending_updates == {}
+    assert job_db.jobs.bulk_write.await_count == 2
+
+
+async def test_write_pending_failure_keeps_newer_values(job_db):
+    """Fields updated while the write was in flight keep their newer values"""
+    job_db._pending_updates = {"a": {"status": "processing", "progress": 10, "startedAt": 1}}
+
+    async def fail_after_newer_update(requests, ordered):
+        job_db._pending_updates["a"] = {"progress": 20}
+        raise ConnectionError("timeout")
+
+    job_db.jobs.bulk_write.side_effect = fail_after_newer_update
+
+    with pytest.raises(ConnectionError):
+        await job_db._write_pending("a")
+
+    assert job_db._pending_updates == {
+        "a": {"status": "processing", "progress": 20, "startedAt": 1}
+    }
+
+
+async def test_terminal_status_is_written_immediately(job_db):
+    """A failed status goes out at once, with the buffered progress"""
+    job_db._flush_task = Mock()  # Background flush running
+    await job_db.update_job_status("a", "processing", progress=50)
+    job_db.jobs.bulk_write.assert_not_called()
+
+    await job_db.update_job_status("a", "failed", error="boom")
+
+    requests = job_db.jobs.bulk_write.call_args[0][0]
+    update = requests[0]._doc["$set"]
+    assert update["status"] == "failed"
+    assert update["progress"] == 50
+    assert update["error"] == "boom"
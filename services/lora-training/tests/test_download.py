@@ -0,0 +1,148 @@
+"""
+Tests for ranged and conditional HTTP downloads (local HTTP server, no network)
+"""
+
+import http.server
+import os
+import re
+import threading
+
+import pytest
+import requests
+
+from utils.download import NotModified, download_file, probe_url
+
+ETAG = '"v1"'
+
+
+class _Handler(http.server.BaseHTTPRequestHandler):
+    """Serves server.data with an ETag, honouring Range and If-None-Match"""
+
+    def log_message(self, *args):
+        pass
+
+    def _send_headers(self, status, length, extra=()):
+        self.send_response(status)
+        self.send_header("Content-Length", str(length))
+        self.send_header("ETag", ETAG)
+        if self.server.accept_ranges:
+            self.send_header("Accept-Ranges", "bytes")
+        for name, value in extra:
+            self.send_header(name, value)
+        self.end_headers()
+
+    def do_HEAD(self):
+        self.server.requests.append(("HEAD", None))
+        self._send_headers(200, len(self.server.data))
+
+    def do_GET(self):
+        byte_range = self.headers.get("Range")
+        self.server.requests.append(("GET", byte_range))
+        data = self.server.data
+
+        if self.headers.get("If-None-Match") == ETAG:
+            self.send_response(304)
+            self.end_headers()
+            return
+
+        match = re.fullmatch(r"bytes=(\d+)-(\d+)", byte_range or "")
+        if match and self.server.accept_ranges:
+            start, end = int(match[1]), int(match[2])
+            body = data[start:end + 1]
+            self._send_headers(206, len(body), [("Content-Range", f"bytes {start}-{end}/{len(data)}")])
+        else:
+            body = data
+            self._send_headers(200, len(body))
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def server():
+    """Threaded HTTP server on a free local port"""
+    httpd = http.server.ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    httpd.data = os.urandom(10_500)
+    httpd.accept_ranges = True
+    httpd.requests = []
+    httpd.url = f"http://127.0.0.1:{httpd.server_port}/model.safetensors"
+
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture
+def session():
+    """Private session, so the shared one is not left bound to the test server"""
+    with requests.Session() as session:
+        yield session
+
+
+def test_ranged_download_reassembles_parts(server, session, tmp_path):
+    """Concurrent ranges land at their offsets and cover the whole object"""
+    output = tmp_path / "model.safetensors"
+
+    size = download_file(server.url, output, multipart_chunksize=1000, max_concurrency=4, session=session)
+
+    assert size == len(server.data)
+    assert output.read_bytes() == server.data
+
+    ranges = sorted(r for method, r in server.requests if method == "GET")
+    assert len(ranges) == 11
+    assert "bytes=10000-10499" in ranges
+    assert [method for method, _ in server.requests].count("HEAD") == 1
+
+
+def test_download_reuses_probe(server, session, tmp_path):
+    """A probe passed in replaces download_file's own HEAD"""
+    remote = probe_url(server.url, session=session)
+    assert remote.etag == ETAG
+    assert remote.length == remote.ranged_size == len(server.data)
+
+    download_file(server.url, tmp_path / "out", multipart_chunksize=4096, session=session, remote=remote)
+
+    assert [method for method, _ in server.requests].count("HEAD") == 1
+
+
+def test_small_object_is_streamed(server, session, tmp_path):
+    """One part or less: a single plain GET"""
+    output = tmp_path / "out"
+
+    download_file(server.url, output, session=session)
+
+    assert output.read_bytes() == server.data
+    assert ("GET", None) in server.requests
+
+
+def test_not_modified_leaves_file_untouched(server, session, tmp_path):
+    """A 304 for the cached ETag raises NotModified without writing"""
+    server.accept_ranges = False
+    output = tmp_path / "out"
+    output.write_bytes(b"cached copy")
+
+    with pytest.raises(NotModified):
+        download_file(server.url, output, session=session, if_none_match=ETAG)
+
+    assert output.read_bytes() == b"cached copy"
+
+
+def test_changed_etag_downloads_again(server, session, tmp_path):
+    """A stale ETag gets the full body"""
+    server.accept_ranges = False
+    output = tmp_path / "out"
+
+    download_file(server.url, output, session=session, if_none_match='"v0"')
+
+    assert output.read_bytes() == server.data
+
+
+def test_without_range_support_is_streamed(server, session, tmp_path):
+    """No Accept-Ranges: one plain GET, however large"""
+    server.accept_ranges = False
+    output = tmp_path / "out"
+
+    download_file(server.url, output, multipart_chunksize=1000, session=session)
+
+    assert output.read_bytes() == server.data
+    assert [method for method, _ in server.requests] == ["HEAD", "GET"]
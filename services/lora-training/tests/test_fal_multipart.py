@@ -0,0 +1,165 @@
+"""
+Tests for streaming dataset zips into a fal.ai multipart upload
+"""
+
+import inspect
+import threading
+import zipfile
+
+import pytest
+from unittest.mock import Mock
+
+from providers import fal_ai
+from providers.fal_ai import FalAIProvider, _MultipartSink
+
+
+class FakeMultipartUpload:
+    """Records uploaded parts instead of sending them"""
+
+    upload_id = "upload-1"
+
+    def __init__(self, fail_part=None):
+        self.parts = {}
+        self.completed = False
+        self.fail_part = fail_part
+        self._lock = threading.Lock()
+
+    def upload_part(self, part_number, data):
+        if part_number == self.fail_part:
+            raise ConnectionError(f"part {part_number} failed")
+        with self._lock:
+            self.parts[part_number] = bytes(data)
+
+    def complete(self):
+        self.completed = True
+        return "https://fal.media/files/dataset.zip"
+
+    def body(self):
+        return b"".join(self.parts[n] for n in sorted(self.parts))
+
+
+@pytest.fixture(autouse=True)
+def small_parts(monkeypatch):
+    """10-byte parts so a few writes cut several of them"""
+    monkeypatch.setattr(fal_ai, "MULTIPART_PART_SIZE", 10)
+
+
+def test_writes_are_cut_into_full_parts():
+    """Every part but the last is exactly MULTIPART_PART_SIZE"""
+    multipart = FakeMultipartUpload()
+
+    with _MultipartSink(multipart) as sink:
+        sink.write(b"a" * 7)
+        sink.write(b"b" * 18)
+        sink.write(memoryview(b"c" * 10))
+        url = sink.finish()
+
+    assert url.endswith("dataset.zip")
+    assert multipart.completed
+    assert sorted(multipart.parts) == [1, 2, 3, 4]
+    assert [len(multipart.parts[n]) for n in (1, 2, 3, 4)] == [10, 10, 10, 5]
+    assert multipart.body() == b"a" * 7 + b"b" * 18 + b"c" * 10
+    assert sink.bytes_written == 35
+
+
+def test_exact_multiple_has_no_empty_tail():
+    """A stream ending on a part boundary sends no extra part"""
+    multipart = FakeMultipartUpload()
+
+    with _MultipartSink(multipart) as sink:
+        sink.write(b"x" * 20)
+        sink.finish()
+
+    assert sorted(multipart.parts) == [1, 2]
+
+
+def test_empty_stream_sends_one_part():
+    """Completing needs at least one part, even if empty"""
+    multipart = FakeMultipartUpload()
+
+    with _MultipartSink(multipart) as sink:
+        sink.finish()
+
+    assert multipart.parts == {1: b""}
+
+
+def test_zip_round_trip(tmp_path):
+    """ZipFile writes to the unseekable sink and the parts form a valid archive"""
+    multipart = FakeMultipartUpload()
+
+    with _MultipartSink(multipart) as sink:
+        with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_STORED) as zipf:
+            zipf.writestr("frame_0001.jpg", b"\xff\xd8" + b"1" * 50)
+            zipf.writestr("frame_0001.txt", "person")
+        sink.finish()
+
+    archive = tmp_path / "dataset.zip"
+    archive.write_bytes(multipart.body())
+    with zipfile.ZipFile(archive) as zipf:
+        assert zipf.read("frame_0001.txt") == b"person"
+
+
+def test_failed_stream_is_not_completed():
+    """Zipping fails partway: the upload is never completed"""
+    multipart = FakeMultipartUpload()
+
+    with pytest.raises(RuntimeError):
+        with _MultipartSink(multipart) as sink:
+            sink.write(b"x" * 45)
+            raise RuntimeError("unreadable image")
+
+    assert sink.closed
+    assert not multipart.completed
+    assert 5 not in multipart.parts  # Buffered tail dropped
+
+
+def test_failed_part_surfaces_on_finish():
+    """A part upload error is raised and the upload left incomplete"""
+    multipart = FakeMultipartUpload(fail_part=2)
+
+    with pytest.raises(ConnectionError):
+        with _MultipartSink(multipart) as sink:
+            sink.write(b"x" * 25)
+            sink.finish()
+
+    assert not multipart.completed
+
+
+def test_private_multipart_api_matches():
+    """_start_multipart's calls into fal_client internals still fit their signatures"""
+    auth = pytest.importorskip("fal_client.auth")
+    client = pytest.importorskip("fal_client.client")
+
+    inspect.signature(auth.AuthCredentials).bind("Key", "secret")
+    inspect.signature(client.CDNTokenManager).bind(Mock())
+    inspect.signature(client.MultipartUpload).bind(
+        file_name="dataset.zip", client=Mock(), token_manager=Mock(),
+        chunk_size=10, content_type="application/zip"
+    )
+    inspect.signature(client.MultipartUpload.create).bind(Mock())
+    inspect.signature(client.MultipartUpload.upload_part).bind(Mock(), 1, b"")
+    inspect.signature(client.MultipartUpload.complete).bind(Mock())
+
+
+def test_missing_multipart_api_falls_back_to_file_upload(tmp_path, monkeypatch):
+    """Without the private API, a large dataset goes through upload_file"""
+    pytest.importorskip("fal_client")
+    monkeypatch.setattr(fal_ai, "ZIP_IN_MEMORY_LIMIT", 0)
+    images_dir = tmp_path / "images"
+    images_dir.mkdir()
+    (images_dir / "frame_0001.jpg").write_bytes(b"\xff\xd8" + b"1" * 50)
+
+    monkeypatch.setenv("FAL_KEY", "key")  # Restored after the provider overwrites it
+    provider = FalAIProvider("key")
+    monkeypatch.setattr(provider, "_start_multipart", Mock(side_effect=ImportError("moved")))
+    uploaded = {}
+
+    def upload_file(path):
+        with zipfile.ZipFile(path) as zipf:
+            uploaded["names"] = zipf.namelist()
+        return "https://fal.media/files/dataset.zip"
+
+    provider.fal_client = Mock(upload_file=upload_file)
+
+    assert provider.upload_dataset(tmp_path).endswith("dataset.zip")
+    assert uploaded["names"] == ["frame_0001.jpg"]
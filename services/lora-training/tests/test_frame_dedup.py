@@ -0,0 +1,56 @@
+"""
+Tests for near-duplicate frame detection (dHash + Hamming distance)
+"""
+
+import numpy as np
+
+from utils.frame_dedup import FrameDeduper, dhash
+
+
+def test_dhash_is_64_bits_and_stable():
+    """Same image, same hash; a gradient sets every bit"""
+    gradient = np.tile(np.arange(0, 252, 28, dtype=np.uint8), (8, 1))
+
+    assert dhash(gradient) == dhash(gradient.copy())
+    assert dhash(gradient) == (1 << 64) - 1
+    assert dhash(gradient[:, ::-1]) == 0
+
+
+def test_dhash_ignores_colour_vs_gray():
+    """A BGR image hashes like its grayscale version"""
+    rng = np.random.default_rng(0)
+    gray = rng.integers(0, 256, (72, 81), dtype=np.uint8)
+    bgr = np.dstack([gray, gray, gray])
+
+    assert dhash(bgr) == dhash(gray)
+
+
+def test_deduper_drops_hashes_within_max_distance():
+    """Hashes up to max_distance bits away count as duplicates"""
+    deduper = FrameDeduper(max_distance=4)
+    base = 0x0F0F_0F0F_0F0F_0F0F
+
+    assert deduper.keep(base)
+    assert not deduper.keep(base)
+    assert not deduper.keep(base ^ 0b1111)         # 4 bits away
+    assert deduper.keep(base ^ 0b11111)            # 5 bits away
+    assert not deduper.keep(base ^ 0b11111 ^ 1)    # 1 bit from the kept one
+
+
+def test_deduper_zero_distance_keeps_any_change():
+    """max_distance=0 only drops exact repeats"""
+    deduper = FrameDeduper(max_distance=0)
+
+    assert deduper.keep(1)
+    assert deduper.keep(3)
+    assert not deduper.keep(1)
+
+
+def test_deduper_always_keeps_unhashable_frames():
+    """None (image could not be read) is kept and not remembered"""
+    deduper = FrameDeduper()
+
+    assert deduper.keep(None)
+    assert deduper.keep(None)
+    assert deduper.keep(0)
+    assert not deduper.keep(0)
@@ -0,0 +1,162 @@
+"""
+Tests for pipeline stage workers: hand-off, failure and shutdown cancellation
+"""
+
+import asyncio
+
+import pytest
+from unittest.mock import AsyncMock, Mock, patch
+
+import app
+from training_pipeline import TrainingJob
+
+
+@pytest.fixture
+def pipeline():
+    """Pipeline stub recording failures and cleanups"""
+    mock_pipeline = Mock()
+    mock_pipeline.fail_job = AsyncMock()
+    mock_pipeline.cleanup = Mock()
+    with patch("app.get_pipeline", return_value=mock_pipeline):
+        yield mock_pipeline
+
+
+def make_job(job_id="job-1"):
+    return TrainingJob(
+        job_id=job_id,
+        user_id="user-1",
+        video_url="https://example.com/video.mp4",
+        lora_name="test_lora"
+    )
+
+
+async def run_one(stage, job, outbox=None):
+    """Run a worker until it has handled one job, then stop it"""
+    inbox = asyncio.Queue()
+    await inbox.put(job)
+    worker = asyncio.create_task(app.stage_worker(stage, inbox, outbox))
+    await asyncio.wait_for(inbox.join(), timeout=5)
+    worker.cancel()
+    await asyncio.gather(worker, return_exceptions=True)
+
+
+async def test_successful_stage_hands_job_downstream(pipeline):
+    """The job moves to the outbox and is not cleaned up yet"""
+    job = make_job()
+    outbox = asyncio.Queue()
+
+    await run_one(AsyncMock(), job, outbox)
+
+    assert outbox.get_nowait() is job
+    pipeline.fail_job.assert_not_called()
+    pipeline.cleanup.assert_not_called()
+
+
+async def test_final_stage_cleans_up(pipeline):
+    """After the last stage the job's files are removed"""
+    job = make_job()
+    job.result = {"modelUrl": "https://mock-s3.com/model.safetensors"}
+
+    await run_one(AsyncMock(), job)
+
+    pipeline.cleanup.assert_called_once_with(job)
+
+
+async def test_failed_stage_fails_job_and_stops_it(pipeline):
+    """A stage error marks the job failed, cleans up and does not pass it on"""
+    job = make_job()
+    outbox = asyncio.Queue()
+    error = ValueError("Insufficient frames")
+
+    await run_one(AsyncMock(side_effect=error), job, outbox)
+
+    pipeline.fail_job.assert_awaited_once_with(job, error)
+    pipeline.cleanup.assert_called_once_with(job)
+    assert outbox.empty()
+
+
+async def test_failure_reporting_error_still_cleans_up(pipeline):
+    """MongoDB being down while reporting a failure does not leak files"""
+    job = make_job()
+    pipeline.fail_job.side_effect = ConnectionError("mongodb unavailable")
+
+    await run_one(AsyncMock(side_effect=ValueError("bad video")), job)
+
+    pipeline.cleanup.assert_called_once_with(job)
+
+
+async def test_worker_survives_failed_job(pipeline):
+    """One failed job does not stop the worker from taking the next"""
+    first, second = make_job("job-1"), make_job("job-2")
+    stage = AsyncMock(side_effect=[RuntimeError("boom"), None])
+    inbox, outbox = asyncio.Queue(), asyncio.Queue()
+    await inbox.put(first)
+    await inbox.put(second)
+
+    worker = asyncio.create_task(app.stage_worker(stage, inbox, outbox))
+    await asyncio.wait_for(inbox.join(), timeout=5)
+    worker.cancel()
+    await asyncio.gather(worker, return_exceptions=True)
+
+    assert outbox.get_nowait() is second
+
+
+async def test_cancelled_stage_fails_job(pipeline):
+    """Shutdown mid-stage marks the in-flight job failed, then propagates"""
+    job = make_job()
+    started = asyncio.Event()
+
+    async def slow_stage(job):
+        started.set()
+        await asyncio.sleep(3600)
+
+    inbox = asyncio.Queue()
+    await inbox.put(job)
+    worker = asyncio.create_task(app.stage_worker(slow_stage, inbox, asyncio.Queue()))
+    await asyncio.wait_for(started.wait(), timeout=5)
+
+    worker.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await worker
+
+    failed_job, error = pipeline.fail_job.await_args[0]
+    assert failed_job is job
+    assert str(error) == app.SHUTDOWN_ERROR
+    pipeline.cleanup.assert_called_once_with(job)
+
+
+async def test_cancelled_handoff_fails_job(pipeline):
+    """Shutdown while waiting on a full outbox also fails the job"""
+    job = make_job()
+    outbox = asyncio.Queue(maxsize=1)
+    outbox.put_nowait(make_job("blocking"))
+    stage = AsyncMock()
+
+    inbox = asyncio.Queue()
+    await inbox.put(job)
+    worker = asyncio.create_task(app.stage_worker(stage, inbox, outbox))
+    while not stage.await_count:
+        await asyncio.sleep(0)
+
+    worker.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await worker
+
+    pipeline.fail_job.assert_awaited_once()
+    assert pipeline.fail_job.await_args[0][0] is job
+
+
+async def test_abandon_queued_fails_waiting_jobs(pipeline):
+    """Jobs left in queues at shutdown are failed and the queues drained"""
+    first, second = asyncio.Queue(), asyncio.Queue()
+    jobs = [make_job("job-1"), make_job("job-2"), make_job("job-3")]
+    first.put_nowait(jobs[0])
+    first.put_nowait(jobs[1])
+    second.put_nowait(jobs[2])
+
+    await app.abandon_queued(first, second)
+
+    assert first.empty() and second.empty()
+    failed = {call.args[0].job_id for call in pipeline.fail_job.await_args_list}
+    assert failed == {"job-1", "job-2", "job-3"}
+    assert pipeline.cleanup.call_count == 3
@@ -2,8 +2,10 @@
 Test training pipeline with mocks (no real API calls = $0 cost)
 """
 
+import os
+
 import pytest
-from unittest.mock import Mock, patch, AsyncMock
+from unittest.mock import ANY, Mock, patch, AsyncMock
 from training_pipeline import TrainingPipeline
 
 
@@ -39,10 +41,11 @@ async def test_training_pipeline_completes_successfully(
 
     # Verify external services were called (but mocked)
     mock_fal_provider.train.assert_called_once()
-    assert mock_s3_storage.upload_file.called
-    assert mock_s3_storage.upload_directory.called
+    assert mock_s3_storage.upload_from_url.called
+    assert mock_s3_storage.upload_bytes.called
+    assert mock_s3_storage.upload_directory_archive.called or mock_s3_storage.upload_directory.called
     mock_mongodb.update_job_status.assert_called()
-    mock_mongodb.add_version.assert_called_once()
+    mock_mongodb.complete_with_version.assert_called_once()
 
 
 @pytest.mark.asyncio
@@ -58,7 +61,7 @@ async def test_training_pipeline_handles_insufficient_frames(
     # Mock dataset with too few frames
     mock_dataset_builder.build_dataset.return_value = Mock(
         dataset_dir='/tmp/mock',
-        frame_count=5,  # Less than MIN_FRAMES (15)
+        image_count=5,  # Less than min_frames
         caption_count=5
     )
 
@@ -78,7 +81,7 @@ async def test_training_pipeline_handles_insufficient_frames(
     mock_mongodb.update_job_status.assert_called_with(
         'test-job-789',
         'failed',
-        error=pytest.ANY
+        error=ANY
     )
 
 
@@ -102,7 +105,7 @@ async def test_webhook_called_on_success(
         'versions': []
     }
 
-    with patch('webhook_notifier.send_webhook', new_callable=AsyncMock) as mock_webhook:
+    with patch('training_pipeline.send_webhook', new_callable=AsyncMock) as mock_webhook:
         mock_webhook.return_value = {"success": True, "attempts": 1}
 
         pipeline = TrainingPipeline()
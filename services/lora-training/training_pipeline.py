@@ -4,14 +4,17 @@ Orchestrates: video processing → dataset building → training → S3 upload 
 """
 
 import os
+import asyncio
 import tempfile
 import shutil
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, Any
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Any, Optional
 
-from config import Config
-from core.video_processor import VideoProcessor
+from config import get_config
+from core.video_processor import VideoProcessingError, VideoProcessor
 from core.dataset_builder import DatasetBuilder
 from providers.fal_ai import create_fal_provider
 from providers.base import TrainingConfig
@@ -19,13 +22,56 @@ from db import db
 from s3_storage import s3_storage
 from webhook_notifier import send_webhook, create_completion_payload, create_failure_payload
 
+# Job fields read by the pipeline (avoid fetching the full document):
+# existing versions for numbering, the rest for webhook payloads
+JOB_PROJECTION = {
+    "_id": 0, "jobId": 1, "userId": 1, "type": 1, "config": 1, "webhookUrl": 1,
+    "versions.version": 1
+}
+
+
+@dataclass
+class TrainingJob:
+    """State for one training job as it moves through the pipeline stages"""
+    job_id: str
+    user_id: str
+    video_url: str
+    lora_name: str
+    trigger: str = "person"
+    steps: int = 2500
+    learning_rate: float = 0.00009
+
+    # Filled in by the stages
+    job_doc: Optional[Dict[str, Any]] = None
+    temp_job_dir: Optional[str] = None
+    video_path: Optional[str] = None
+    dataset: Optional[Any] = None
+    training_result: Optional[Any] = None
+    result: Optional[Dict[str, Any]] = None
+
+    @property
+    def dataset_name(self) -> str:
+        """Dataset directory name: unique per job, since jobs sharing a lora_name run concurrently"""
+        return f"{self.lora_name}_{self.job_id}"
+
 
 class TrainingPipeline:
-    """End-to-end LoRA training pipeline"""
+    """End-to-end LoRA training pipeline
+
+    Split into stages so a worker pool per stage can overlap jobs:
+    download → build (frames, dataset, dataset upload) → train (fal.ai)
+    → store (model upload, MongoDB version, webhook). Persisting a result
+    does not hold up the next job's training.
+    Blocking work runs in threads to keep the event loop free.
+    """
 
     def __init__(self):
-        self.config = Config.from_env()
-        self.video_processor = VideoProcessor(temp_dir=self.config.temp_dir)
+        self.config = get_config()
+        self.video_processor = VideoProcessor(
+            temp_dir=self.config.temp_dir,
+            in_memory_frames=self.config.in_memory_frames,
+            hwaccel=self.config.hwaccel
+        )
         self.dataset_builder = DatasetBuilder(output_dir=self.config.dataset_dir)
         self.provider = create_fal_provider()
 
@@ -40,191 +86,261 @@ class TrainingPipeline:
         learning_rate: float = 0.00009
     ) -> Dict[str, Any]:
         """
-        Process full training pipeline
+        Process full training pipeline (all stages, one job)
 
         Returns:
             Dictionary with modelUrl, s3Key, sizeBytes
         """
-        temp_job_dir = None
+        job = TrainingJob(
+            job_id=job_id,
+            user_id=user_id,
+            video_url=video_url,
+            lora_name=lora_name,
+            trigger=trigger,
+            steps=steps,
+            learning_rate=learning_rate
+        )
 
         try:
-            # Update status: processing
-            await db.update_job_status(job_id, "processing", progress=0)
-            print(f"🚀 Starting training for job {job_id}")
-
-            # Create temporary directory for this job
-            temp_job_dir = tempfile.mkdtemp(prefix=f"lora_job_{job_id}_")
-            temp_video_path = os.path.join(temp_job_dir, "source_video.mp4")
-
-            # Step 1: Download video
-            print(f"📥 Downloading video from {video_url}")
-            await db.update_job_status(job_id, "processing", progress=10)
-            s3_storage.download_from_url(video_url, temp_video_path)
-
-            # Step 2: Extract frames
-            print(f"🎬 Extracting frames from video")
-            await db.update_job_status(job_id, "processing", progress=20)
-            video_result = self.video_processor.process_video(
-                video_url=temp_video_path,
-                video_id=job_id
-            )
-
-            # Step 3: Build dataset with quality filtering
-            print(f"📦 Building training dataset")
-            await db.update_job_status(job_id, "processing", progress=35)
-            dataset = self.dataset_builder.build_dataset(
-                frames=video_result["frames"],
-                dataset_name=lora_name,
-                trigger_phrase=trigger,
-                filter_quality=True
-            )
+            await self.download_stage(job)
+            await self.build_stage(job)
+            await self.train_stage(job)
+            return await self.store_stage(job)
 
-            if dataset.frame_count < self.config.min_frames:
-                raise ValueError(
-                    f"Insufficient frames after filtering: {dataset.frame_count} "
-                    f"(minimum: {self.config.min_frames})"
-                )
+        except Exception as e:
+            await self.fail_job(job, e)
+            raise
 
-            print(f"✅ Dataset ready: {dataset.frame_count} frames")
+        finally:
+            await asyncio.to_thread(self.cleanup, job)
+
+    async def download_stage(self, job: TrainingJob) -> None:
+        """Stage 1: mark the job as processing and download the source video"""
+        # Update status: processing
+        await db.update_job_status(job.job_id, "processing", progress=0)
+        print(f"🚀 Starting training for job {job.job_id}")
+
+        # Create temporary directory for this job
+        job.temp_job_dir = tempfile.mkdtemp(prefix=f"lora_job_{job.job_id}_")
+        job.video_path = os.path.join(job.temp_job_dir, "source_video.mp4")
+
+        # Step 1: Download video (http/https/s3 sources are streamed into
+        # ffmpeg during the build stage instead, overlapping transfer with
+        # decode, so only other sources are fetched here)
+        await db.update_job_status(job.job_id, "processing", progress=10)
+        if self.video_processor.is_streamable(job.video_url):
+            print(f"📡 Video will be streamed from {job.video_url}")
+            job.video_path = job.video_url
+        else:
+            print(f"📥 Downloading video from {job.video_url}")
+            await asyncio.to_thread(s3_storage.download_from_url, job.video_url, job.video_path)
+
+    async def build_stage(self, job: TrainingJob) -> None:
+        """Stage 2: extract frames, build the dataset and upload it to S3"""
+        job_id = job.job_id
+
+        # Step 2: Extract frames
+        print(f"🎬 Extracting frames from video")
+        await db.update_job_status(job_id, "processing", progress=20)
+        video_result = await self.video_processor.process_video_async(
+            video_url=job.video_path,
+            video_id=job_id
+        )
+
+        # Streamed sources fail here (404, expired URL, bad key): report the
+        # real error rather than an empty frame table
+        if not video_result["success"]:
+            raise VideoProcessingError(f"Video processing failed: {video_result['error']}")
+
+        # Step 3: Build dataset with quality filtering
+        print(f"📦 Building training dataset")
+        await db.update_job_status(job_id, "processing", progress=35)
+        dataset = await asyncio.to_thread(
+            self.dataset_builder.build_dataset,
+            frames=video_result["frames"],
+            dataset_name=job.dataset_name,
+            trigger_phrase=job.trigger,
+            filter_quality=True
+        )
+
+        if dataset.image_count < self.config.min_frames:
+            raise ValueError(
+                f"Insufficient frames after filtering: {dataset.image_count} "
+                f"(minimum: {self.config.min_frames})"
+            )
 
-            # Step 4: Upload dataset to S3
-            print(f"☁️  Uploading dataset to S3")
-            await db.update_job_status(job_id, "processing", progress=50)
-            dataset_s3_prefix = f"datasets/{user_id}/{job_id}"
-            dataset_urls = s3_storage.upload_directory(
+        # Check the dataset off the event loop before spending an S3 upload
+        # on it (the provider's own check at train time reuses the counts)
+        if not await self.provider.validate_dataset_async(dataset.dataset_dir):
+            raise ValueError("Dataset validation failed")
+
+        print(f"✅ Dataset ready: {dataset.image_count} frames")
+        job.dataset = dataset
+
+        # Step 4: Upload dataset to S3
+        print(f"☁️  Uploading dataset to S3")
+        await db.update_job_status(job_id, "processing", progress=50)
+        dataset_s3_prefix = f"datasets/{job.user_id}/{job_id}"
+        if self.config.dataset_archive:
+            # One tar object: a single multipart upload instead of a PUT per file
+            dataset_url, dataset_size = await asyncio.to_thread(
+                s3_storage.upload_directory_archive,
+                dataset.dataset_dir,
+                f"{dataset_s3_prefix}/dataset.tar"
+            )
+            print(f"✅ Uploaded dataset archive to S3 ({dataset_size} bytes): {dataset_url}")
+        else:
+            dataset_urls = await asyncio.to_thread(
+                s3_storage.upload_directory,
                 dataset.dataset_dir,
                 dataset_s3_prefix
             )
             print(f"✅ Uploaded {len(dataset_urls)} files to S3")
 
-            # Step 5: Train LoRA via fal.ai
-            print(f"🧠 Starting LoRA training ({steps} steps)")
-            await db.update_job_status(job_id, "processing", progress=60)
-
-            training_config = TrainingConfig(
-                steps=steps,
-                learning_rate=learning_rate,
-                trigger_phrase=trigger
-            )
-
-            training_result = self.provider.train(
-                dataset_path=dataset.dataset_dir,
-                config=training_config,
-                dataset_name=lora_name
-            )
-
-            print(f"✅ Training complete! LoRA URL: {training_result.lora_url}")
-
-            # Step 6: Download trained LoRA
-            print(f"📥 Downloading trained LoRA model")
-            await db.update_job_status(job_id, "processing", progress=85)
-            temp_lora_path = os.path.join(temp_job_dir, f"{lora_name}.safetensors")
-            s3_storage.download_from_url(training_result.lora_url, temp_lora_path)
-
-            # Step 7: Upload to our S3 bucket (versioned)
-            print(f"☁️  Uploading LoRA to S3")
-            await db.update_job_status(job_id, "processing", progress=95)
-
-            # Get current version number
-            job = await db.get_job(job_id)
-            version = len(job.get('versions', [])) + 1
-
-            lora_s3_key = f"loras/{user_id}/{job_id}/v{version}/model.safetensors"
-            lora_public_url = s3_storage.upload_file(temp_lora_path, lora_s3_key)
-
-            # Also upload config
-            config_s3_key = f"loras/{user_id}/{job_id}/v{version}/config.json"
-            config_local_path = os.path.join(temp_job_dir, "config.json")
-
-            import json
-            with open(config_local_path, 'w') as f:
-                json.dump({
-                    "lora_name": lora_name,
-                    "trigger": trigger,
-                    "steps": steps,
-                    "learning_rate": learning_rate,
-                    "frame_count": dataset.frame_count,
-                    "trained_at": datetime.utcnow().isoformat()
-                }, f, indent=2)
-
-            config_url = s3_storage.upload_file(config_local_path, config_s3_key)
-
-            # Get file size
-            lora_size = os.path.getsize(temp_lora_path)
-
-            print(f"✅ LoRA uploaded to S3: {lora_public_url}")
-
-            # Step 8: Update MongoDB with version
-            version_data = {
-                "version": version,
-                "modelUrl": lora_public_url,
-                "s3Key": lora_s3_key,
-                "sizeBytes": lora_size,
-                "createdAt": datetime.utcnow(),
-                "config": {
-                    "trigger": trigger,
-                    "steps": steps,
-                    "learning_rate": learning_rate,
-                    "frame_count": dataset.frame_count
-                }
-            }
-
-            await db.add_version(job_id, version_data)
-
-            # Step 9: Mark job as completed
-            await db.update_job_status(job_id, "completed", progress=100)
-
-            print(f"🎉 Job {job_id} completed successfully!")
-
-            result = {
-                "modelUrl": lora_public_url,
-                "s3Key": lora_s3_key,
-                "sizeBytes": lora_size,
-                "version": version
+    async def train_stage(self, job: TrainingJob) -> None:
+        """Stage 3: train via fal.ai"""
+        # Step 5: Train LoRA via fal.ai
+        print(f"🧠 Starting LoRA training ({job.steps} steps)")
+        await db.update_job_status(job.job_id, "processing", progress=60)
+
+        training_config = TrainingConfig(
+            steps=job.steps,
+            learning_rate=job.learning_rate,
+            trigger_phrase=job.trigger
+        )
+
+        job.training_result = await asyncio.to_thread(
+            self.provider.train,
+            dataset_path=job.dataset.dataset_dir,
+            config=training_config,
+            dataset_name=job.lora_name
+        )
+
+        print(f"✅ Training complete! LoRA URL: {job.training_result.lora_url}")
+
+    async def store_stage(self, job: TrainingJob) -> Dict[str, Any]:
+        """Stage 4: store the trained model in S3 and complete the job"""
+        job_id = job.job_id
+        user_id = job.user_id
+        lora_name = job.lora_name
+        trigger = job.trigger
+        steps = job.steps
+        learning_rate = job.learning_rate
+        dataset = job.dataset
+        training_result = job.training_result
+
+        # Get current version number. Read once, after training (which can
+        # take hours, during which the job may have gained versions); the
+        # webhook below and fail_job reuse this document
+        job.job_doc = await db.get_job(job_id, projection=JOB_PROJECTION)
+        job_doc = job.job_doc or {}
+        version = len(job_doc.get('versions', [])) + 1
+
+        # Step 6-7: Stream trained LoRA into our S3 bucket (versioned, no local
+        # copy) while the config is uploaded alongside it
+        print(f"☁️  Streaming trained LoRA to S3")
+        await db.update_job_status(job_id, "processing", progress=85)
+
+        lora_s3_key = f"loras/{user_id}/{job_id}/v{version}/model.safetensors"
+        config_s3_key = f"loras/{user_id}/{job_id}/v{version}/config.json"
+
+        import json
+        config_data = json.dumps({
+            "lora_name": lora_name,
+            "trigger": trigger,
+            "steps": steps,
+            "learning_rate": learning_rate,
+            "frame_count": dataset.image_count,
+            "trained_at": datetime.utcnow().isoformat()
+        }, indent=2).encode()
+
+        # Both uploads skip local disk: the LoRA is piped from the provider's
+        # URL into a multipart upload, the config goes up from memory
+        (lora_public_url, lora_size), config_url = await asyncio.gather(
+            asyncio.to_thread(s3_storage.upload_from_url, training_result.lora_url, lora_s3_key),
+            asyncio.to_thread(s3_storage.upload_bytes, config_data, config_s3_key)
+        )
+        await db.update_job_status(job_id, "processing", progress=95)
+
+        print(f"✅ LoRA uploaded to S3: {lora_public_url}")
+
+        # Step 8: Update MongoDB with version
+        version_data = {
+            "version": version,
+            "modelUrl": lora_public_url,
+            "s3Key": lora_s3_key,
+            "sizeBytes": lora_size,
+            "createdAt": datetime.utcnow(),
+            "config": {
+                "trigger": trigger,
+                "steps": steps,
+                "learning_rate": learning_rate,
+                "frame_count": dataset.image_count
             }
+        }
+
+        # Step 9: Mark job as completed (same update as the new version)
+        await db.complete_with_version(job_id, version_data)
+
+        print(f"🎉 Job {job_id} completed successfully!")
+
+        result = {
+            "modelUrl": lora_public_url,
+            "s3Key": lora_s3_key,
+            "sizeBytes": lora_size,
+            "version": version
+        }
+
+        # Step 10: Send webhook notification if configured
+        if job_doc.get('webhookUrl'):
+            print(f"📞 Sending completion webhook...")
+            webhook_result = await send_webhook(
+                job_doc['webhookUrl'],
+                create_completion_payload(job_doc, result)
+            )
 
-            # Step 10: Send webhook notification if configured
-            job = await db.get_job(job_id)
-            if job and job.get('webhookUrl'):
-                print(f"📞 Sending completion webhook...")
-                webhook_result = await send_webhook(
-                    job['webhookUrl'],
-                    create_completion_payload(job, result)
-                )
-
-                # Update webhook status in MongoDB
-                await db.jobs.update_one(
-                    {"jobId": job_id},
-                    {
-                        "$set": {
-                            "webhookAttempts": webhook_result.get("attempts", 0),
-                            "webhookLastError": webhook_result.get("error") if not webhook_result["success"] else None
-                        }
+            # Update webhook status in MongoDB
+            await db.jobs.update_one(
+                {"jobId": job_id},
+                {
+                    "$set": {
+                        "webhookAttempts": webhook_result.get("attempts", 0),
+                        "webhookLastError": webhook_result.get("error") if not webhook_result["success"] else None
                     }
-                )
-
-            return result
+                }
+            )
 
-        except Exception as e:
-            print(f"❌ Training failed: {e}")
-            await db.update_job_status(job_id, "failed", error=str(e))
-
-            # Send failure webhook if configured
-            job = await db.get_job(job_id)
-            if job and job.get('webhookUrl'):
-                print(f"📞 Sending failure webhook...")
-                await send_webhook(
-                    job['webhookUrl'],
-                    create_failure_payload(job, str(e))
-                )
+        job.result = result
+        return result
+
+    async def fail_job(self, job: TrainingJob, error: Exception) -> None:
+        """Mark a job as failed and send the failure webhook if configured"""
+        print(f"❌ Training failed: {error}")
+        await db.update_job_status(job.job_id, "failed", error=str(error))
+
+        # Send failure webhook if configured (fetched here unless the store
+        # stage already read the job)
+        job_doc = job.job_doc
+        if job_doc is None:
+            job_doc = await db.get_job(job.job_id, projection=JOB_PROJECTION)
+        if job_doc and job_doc.get('webhookUrl'):
+            print(f"📞 Sending failure webhook...")
+            await send_webhook(
+                job_doc['webhookUrl'],
+                create_failure_payload(job_doc, str(error))
+            )
 
-            raise
+    def cleanup(self, job: TrainingJob) -> None:
+        """Remove the job's temporary and dataset directories (blocking: call via asyncio.to_thread)"""
+        if job.temp_job_dir:
+            print(f"🧹 Cleaning up temporary files")
+            shutil.rmtree(job.temp_job_dir, ignore_errors=True)
 
-        finally:
-            # Cleanup temporary directory
-            if temp_job_dir and os.path.exists(temp_job_dir):
-                print(f"🧹 Cleaning up temporary files")
-                shutil.rmtree(temp_job_dir, ignore_errors=True)
+        # By now the dataset is in S3 and with the provider (or the job failed,
+        # possibly mid-build)
+        shutil.rmtree(self.dataset_builder.output_dir / job.dataset_name, ignore_errors=True)
 
-# Global pipeline instance
-pipeline = TrainingPipeline()
+@lru_cache(maxsize=1)
+def get_pipeline() -> TrainingPipeline:
+    """Get the global pipeline instance (created on first use)"""
+    return TrainingPipeline()
@@ -4,13 +4,40 @@ Image captioning utilities for LoRA training datasets.
 Generates captions for training images using templates or auto-captioning.
 """
 
+import re
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
-from typing import List, Optional
+from typing import List, Optional, Tuple
 
+from utils.files import link_or_copy, write_text_file
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+# Trailing frame number of an image stem (frame_0001 -> 0001)
+FRAME_INDEX_PATTERN = re.compile(r"(\d+)$")
+
+# Concurrent caption file writes per dataset
+CAPTION_WRITE_WORKERS = 8
+
+
+def write_captions(captions: List[Tuple[Path, str]]) -> None:
+    """
+    Write pre-rendered caption files concurrently.
+
+    Args:
+        captions: (caption file path, caption text) pairs
+    """
+    if len(captions) < 2:
+        for path, caption in captions:
+            write_text_file(path, caption)
+        return
+
+    with ThreadPoolExecutor(max_workers=min(CAPTION_WRITE_WORKERS, len(captions))) as executor:
+        # list() surfaces the first write error
+        list(executor.map(lambda item: write_text_file(*item), captions))
+
 
 class CaptionGenerator:
     """Generate captions for LoRA training images."""
@@ -39,6 +66,13 @@ class CaptionGenerator:
             "a headshot of {trigger}",
         ]
 
+        # trigger_phrase is fixed, so every caption is rendered once here
+        self._rendered_default = self.template.format(trigger=trigger_phrase)
+        self._rendered_variations = [
+            variation.format(trigger=trigger_phrase)
+            for variation in self.variation_templates
+        ]
+
     def generate_caption(self, image_path: Path, use_variations: bool = True) -> str:
         """
         Generate caption for an image.
@@ -53,17 +87,11 @@ class CaptionGenerator:
         if use_variations:
             # Cycle through variations based on image index
             # Extract number from filename (e.g., frame_0001.jpg -> 1)
-            try:
-                idx = int(image_path.stem.split("_")[-1])
-                template_idx = idx % len(self.variation_templates)
-                template = self.variation_templates[template_idx]
-            except (ValueError, IndexError):
-                template = self.template
-        else:
-            template = self.template
-
-        caption = template.format(trigger=self.trigger_phrase)
-        return caption
+            match = FRAME_INDEX_PATTERN.search(image_path.stem)
+            if match and self._rendered_variations:
+                return self._rendered_variations[int(match.group(1)) % len(self._rendered_variations)]
+
+        return self._rendered_default
 
     def generate_captions_for_dataset(
         self,
@@ -85,16 +113,14 @@ class CaptionGenerator:
         logger.info(f"Generating captions for {len(image_paths)} images...")
         output_dir.mkdir(parents=True, exist_ok=True)
 
-        caption_paths = []
-
-        for image_path in image_paths:
-            # Generate caption
-            caption = self.generate_caption(image_path, use_variations)
-
-            # Save caption file (same name as image, .txt extension)
-            caption_path = output_dir / f"{image_path.stem}.txt"
-            caption_path.write_text(caption)
-            caption_paths.append(caption_path)
+        # Render every caption first (same name as image, .txt extension),
+        # then write the files in one concurrent batch
+        captions = [
+            (output_dir / f"{image_path.stem}.txt", self.generate_caption(image_path, use_variations))
+            for image_path in image_paths
+        ]
+        write_captions(captions)
+        caption_paths = [caption_path for caption_path, _ in captions]
 
         logger.info(f"✓ Generated {len(caption_paths)} caption files")
         return caption_paths
@@ -124,27 +150,41 @@ class CaptionGenerator:
         images_dir.mkdir(parents=True, exist_ok=True)
         captions_dir.mkdir(parents=True, exist_ok=True)
 
-        # Copy images and generate captions
-        import shutil
-
+        # Stage images (hardlinked when possible) and generate captions
         copied_images = []
+        captions = []
         for i, image_path in enumerate(image_paths, 1):
-            # Copy image
+            # Stage image
             dest_image = images_dir / f"{i:04d}.jpg"
-            shutil.copy2(image_path, dest_image)
+            link_or_copy(image_path, dest_image)
             copied_images.append(dest_image)
 
             # Generate caption
             caption = self.generate_caption(image_path, use_variations)
-            caption_path = captions_dir / f"{i:04d}.txt"
-            caption_path.write_text(caption)
+            captions.append((captions_dir / f"{i:04d}.txt", caption))
 
             logger.info(f"  {i}/{len(image_paths)}: {dest_image.name} → '{caption}'")
 
+        write_captions(captions)
+
         logger.info(f"✓ Created dataset: {len(copied_images)} images + captions")
         return dataset_dir
 
 
+@lru_cache(maxsize=128)
+def get_caption_generator(trigger_phrase: str = "person") -> CaptionGenerator:
+    """
+    Get a shared CaptionGenerator for a trigger phrase.
+
+    Args:
+        trigger_phrase: Trigger word for LoRA activation
+
+    Returns:
+        Cached CaptionGenerator instance (default templates)
+    """
+    return CaptionGenerator(trigger_phrase=trigger_phrase)
+
+
 def create_simple_captions(
     image_paths: List[Path],
     trigger_phrase: str = "person",
@@ -158,10 +198,12 @@ def create_simple_captions(
         trigger_phrase: Trigger phrase for LoRA
         output_dir: Output directory (default: same as images)
     """
-    generator = CaptionGenerator(trigger_phrase=trigger_phrase)
-
-    for image_path in image_paths:
-        caption = generator.generate_caption(image_path, use_variations=False)
-        out_dir = output_dir or image_path.parent
-        caption_path = out_dir / f"{image_path.stem}.txt"
-        caption_path.write_text(caption)
+    generator = get_caption_generator(trigger_phrase)
+
+    write_captions([
+        (
+            (output_dir or image_path.parent) / f"{image_path.stem}.txt",
+            generator.generate_caption(image_path, use_variations=False)
+        )
+        for image_path in image_paths
+    ])
@@ -0,0 +1,379 @@
+"""
+HTTP download utilities.
+
+Downloads large artifacts (LoRA weights, configs, videos) using concurrent
+byte-range requests when the server supports them.
+"""
+
+import mmap
+import os
+import queue
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Multipart download tuning (same sizing as boto3 TransferConfig for S3)
+MULTIPART_CHUNKSIZE = 16 * 1024 * 1024
+MAX_CONCURRENCY = 10
+READ_CHUNK_SIZE = 1024 * 1024
+MAX_IO_QUEUE = 100  # Buffered chunks between network workers and the writer
+
+# O_DIRECT writes bypass the page cache; buffers and offsets must be aligned
+DIRECT_IO_ALIGNMENT = 4096
+DIRECT_IO_BLOCK_SIZE = 4 * 1024 * 1024
+
+# Connection pool sizing for the shared session
+POOL_CONNECTIONS = 16
+POOL_MAXSIZE = 32
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+
+class NotModified(Exception):
+    """Raised when a conditional GET returns 304 Not Modified."""
+    pass
+
+
+@dataclass(frozen=True)
+class RemoteInfo:
+    """What a HEAD request reported about a URL."""
+    url: str  # Final URL after redirects
+    etag: Optional[str] = None
+    length: Optional[int] = None
+    ranged_size: Optional[int] = None  # Set when concurrent byte ranges are possible
+
+
+def get_session() -> requests.Session:
+    """
+    Get the process-wide HTTP session.
+
+    Reusing one session keeps TCP/TLS connections alive across downloads
+    instead of paying a fresh handshake per request.
+
+    Returns:
+        Shared requests.Session instance
+    """
+    global _session
+
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(
+                    pool_connections=POOL_CONNECTIONS,
+                    pool_maxsize=POOL_MAXSIZE
+                )
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                _session = session
+
+    return _session
+
+
+def close_session() -> None:
+    """Close the shared HTTP session and its pooled connections."""
+    global _session
+
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+            _session = None
+
+
+def probe_url(
+    url: str,
+    session: Optional[requests.Session] = None,
+    timeout: int = 30
+) -> RemoteInfo:
+    """
+    HEAD a URL once for its cache validators and byte-range support.
+
+    The result can be handed to download_file so it does not HEAD again.
+
+    Args:
+        url: URL to check
+        session: HTTP session to use (default: shared session)
+        timeout: Request timeout in seconds
+
+    Returns:
+        RemoteInfo (only url set if the HEAD failed: some signed URLs only allow GET)
+    """
+    session = session or get_session()
+
+    try:
+        response = session.head(url, allow_redirects=True, timeout=timeout)
+        response.raise_for_status()
+    except requests.exceptions.RequestException as e:
+        logger.debug(f"HEAD failed for {url}: {e}")
+        return RemoteInfo(url=url)
+
+    headers = response.headers
+    try:
+        length = int(headers["Content-Length"])
+    except (KeyError, ValueError):
+        length = None
+
+    ranged = (
+        headers.get("Accept-Ranges", "").lower() == "bytes"
+        and not headers.get("Content-Encoding")
+        and length is not None
+    )
+
+    return RemoteInfo(
+        url=response.url if ranged else url,
+        etag=headers.get("ETag"),
+        length=length,
+        ranged_size=length if ranged else None
+    )
+
+
+def download_file(
+    url: str,
+    output_path: Path,
+    timeout: int = 300,
+    max_concurrency: int = MAX_CONCURRENCY,
+    multipart_chunksize: int = MULTIPART_CHUNKSIZE,
+    session: Optional[requests.Session] = None,
+    direct_io: bool = False,
+    if_none_match: Optional[str] = None,
+    remote: Optional[RemoteInfo] = None
+) -> int:
+    """
+    Download a URL to a local file.
+
+    Issues a HEAD request first (unless remote is given). If the server
+    accepts byte ranges and the object spans more than one part, parts are
+    fetched concurrently and written in place; otherwise the body is
+    streamed in a single request.
+
+    Args:
+        url: URL to download
+        output_path: Local destination path
+        timeout: Per-request timeout in seconds
+        max_concurrency: Maximum number of concurrent range requests
+        multipart_chunksize: Size of each byte range
+        session: HTTP session to use (default: shared session)
+        direct_io: Write ranged downloads with O_DIRECT, bypassing the page
+            cache (for large write-once artifacts; falls back to buffered
+            writes where the filesystem does not support it)
+        if_none_match: ETag of the copy already on disk; a streamed GET is
+            made conditional on it
+        remote: Result of an earlier probe_url(url) to reuse instead of a HEAD
+
+    Returns:
+        Number of bytes written
+
+    Raises:
+        requests.exceptions.RequestException: If a request fails
+        IOError: If a range response is incomplete
+        NotModified: If the server reports the content unchanged (output_path untouched)
+    """
+    session = session or get_session()
+    if remote is None:
+        remote = probe_url(url, session=session, timeout=timeout)
+
+    size = remote.ranged_size
+    if size is not None and size > multipart_chunksize:
+        return _download_ranges(
+            session,
+            remote.url,
+            Path(output_path),
+            size,
+            timeout,
+            max_concurrency,
+            multipart_chunksize,
+            direct_io
+        )
+
+    return _download_stream(session, url, Path(output_path), timeout, if_none_match)
+
+
+def _download_stream(
+    session: requests.Session,
+    url: str,
+    output_path: Path,
+    timeout: int,
+    if_none_match: Optional[str] = None
+) -> int:
+    """Download with a single streaming GET."""
+    headers = {"If-None-Match": if_none_match} if if_none_match else None
+    response = session.get(url, stream=True, timeout=timeout, headers=headers)
+    if response.status_code == 304:
+        response.close()
+        raise NotModified(url)
+    response.raise_for_status()
+
+    # Copy straight from the raw stream in large reads (content decoding kept)
+    with response:
+        response.raw.decode_content = True
+        with open(output_path, "wb") as f:
+            shutil.copyfileobj(response.raw, f, READ_CHUNK_SIZE)
+            return f.tell()
+
+
+def _download_ranges(
+    session: requests.Session,
+    url: str,
+    output_path: Path,
+    size: int,
+    timeout: int,
+    max_concurrency: int,
+    multipart_chunksize: int,
+    direct_io: bool = False
+) -> int:
+    """Download with concurrent byte-range GETs into a pre-allocated file."""
+    ranges: List[Tuple[int, int]] = [
+        (start, min(start + multipart_chunksize, size) - 1)
+        for start in range(0, size, multipart_chunksize)
+    ]
+
+    # Every range must start on an aligned offset for O_DIRECT
+    direct_io = direct_io and multipart_chunksize % DIRECT_IO_BLOCK_SIZE == 0
+    fd = _open_output(output_path, direct_io)
+    if fd is None:
+        direct_io = False
+        fd = _open_output(output_path, False)
+
+    try:
+        _preallocate(fd, size)
+
+        # Network workers hand chunks to a single writer thread so disk
+        # writes overlap with reads; the bounded queue applies back-pressure.
+        queue_size = MAX_IO_QUEUE
+        if direct_io:
+            queue_size = max(4, MAX_IO_QUEUE * READ_CHUNK_SIZE // DIRECT_IO_BLOCK_SIZE)
+        write_queue: "queue.Queue[Optional[Tuple[int, bytes]]]" = queue.Queue(maxsize=queue_size)
+        write_errors: List[OSError] = []
+
+        def write() -> None:
+            while True:
+                item = write_queue.get()
+                if item is None:
+                    return
+                if write_errors:
+                    continue  # Keep draining so producers never block
+                offset, data = item
+                try:
+                    _pwrite_all(fd, data, offset)
+                except OSError as e:
+                    write_errors.append(e)
+
+        def fetch(byte_range: Tuple[int, int]) -> None:
+            start, end = byte_range
+            response = session.get(
+                url,
+                headers={"Range": f"bytes={start}-{end}"},
+                stream=True,
+                timeout=timeout
+            )
+            response.raise_for_status()
+            if response.status_code != 206:
+                raise IOError(f"Server ignored range request (status {response.status_code})")
+
+            if direct_io:
+                offset = fetch_aligned(response, start)
+            else:
+                offset = start
+                for chunk in response.iter_content(chunk_size=READ_CHUNK_SIZE):
+                    if write_errors:
+                        raise write_errors[0]
+                    if chunk:
+                        write_queue.put((offset, chunk))
+                        offset += len(chunk)
+
+            if offset != end + 1:
+                raise IOError(f"Incomplete range {start}-{end}: got {offset - start} bytes")
+
+        def fetch_aligned(response: requests.Response, offset: int) -> int:
+            # Assemble full blocks in page-aligned anonymous mmaps; the final
+            # block is zero-padded to the alignment and trimmed by ftruncate.
+            block = mmap.mmap(-1, DIRECT_IO_BLOCK_SIZE)
+            filled = 0
+
+            for chunk in response.iter_content(chunk_size=READ_CHUNK_SIZE):
+                if write_errors:
+                    raise write_errors[0]
+                view = memoryview(chunk)
+                while view:
+                    n = min(len(view), DIRECT_IO_BLOCK_SIZE - filled)
+                    block[filled:filled + n] = view[:n]
+                    filled += n
+                    view = view[n:]
+                    if filled == DIRECT_IO_BLOCK_SIZE:
+                        write_queue.put((offset, memoryview(block)))
+                        offset += filled
+                        block = mmap.mmap(-1, DIRECT_IO_BLOCK_SIZE)
+                        filled = 0
+
+            if filled:
+                padded = -(-filled // DIRECT_IO_ALIGNMENT) * DIRECT_IO_ALIGNMENT
+                write_queue.put((offset, memoryview(block)[:padded]))
+                offset += filled
+
+            return offset
+
+        writer = threading.Thread(target=write, name="download-writer", daemon=True)
+        writer.start()
+        try:
+            with ThreadPoolExecutor(max_workers=min(max_concurrency, len(ranges))) as executor:
+                list(executor.map(fetch, ranges))
+        finally:
+            write_queue.put(None)
+            writer.join()
+
+        if write_errors:
+            raise write_errors[0]
+
+        if direct_io:
+            # Drop the padding written after the last aligned block
+            os.ftruncate(fd, size)
+    finally:
+        os.close(fd)
+
+    return size
+
+
+def _open_output(output_path: Path, direct_io: bool) -> Optional[int]:
+    """Open the output file for writing (None if O_DIRECT is unsupported)."""
+    flags = os.O_WRONLY | os.O_CREAT | os.O_TRUNC
+    if direct_io:
+        if not hasattr(os, "O_DIRECT"):
+            return None
+        flags |= os.O_DIRECT
+
+    try:
+        return os.open(output_path, flags, 0o644)
+    except OSError as e:
+        if not direct_io:
+            raise
+        # tmpfs and some network filesystems reject O_DIRECT
+        logger.debug(f"O_DIRECT unavailable for {output_path}: {e}")
+        return None
+
+
+def _preallocate(fd: int, size: int) -> None:
+    """Reserve file space up front (falls back to a sparse truncate)."""
+    try:
+        os.posix_fallocate(fd, 0, size)
+    except (AttributeError, OSError):
+        os.ftruncate(fd, size)
+
+
+def _pwrite_all(fd: int, data: bytes, offset: int) -> None:
+    """Write all of data at offset, handling short writes."""
+    view = memoryview(data)
+    while view:
+        written = os.pwrite(fd, view, offset)
+        view = view[written:]
+        offset += written
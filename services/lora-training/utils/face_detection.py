@@ -4,16 +4,28 @@ Face detection and image quality assessment utilities.
 Uses OpenCV for face detection and blur detection.
 """
 
+import logging
+import os
+import threading
 import cv2
 import numpy as np
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
-from typing import Tuple, Optional
+from typing import Iterator, List, Optional, Sequence, Tuple
 from dataclasses import dataclass
 
 from utils.logger import get_logger
+from utils.sharpness_kernels import laplacian_variance
 
 logger = get_logger(__name__)
 
+# YuNet faces scored below this are not counted at all; scores between it
+# and min_face_confidence are reported as low-confidence faces
+YUNET_SCORE_THRESHOLD = 0.5
+YUNET_NMS_THRESHOLD = 0.3
+
 
 @dataclass
 class ImageQuality:
@@ -27,6 +39,13 @@ class ImageQuality:
     height: int
 
 
+def _to_gray(image: np.ndarray) -> np.ndarray:
+    """Return a single-channel view of image, converting BGR if needed."""
+    if image.ndim == 2:
+        return image
+    return cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+
+
 class FaceDetector:
     """Detect faces and assess image quality for LoRA training."""
 
@@ -34,7 +53,10 @@ class FaceDetector:
         self,
         min_face_confidence: float = 0.8,
         blur_threshold: float = 100.0,
-        min_quality: float = 0.6
+        min_quality: float = 0.6,
+        max_workers: Optional[int] = None,
+        detection_max_dim: Optional[int] = 640,
+        model_path: Optional[str] = None
     ):
         """
         Initialize face detector.
@@ -43,50 +65,121 @@ class FaceDetector:
             min_face_confidence: Minimum confidence for face detection
             blur_threshold: Laplacian variance threshold (higher = less blur tolerance)
             min_quality: Minimum overall quality score (0-1)
+            max_workers: Threads used to assess frames in a batch (default: CPU count, max 8)
+            detection_max_dim: Downscale images so the longest side is at most this
+                many pixels before face detection (None = full resolution)
+            model_path: YuNet ONNX model (e.g. face_detection_yunet_2023mar.onnx)
+                to detect faces with real confidence scores (default: the
+                FACE_DETECTOR_MODEL environment variable; Haar cascade if unset)
         """
         self.min_face_confidence = min_face_confidence
         self.blur_threshold = blur_threshold
         self.min_quality = min_quality
+        self.max_workers = max_workers or min(8, os.cpu_count() or 1)
+        self.detection_max_dim = detection_max_dim
+        self.model_path = model_path or os.getenv("FACE_DETECTOR_MODEL")
+
+        # Long-lived assessment pool: batches skip thread start-up, and the
+        # per-thread YuNet detectors survive from one batch to the next
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+
+        # YuNet detectors keep per-input-size state, so each assessing
+        # thread gets its own (see _yunet)
+        self._local = threading.local()
+        self.use_yunet = False
+        if self.model_path:
+            try:
+                self._yunet()
+                self.use_yunet = True
+                logger.info(f"✓ Using YuNet face detector: {self.model_path}")
+            except (AttributeError, cv2.error) as e:
+                logger.warning(f"Could not load YuNet model {self.model_path}, using Haar cascade: {e}")
+
+        # Haar cascade, loaded on first detection (see face_cascade)
+        self._face_cascade: Optional["cv2.CascadeClassifier"] = None
+        self._cascade_lock = threading.Lock()
+
+    @property
+    def face_cascade(self) -> "cv2.CascadeClassifier":
+        """OpenCV Haar cascade face detector (loaded on first use)."""
+        if self._face_cascade is None:
+            with self._cascade_lock:
+                if self._face_cascade is None:
+                    cascade_path = cv2.data.haarcascades + "haarcascade_frontalface_default.xml"
+                    face_cascade = cv2.CascadeClassifier(cascade_path)
+
+                    if face_cascade.empty():
+                        logger.warning("Failed to load face cascade classifier")
+
+                    self._face_cascade = face_cascade
+        return self._face_cascade
+
+    def _yunet(self) -> "cv2.FaceDetectorYN":
+        """This thread's YuNet detector (created on first use)."""
+        detector = getattr(self._local, "yunet", None)
+        if detector is None:
+            detector = cv2.FaceDetectorYN.create(
+                self.model_path,
+                "",
+                (320, 320),
+                score_threshold=YUNET_SCORE_THRESHOLD,
+                nms_threshold=YUNET_NMS_THRESHOLD
+            )
+            self._local.yunet = detector
+        return detector
 
-        # Load OpenCV face detector (Haar Cascade)
-        cascade_path = cv2.data.haarcascades + "haarcascade_frontalface_default.xml"
-        self.face_cascade = cv2.CascadeClassifier(cascade_path)
-
-        if self.face_cascade.empty():
-            logger.warning("Failed to load face cascade classifier")
+    def warm_up(self) -> None:
+        """Run one detection on a blank frame so the first real batch is not penalized."""
+        self.detect_faces(np.zeros((240, 320), dtype=np.uint8))
 
     def detect_blur(self, image: np.ndarray) -> float:
         """
         Detect blur using Laplacian variance method.
 
         Args:
-            image: Input image (BGR)
+            image: Input image (BGR or grayscale)
 
         Returns:
             Blur score (higher = sharper image)
         """
-        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-        laplacian_var = cv2.Laplacian(gray, cv2.CV_64F).var()
-        return float(laplacian_var)
+        # Fused compiled kernel when numba is installed, OpenCV otherwise
+        return laplacian_variance(_to_gray(image))
 
     def detect_faces(self, image: np.ndarray) -> Tuple[int, float]:
         """
         Detect faces in image.
 
         Args:
-            image: Input image (BGR)
+            image: Input image (BGR or grayscale)
 
         Returns:
             Tuple of (face_count, max_confidence)
         """
-        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        gray = _to_gray(image)
+
+        # Cascade cost grows with pixel count; detect on a downscaled copy.
+        # Confidence is an area ratio, so it is unaffected by the scale.
+        min_size = 30
+        height, width = gray.shape[:2]
+        if self.detection_max_dim and max(height, width) > self.detection_max_dim:
+            scale = self.detection_max_dim / max(height, width)
+            gray = cv2.resize(
+                gray,
+                (max(1, round(width * scale)), max(1, round(height * scale))),
+                interpolation=cv2.INTER_AREA
+            )
+            min_size = max(1, round(min_size * scale))
+
+        if self.use_yunet:
+            return self._detect_faces_yunet(gray)
 
         # Detect faces
         faces = self.face_cascade.detectMultiScale(
             gray,
             scaleFactor=1.1,
             minNeighbors=5,
-            minSize=(30, 30)
+            minSize=(min_size, min_size)
         )
 
         if len(faces) == 0:
@@ -103,6 +196,20 @@ class FaceDetector:
 
         return len(faces), confidence
 
+    def _detect_faces_yunet(self, gray: np.ndarray) -> Tuple[int, float]:
+        """Detect faces with YuNet; confidence is the best face score."""
+        height, width = gray.shape[:2]
+        detector = self._yunet()
+        detector.setInputSize((width, height))
+
+        # YuNet takes 3-channel input; gray replicated is enough for detection
+        _, faces = detector.detect(cv2.cvtColor(gray, cv2.COLOR_GRAY2BGR))
+        if faces is None or len(faces) == 0:
+            return 0, 0.0
+
+        # Each row: box (4), five landmarks (10), score
+        return len(faces), float(faces[:, -1].max())
+
     def assess_quality(self, image_path: Path) -> Optional[ImageQuality]:
         """
         Assess image quality for LoRA training.
@@ -114,53 +221,152 @@ class FaceDetector:
             ImageQuality object or None if image cannot be read
         """
         try:
-            # Read image
-            image = cv2.imread(str(image_path))
+            # Read image (luma only: blur and face checks never need color,
+            # so skip chroma decode/upsampling and the BGR->gray conversion)
+            image = cv2.imread(str(image_path), cv2.IMREAD_GRAYSCALE)
             if image is None:
                 logger.warning(f"Could not read image: {image_path}")
                 return None
 
-            height, width = image.shape[:2]
+            return self.assess_image(image)
 
-            # Detect faces
-            face_count, face_confidence = self.detect_faces(image)
-            has_face = face_count > 0
+        except Exception as e:
+            logger.error(f"Error assessing image quality: {e}")
+            return None
 
-            # Detect blur
-            blur_score = self.detect_blur(image)
+    def assess_image(self, image: np.ndarray) -> ImageQuality:
+        """
+        Assess an already-decoded image for LoRA training.
 
-            # Calculate overall acceptability
-            is_acceptable = (
-                has_face and
-                face_confidence >= self.min_face_confidence and
-                blur_score >= self.blur_threshold
-            )
+        Args:
+            image: Input image (BGR or grayscale)
 
-            return ImageQuality(
-                has_face=has_face,
-                face_count=face_count,
-                face_confidence=face_confidence,
-                blur_score=blur_score,
-                is_acceptable=is_acceptable,
-                width=width,
-                height=height
-            )
+        Returns:
+            ImageQuality object
+        """
+        gray = _to_gray(image)
+        height, width = gray.shape[:2]
 
-        except Exception as e:
-            logger.error(f"Error assessing image quality: {e}")
-            return None
+        # Detect faces
+        face_count, face_confidence = self.detect_faces(gray)
+        has_face = face_count > 0
+
+        # Detect blur
+        blur_score = self.detect_blur(gray)
+
+        # Calculate overall acceptability
+        is_acceptable = (
+            has_face and
+            face_confidence >= self.min_face_confidence and
+            blur_score >= self.blur_threshold
+        )
+
+        return ImageQuality(
+            has_face=has_face,
+            face_count=face_count,
+            face_confidence=face_confidence,
+            blur_score=blur_score,
+            is_acceptable=is_acceptable,
+            width=width,
+            height=height
+        )
+
+    def assess_batch(
+        self,
+        image_paths: List[Path],
+        images: Optional[Sequence[np.ndarray]] = None
+    ) -> List[Optional[ImageQuality]]:
+        """
+        Assess a batch of images concurrently.
+
+        Args:
+            image_paths: Paths to image files
+            images: Optional decoded images aligned with image_paths; when given,
+                these are assessed and the files are not read
+
+        Returns:
+            List of ImageQuality (or None for unreadable images), in input order
+        """
+        if not image_paths:
+            return []
+
+        if images is not None:
+            assess, items = self.assess_image, images
+        else:
+            assess, items = self.assess_quality, image_paths
+
+        if self.max_workers == 1 or len(image_paths) == 1:
+            return [assess(item) for item in items]
+
+        return list(self._get_executor().map(assess, items))
+
+    def iter_assessments(
+        self,
+        image_paths: List[Path],
+        images: Optional[Sequence[np.ndarray]] = None
+    ) -> Iterator[Optional[ImageQuality]]:
+        """
+        Assess images on the detector's pool, yielding results in input order.
+
+        At most twice max_workers images are in flight, so callers can act on
+        early results while later images are still being assessed. Closing
+        the iterator early cancels assessments not yet started.
+
+        Args:
+            image_paths: Paths to image files
+            images: Optional decoded images aligned with image_paths
+
+        Yields:
+            ImageQuality (or None for unreadable images), in input order
+        """
+        if images is not None:
+            assess, items = self.assess_image, images
+        else:
+            assess, items = self.assess_quality, image_paths
+
+        if self.max_workers == 1:
+            for item in items:
+                yield assess(item)
+            return
+
+        executor = self._get_executor()
+        window = 2 * self.max_workers
+        pending = deque()
+        try:
+            for item in items:
+                pending.append(executor.submit(assess, item))
+                if len(pending) >= window:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+        finally:
+            for future in pending:
+                future.cancel()
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """The detector's assessment thread pool (created on first batch)."""
+        if self._executor is None:
+            with self._executor_lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.max_workers,
+                        thread_name_prefix="face-assess"
+                    )
+        return self._executor
 
     def filter_quality_frames(
         self,
         frame_paths: list[Path],
-        verbose: bool = True
+        verbose: bool = True,
+        images: Optional[Sequence[np.ndarray]] = None
     ) -> Tuple[list[Path], list[ImageQuality]]:
         """
         Filter frames based on quality criteria.
 
         Args:
             frame_paths: List of paths to frame images
-            verbose: Log detailed results
+            verbose: Log a line per frame (at DEBUG level)
+            images: Optional decoded frames aligned with frame_paths (skips reading files)
 
         Returns:
             Tuple of (accepted_paths, quality_assessments)
@@ -170,9 +376,14 @@ class FaceDetector:
 
         logger.info(f"Assessing quality of {len(frame_paths)} frames...")
 
-        for i, frame_path in enumerate(frame_paths, 1):
-            quality = self.assess_quality(frame_path)
+        # Assess the whole batch concurrently (OpenCV releases the GIL for
+        # decode, blur and detection), then accept in order on this thread
+        assessments = self.assess_batch(frame_paths, images)
 
+        # Per-frame lines are DEBUG: skip building them unless they'll be emitted
+        verbose = verbose and logger.isEnabledFor(logging.DEBUG)
+
+        for i, (frame_path, quality) in enumerate(zip(frame_paths, assessments), 1):
             if quality is None:
                 continue
 
@@ -181,7 +392,7 @@ class FaceDetector:
             if quality.is_acceptable:
                 accepted.append(frame_path)
                 if verbose:
-                    logger.info(
+                    logger.debug(
                         f"  ✓ Frame {i}: PASS "
                         f"(faces={quality.face_count}, "
                         f"conf={quality.face_confidence:.2f}, "
@@ -197,7 +408,34 @@ class FaceDetector:
                     if quality.blur_score < self.blur_threshold:
                         reasons.append(f"blurry ({quality.blur_score:.1f})")
 
-                    logger.info(f"  ✗ Frame {i}: REJECT ({', '.join(reasons)})")
+                    logger.debug(f"  ✗ Frame {i}: REJECT ({', '.join(reasons)})")
 
         logger.info(f"✓ Accepted {len(accepted)}/{len(frame_paths)} frames")
         return accepted, qualities
+
+
+@lru_cache(maxsize=8)
+def get_face_detector(
+    min_face_confidence: float = 0.8,
+    blur_threshold: float = 100.0,
+    min_quality: float = 0.6
+) -> FaceDetector:
+    """
+    Get a shared FaceDetector for the given thresholds.
+
+    The detector model is loaded once per process and reused across jobs;
+    FaceDetector holds no per-job state.
+
+    Args:
+        min_face_confidence: Minimum confidence for face detection
+        blur_threshold: Laplacian variance threshold
+        min_quality: Minimum overall quality score (0-1)
+
+    Returns:
+        Cached FaceDetector instance
+    """
+    return FaceDetector(
+        min_face_confidence=min_face_confidence,
+        blur_threshold=blur_threshold,
+        min_quality=min_quality
+    )
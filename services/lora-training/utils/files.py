@@ -0,0 +1,92 @@
+"""
+File staging utilities.
+
+Places files into dataset/work directories without moving bytes through
+user space when the filesystem allows it.
+"""
+
+import os
+import shutil
+from pathlib import Path
+
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def link_or_copy(src: Path, dst: Path, allow_symlink: bool = False) -> None:
+    """
+    Stage src at dst as cheaply as possible.
+
+    Hardlinks when both paths live on the same filesystem (an O(1) inode
+    operation), otherwise copies in-kernel with copy_file_range. The result
+    must be treated as read-only since a hardlink shares the source inode.
+
+    Args:
+        src: Source file path
+        dst: Destination file path (replaced if it exists)
+        allow_symlink: Symlink across filesystems instead of copying. Only for
+            transient files whose source outlives dst
+    """
+    src = Path(src)
+    dst = Path(dst)
+
+    if dst.exists() or dst.is_symlink():
+        dst.unlink()
+
+    if os.stat(src).st_dev == os.stat(dst.parent).st_dev:
+        try:
+            os.link(src, dst)
+            return
+        except OSError as e:
+            # Filesystems without hardlink support, link count limits, etc.
+            logger.debug(f"Hardlink failed for {src}: {e}")
+
+    if allow_symlink:
+        try:
+            os.symlink(src.resolve(), dst)
+            return
+        except OSError as e:
+            logger.debug(f"Symlink failed for {src}: {e}")
+
+    _copy_file(src, dst)
+
+
+def write_text_file(path: Path, text: str) -> None:
+    """
+    Write text to path with a single write call.
+
+    Goes straight to os.open/os.write/os.close, skipping the buffered-IO
+    setup (fstat, isatty probe, seek) that Path.write_text does per file.
+
+    Args:
+        path: Destination file path (truncated if it exists)
+        text: UTF-8 text to write
+    """
+    data = text.encode("utf-8")
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view):]
+    finally:
+        os.close(fd)
+
+
+def _copy_file(src: Path, dst: Path) -> None:
+    """Copy file contents in-kernel (copy_file_range, else sendfile via shutil)."""
+    if not hasattr(os, "copy_file_range"):
+        shutil.copyfile(src, dst)
+        return
+
+    try:
+        with open(src, "rb") as fin, open(dst, "wb") as fout:
+            remaining = os.fstat(fin.fileno()).st_size
+            while remaining > 0:
+                copied = os.copy_file_range(fin.fileno(), fout.fileno(), remaining)
+                if copied == 0:
+                    break
+                remaining -= copied
+    except OSError:
+        # Older kernels reject cross-filesystem copy_file_range
+        shutil.copyfile(src, dst)
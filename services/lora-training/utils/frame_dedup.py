@@ -0,0 +1,94 @@
+"""
+Near-duplicate frame detection for LoRA training datasets.
+
+Uses 64-bit difference hashes (dHash): frames whose hashes differ in only
+a few bits look the same, so only one of them needs the (much more
+expensive) face and blur assessment.
+"""
+
+from pathlib import Path
+from typing import List, Optional
+
+import cv2
+import numpy as np
+
+# Frames whose hashes differ in at most this many of 64 bits are duplicates
+DEFAULT_MAX_DISTANCE = 4
+
+
+def dhash(image: np.ndarray) -> int:
+    """
+    Compute the 64-bit difference hash of an image.
+
+    The image is shrunk to 9x8 grayscale and each bit records whether a
+    pixel is brighter than its right-hand neighbour.
+
+    Args:
+        image: Input image (BGR or grayscale)
+
+    Returns:
+        Hash as an unsigned 64-bit int
+    """
+    if image.ndim == 3:
+        image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+
+    small = cv2.resize(image, (9, 8), interpolation=cv2.INTER_AREA)
+    bits = small[:, 1:] > small[:, :-1]
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+
+def dhash_file(image_path: Path) -> Optional[int]:
+    """
+    Compute the difference hash of an image file.
+
+    JPEGs are decoded at 1/8 scale (DCT scaling), which is far cheaper than
+    a full decode and plenty for a 9x8 thumbnail.
+
+    Args:
+        image_path: Path to image
+
+    Returns:
+        Hash, or None if the image could not be read
+    """
+    image = cv2.imread(str(image_path), cv2.IMREAD_REDUCED_GRAYSCALE_8)
+    if image is None:
+        return None
+    return dhash(image)
+
+
+class FrameDeduper:
+    """Keep frames whose hash is not within max_distance of an already kept frame."""
+
+    def __init__(self, max_distance: int = DEFAULT_MAX_DISTANCE):
+        """
+        Initialize frame deduper.
+
+        Args:
+            max_distance: Largest Hamming distance still counted as a duplicate
+        """
+        self.max_distance = max_distance
+        self._kept: List[int] = []
+
+    def is_duplicate(self, frame_hash: int) -> bool:
+        """Check a hash against the kept hashes (XOR + popcount each)."""
+        return any(
+            (frame_hash ^ kept).bit_count() <= self.max_distance
+            for kept in self._kept
+        )
+
+    def keep(self, frame_hash: Optional[int]) -> bool:
+        """
+        Decide whether to keep a frame, remembering it if kept.
+
+        Args:
+            frame_hash: Frame hash (None = unhashable, always kept)
+
+        Returns:
+            True if the frame is not a near-duplicate of a kept frame
+        """
+        if frame_hash is None:
+            return True
+        if self.is_duplicate(frame_hash):
+            return False
+        self._kept.append(frame_hash)
+        return True
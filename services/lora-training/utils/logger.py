@@ -6,6 +6,7 @@ Provides consistent logging across all modules.
 
 import logging
 import sys
+from functools import lru_cache
 from pathlib import Path
 from typing import Optional
 
@@ -59,10 +60,14 @@ def setup_logger(
     return logger
 
 
+@lru_cache(maxsize=None)
 def get_logger(name: str) -> logging.Logger:
     """
     Get a logger instance with default settings.
 
+    Loggers are process-wide singletons, so each name is set up once and
+    later calls return the cached instance.
+
     Args:
         name: Logger name (usually __name__)
 
@@ -10,19 +10,55 @@ from typing import Dict, Any, Optional
 MAX_ATTEMPTS = 3
 TIMEOUT_SECONDS = 10
 
+# Keep-alive pool shared by every webhook call and retry
+CONNECTION_LIMIT = 100
+KEEPALIVE_TIMEOUT = 60
+
+_session: Optional[aiohttp.ClientSession] = None
+
+
+def get_session() -> aiohttp.ClientSession:
+    """
+    Get the process-wide webhook session (created on first use).
+
+    Reusing one session keeps connections to webhook endpoints alive across
+    calls and retries instead of paying a TCP/TLS handshake each time.
+    Must be called from the event loop that will use it.
+    """
+    global _session
+
+    if _session is None or _session.closed:
+        _session = aiohttp.ClientSession(
+            timeout=aiohttp.ClientTimeout(total=TIMEOUT_SECONDS),
+            connector=aiohttp.TCPConnector(limit=CONNECTION_LIMIT, keepalive_timeout=KEEPALIVE_TIMEOUT),
+            headers={'User-Agent': 'ContentGenerationService/1.0'}
+        )
+
+    return _session
+
+
+async def close_session() -> None:
+    """Close the shared webhook session and its pooled connections"""
+    global _session
+
+    if _session is not None:
+        await _session.close()
+        _session = None
+
 
 async def send_webhook(
     webhook_url: str,
-    payload: Dict[str, Any],
-    attempt: int = 1
+    payload: Dict[str, Any]
 ) -> Dict[str, Any]:
     """
     Send webhook notification with retry logic
 
+    Up to MAX_ATTEMPTS attempts over the shared session, with exponential
+    backoff (1s, 2s, ...) between them.
+
     Args:
         webhook_url: Target webhook URL
         payload: JSON payload to send
-        attempt: Current attempt number (1-indexed)
 
     Returns:
         Dict with success status and details
@@ -30,19 +66,17 @@ async def send_webhook(
     if not webhook_url:
         return {"success": False, "error": "No webhook URL"}
 
-    print(f"📞 Calling webhook (attempt {attempt}/{MAX_ATTEMPTS}): {webhook_url}")
+    session = get_session()
+    error_msg = None
 
-    try:
-        timeout = aiohttp.ClientTimeout(total=TIMEOUT_SECONDS)
+    for attempt in range(1, MAX_ATTEMPTS + 1):
+        print(f"📞 Calling webhook (attempt {attempt}/{MAX_ATTEMPTS}): {webhook_url}")
 
-        async with aiohttp.ClientSession(timeout=timeout) as session:
+        try:
             async with session.post(
                 webhook_url,
                 json=payload,
-                headers={
-                    'Content-Type': 'application/json',
-                    'User-Agent': 'ContentGenerationService/1.0'
-                }
+                headers={'Content-Type': 'application/json'}
             ) as response:
 
                 if response.status >= 200 and response.status < 300:
@@ -52,40 +86,28 @@ async def send_webhook(
                         "status_code": response.status,
                         "attempts": attempt
                     }
-                else:
-                    raise Exception(f"Webhook returned {response.status}")
 
-    except asyncio.TimeoutError:
-        error_msg = f"Webhook timeout after {TIMEOUT_SECONDS}s"
-        print(f"   ❌ {error_msg}")
+                error_msg = f"Webhook returned {response.status}"
+                print(f"   ❌ Webhook failed: {error_msg}")
 
-        if attempt < MAX_ATTEMPTS:
-            delay = 2 ** (attempt - 1)  # 1s, 2s, 4s
-            print(f"   🔄 Retrying in {delay}s...")
-            await asyncio.sleep(delay)
-            return await send_webhook(webhook_url, payload, attempt + 1)
+        except asyncio.TimeoutError:
+            error_msg = f"Webhook timeout after {TIMEOUT_SECONDS}s"
+            print(f"   ❌ {error_msg}")
 
-        return {
-            "success": False,
-            "error": error_msg,
-            "attempts": attempt
-        }
-
-    except Exception as e:
-        error_msg = str(e)
-        print(f"   ❌ Webhook failed: {error_msg}")
+        except Exception as e:
+            error_msg = str(e)
+            print(f"   ❌ Webhook failed: {error_msg}")
 
         if attempt < MAX_ATTEMPTS:
-            delay = 2 ** (attempt - 1)
+            delay = 2 ** (attempt - 1)  # 1s, 2s, 4s
             print(f"   🔄 Retrying in {delay}s...")
             await asyncio.sleep(delay)
-            return await send_webhook(webhook_url, payload, attempt + 1)
 
-        return {
-            "success": False,
-            "error": error_msg,
-            "attempts": attempt
-        }
+    return {
+        "success": False,
+        "error": error_msg,
+        "attempts": MAX_ATTEMPTS
+    }
 
 
 def create_completion_payload(job_data: Dict[str, Any], result: Dict[str, Any]) -> Dict[str, Any]: